@@ -57,6 +57,23 @@ a distributed trace.
         print("Hello world!")
 
 
+By default the exporter sends traces through the ``ddtrace`` ``AgentWriter``.
+With ``api_version="v0.4"``, traces are encoded directly from the
+OpenTelemetry spans into the agent msgpack payload and all the traces queued
+by ``DatadogExportSpanProcessor`` are sent in a single request over a
+connection kept open to the agent. ``api_version="v0.5"`` uses the more
+compact agent format in which every string is sent once per request in a
+string table, which shrinks payloads repeating the same service names,
+resources and tags:
+
+.. code:: python
+
+    exporter = DatadogSpanExporter(
+        agent_url="unix:///var/run/datadog/apm.socket",
+        service="my-helloworld-service",
+        api_version="v0.5",
+    )
+
 Examples
 --------
 
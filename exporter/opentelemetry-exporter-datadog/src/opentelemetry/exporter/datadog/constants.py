@@ -14,3 +14,4 @@ EXCEPTION_STACK_ATTR_KEY = "exception.stacktrace"
 DD_ERROR_TYPE_TAG_KEY = "error.type"
 DD_ERROR_MSG_TAG_KEY = "error.msg"
 DD_ERROR_STACK_TAG_KEY = "error.stack"
+PARTIAL_TRACE_TAG_KEY = "otel.partial_trace"
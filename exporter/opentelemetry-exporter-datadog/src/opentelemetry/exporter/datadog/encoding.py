@@ -0,0 +1,182 @@
+# Copyright The OpenTelemetry Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Encoding of traces into Datadog Agent payloads.
+
+These encoders are used by `DatadogSpanExporter` when it is configured with
+an ``api_version`` and send traces to the agent without going through
+``ddtrace`` spans and its ``AgentWriter``.
+"""
+
+import typing
+
+import msgpack
+
+from opentelemetry.semconv.trace import SpanAttributes
+
+V04 = "v0.4"
+V05 = "v0.5"
+
+
+class AgentSpan:
+    """Lightweight span holding the fields sent to the Datadog Agent.
+
+    It mirrors the subset of the ``ddtrace.span.Span`` API used when
+    translating OpenTelemetry spans so that both share the same translation.
+    """
+
+    __slots__ = (
+        "name",
+        "service",
+        "resource",
+        "span_type",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "start_ns",
+        "duration_ns",
+        "error",
+        "meta",
+        "metrics",
+    )
+
+    # pylint: disable=too-many-arguments,unused-argument
+    def __init__(
+        self,
+        tracer,
+        name,
+        service=None,
+        resource=None,
+        span_type=None,
+        trace_id=None,
+        span_id=None,
+        parent_id=None,
+    ):
+        self.name = name
+        self.service = service
+        self.resource = resource
+        self.span_type = span_type
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.start_ns = 0
+        self.duration_ns = 0
+        self.error = 0
+        self.meta = {}  # type: typing.Dict[str, str]
+        self.metrics = {}  # type: typing.Dict[str, float]
+
+    def set_tag(self, key, value):
+        # like ddtrace, numbers are sent as metrics and anything else as text,
+        # except for the status code that ddtrace keeps as text
+        if (
+            isinstance(value, (int, float))
+            and not isinstance(value, bool)
+            and key != SpanAttributes.HTTP_STATUS_CODE
+        ):
+            self.metrics[key] = value
+        else:
+            self.meta[key] = str(value)
+
+    def set_tags(self, tags):
+        for key, value in tags.items():
+            self.set_tag(key, value)
+
+    def set_metric(self, key, value):
+        self.metrics[key] = value
+
+
+def _span_to_v04(span: AgentSpan) -> dict:
+    encoded = {
+        "trace_id": span.trace_id,
+        "span_id": span.span_id,
+        "parent_id": span.parent_id,
+        "name": span.name,
+        "resource": span.resource,
+        "service": span.service,
+        "start": span.start_ns,
+        "duration": span.duration_ns,
+        "error": span.error,
+    }
+    if span.span_type:
+        encoded["type"] = span.span_type
+    if span.meta:
+        encoded["meta"] = span.meta
+    if span.metrics:
+        encoded["metrics"] = span.metrics
+    return encoded
+
+
+def encode_v04(traces: typing.Sequence[typing.Sequence[AgentSpan]]) -> bytes:
+    """Encodes traces into a ``/v0.4/traces`` payload: an array of traces,
+    each of them an array of span maps."""
+    return msgpack.packb(
+        [[_span_to_v04(span) for span in trace] for trace in traces],
+        use_bin_type=True,
+    )
+
+
+class _StringTable:
+    """Interns the strings of a v0.5 payload, ``""`` is always at index 0"""
+
+    __slots__ = ("_indexes", "strings")
+
+    def __init__(self):
+        self._indexes = {"": 0}
+        self.strings = [""]
+
+    def index(self, string) -> int:
+        if string is None:
+            return 0
+        index = self._indexes.get(string)
+        if index is None:
+            index = self._indexes[string] = len(self.strings)
+            self.strings.append(string)
+        return index
+
+
+def _span_to_v05(span: AgentSpan, table: _StringTable) -> list:
+    index = table.index
+    return [
+        index(span.service),
+        index(span.name),
+        index(span.resource),
+        span.trace_id,
+        span.span_id,
+        span.parent_id,
+        span.start_ns,
+        span.duration_ns,
+        span.error,
+        {index(key): index(value) for key, value in span.meta.items()},
+        {index(key): value for key, value in span.metrics.items()},
+        index(span.span_type),
+    ]
+
+
+def encode_v05(traces: typing.Sequence[typing.Sequence[AgentSpan]]) -> bytes:
+    """Encodes traces into a ``/v0.5/traces`` payload.
+
+    The payload is an array of two elements: a table of all the strings of the
+    payload, and the traces. Each span is an array of 12 fields in which
+    service, name, resource, type and the meta and metrics keys, and meta
+    values are replaced by their index in the string table, so every string
+    repeated across spans is sent only once.
+    """
+    table = _StringTable()
+    encoded_traces = [
+        [_span_to_v05(span, table) for span in trace] for trace in traces
+    ]
+    return msgpack.packb([table.strings, encoded_traces], use_bin_type=True)
+
+
+ENCODERS = {V04: encode_v04, V05: encode_v05}
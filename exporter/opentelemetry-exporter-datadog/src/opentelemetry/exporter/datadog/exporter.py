@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
 import logging
 import os
 from urllib.parse import urlparse
@@ -31,10 +32,13 @@ from opentelemetry.exporter.datadog.constants import (
     EXCEPTION_MSG_ATTR_KEY,
     EXCEPTION_STACK_ATTR_KEY,
     EXCEPTION_TYPE_ATTR_KEY,
+    PARTIAL_TRACE_TAG_KEY,
     SAMPLE_RATE_METRIC_KEY,
     SERVICE_NAME_TAG,
     VERSION_KEY,
 )
+from opentelemetry.exporter.datadog.encoding import ENCODERS, AgentSpan
+from opentelemetry.exporter.datadog.transport import AgentClient
 from opentelemetry.sdk.trace import sampling
 from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
 from opentelemetry.semconv.trace import SpanAttributes
@@ -43,6 +47,7 @@ logger = logging.getLogger(__name__)
 
 
 DEFAULT_AGENT_URL = "http://localhost:8126"
+_RESOURCE_CACHE_SIZE = 64
 _INSTRUMENTATION_SPAN_TYPES = {
     "opentelemetry.instrumentation.aiohttp-client": DatadogSpanTypes.HTTP,
     "opentelemetry.instrumentation.asgi": DatadogSpanTypes.WEB,
@@ -72,11 +77,25 @@ class DatadogSpanExporter(SpanExporter):
         env: Set the application’s environment or use ``DD_ENV`` environment variable
         version: Set the application’s version or use ``DD_VERSION`` environment variable
         tags: A list (formatted as a comma-separated string) of default tags to be added to every span or use ``DD_TAGS`` environment variable
+        api_version: Version of the agent trace API (``"v0.4"`` or ``"v0.5"``) to send traces to directly, encoding them without ``ddtrace``. By default, traces are sent through the ``ddtrace`` ``AgentWriter``.
     """
 
+    # pylint: disable=too-many-arguments
     def __init__(
-        self, agent_url=None, service=None, env=None, version=None, tags=None
+        self,
+        agent_url=None,
+        service=None,
+        env=None,
+        version=None,
+        tags=None,
+        api_version=None,
     ):
+        if api_version is not None and api_version not in ENCODERS:
+            raise ValueError(
+                f"Unknown api_version `{api_version}`, expected one of "
+                f"{', '.join(ENCODERS)}"
+            )
+
         self.agent_url = (
             agent_url
             if agent_url
@@ -87,6 +106,12 @@ class DatadogSpanExporter(SpanExporter):
         self.version = version or os.environ.get("DD_VERSION")
         self.tags = _parse_tags_str(tags or os.environ.get("DD_TAGS"))
         self._agent_writer = None
+        self.api_version = api_version
+        self._agent_client = None
+        # resources and instrumentation scopes are shared by many spans, their
+        # translation is cached by resource identity and by scope name
+        self._resource_cache = {}
+        self._scope_cache = {}
 
     @property
     def agent_writer(self):
@@ -106,21 +131,133 @@ class DatadogSpanExporter(SpanExporter):
                 )
         return self._agent_writer
 
-    def export(self, spans):
+    @property
+    def agent_client(self):
+        if self._agent_client is None:
+            self._agent_client = AgentClient(self.agent_url)
+        return self._agent_client
+
+    def export(self, spans, partial=False):
+        """Exports the spans of a trace.
+
+        ``partial`` marks traces that were evicted by the span processor
+        before all their spans ended; their spans are tagged with
+        ``otel.partial_trace``.
+        """
+        if self.api_version is not None:
+            # spans may come from several traces, e.g. BatchSpanProcessor
+            traces = collections.OrderedDict()
+            for span in spans:
+                traces.setdefault(span.get_span_context().trace_id, []).append(
+                    span
+                )
+            return self.export_traces(
+                (trace, partial) for trace in traces.values()
+            )
+
         datadog_spans = self._translate_to_datadog(spans)
 
+        if partial:
+            _tag_partial_trace(datadog_spans)
+
         self.agent_writer.write(spans=datadog_spans)
 
         return SpanExportResult.SUCCESS
 
+    def export_traces(self, traces):
+        """Exports several traces at once.
+
+        ``traces`` is an iterable of ``(spans, partial)`` pairs, see `export`.
+        With an ``api_version``, all the traces are sent to the agent in a
+        single request.
+        """
+        if self.api_version is None:
+            for spans, partial in traces:
+                self.export(spans, partial)
+            return SpanExportResult.SUCCESS
+
+        agent_traces = []
+        for spans, partial in traces:
+            agent_spans = self._translate_to_datadog(spans, AgentSpan)
+            if partial:
+                _tag_partial_trace(agent_spans)
+            agent_traces.append(agent_spans)
+
+        if not agent_traces:
+            return SpanExportResult.SUCCESS
+
+        payload = ENCODERS[self.api_version](agent_traces)
+        try:
+            status = self.agent_client.send(
+                f"/{self.api_version}/traces", payload, len(agent_traces)
+            )
+        except (OSError, ValueError):
+            logger.exception("Failed to send traces to the Datadog Agent.")
+            return SpanExportResult.FAILURE
+
+        if status >= 400:
+            logger.error(
+                "Failed to send traces to the Datadog Agent, got status %s.",
+                status,
+            )
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
     def shutdown(self):
+        if self.api_version is not None:
+            if self._agent_client is not None:
+                self._agent_client.close()
+            return
+
         if self.agent_writer.started:
             self.agent_writer.stop()
             self.agent_writer.join(self.agent_writer.exit_timeout)
 
+    def _get_resource_tags(self, resource):
+        """Returns the tags and service name of a resource, see
+        `_extract_tags_from_resource`."""
+        entry = self._resource_cache.get(id(resource))
+        # the resource is kept in the entry so that its id cannot be reused
+        if entry is not None and entry[0] is resource:
+            return entry[1]
+
+        if len(self._resource_cache) >= _RESOURCE_CACHE_SIZE:
+            self._resource_cache.clear()
+        resource_tags = _extract_tags_from_resource(resource, self.service)
+        self._resource_cache[id(resource)] = (resource, resource_tags)
+        return resource_tags
+
+    def _get_scope_details(self, span):
+        """Returns the span name and span type of a span.
+
+        The name is made of the instrumentation name and span kind, backing
+        off to ``span.name``, and the type is the Datadog span type of the
+        instrumentation. Both are cached by instrumentation name and kind.
+        """
+        instrumentation_name = (
+            span.instrumentation_info.name
+            if span.instrumentation_info
+            else None
+        )
+        key = (instrumentation_name, span.kind)
+        details = self._scope_cache.get(key)
+        if details is None:
+            span_kind_name = span.kind.name if span.kind else None
+            details = (
+                f"{instrumentation_name}.{span_kind_name}"
+                if instrumentation_name and span_kind_name
+                else None,
+                _INSTRUMENTATION_SPAN_TYPES.get(instrumentation_name),
+            )
+            self._scope_cache[key] = details
+
+        span_name, span_type = details
+        return span_name or span.name, span_type
+
     # pylint: disable=too-many-locals
-    def _translate_to_datadog(self, spans):
+    def _translate_to_datadog(self, spans, span_class=DatadogSpan):
         datadog_spans = []
+        sampling_rate = _get_sampler_rate()
 
         for span in spans:
             trace_id, parent_id, span_id = _get_trace_ids(span)
@@ -132,17 +269,17 @@ class DatadogSpanExporter(SpanExporter):
             tracer = None
 
             # extract resource attributes to be used as tags as well as potential service name
-            [
-                resource_tags,
-                resource_service_name,
-            ] = _extract_tags_from_resource(span.resource, self.service)
+            [resource_tags, resource_service_name] = self._get_resource_tags(
+                span.resource
+            )
+            span_name, span_type = self._get_scope_details(span)
 
-            datadog_span = DatadogSpan(
+            datadog_span = span_class(
                 tracer,
-                _get_span_name(span),
+                span_name,
                 service=resource_service_name,
                 resource=_get_resource(span),
-                span_type=_get_span_type(span),
+                span_type=span_type,
                 trace_id=trace_id,
                 span_id=span_id,
                 parent_id=parent_id,
@@ -182,8 +319,10 @@ class DatadogSpanExporter(SpanExporter):
             if origin and parent_id == 0:
                 datadog_span.set_tag(DD_ORIGIN, origin)
 
-            sampling_rate = _get_sampling_rate(span)
-            if sampling_rate is not None:
+            if (
+                sampling_rate is not None
+                and span.get_span_context().trace_flags.sampled
+            ):
                 datadog_span.set_metric(SAMPLE_RATE_METRIC_KEY, sampling_rate)
 
             # span events and span links are not supported except for extracting exception event context
@@ -193,6 +332,11 @@ class DatadogSpanExporter(SpanExporter):
         return datadog_spans
 
 
+def _tag_partial_trace(datadog_spans):
+    for datadog_span in datadog_spans:
+        datadog_span.set_tag(PARTIAL_TRACE_TAG_KEY, "true")
+
+
 def _get_trace_ids(span):
     """Extract tracer ids from span"""
     ctx = span.get_span_context()
@@ -216,22 +360,6 @@ def _convert_trace_id_uint64(otel_id):
     return otel_id & 0xFFFFFFFFFFFFFFFF
 
 
-def _get_span_name(span):
-    """Get span name by using instrumentation and kind while backing off to
-    span.name
-    """
-    instrumentation_name = (
-        span.instrumentation_info.name if span.instrumentation_info else None
-    )
-    span_kind_name = span.kind.name if span.kind else None
-    name = (
-        f"{instrumentation_name}.{span_kind_name}"
-        if instrumentation_name and span_kind_name
-        else span.name
-    )
-    return name
-
-
 def _get_resource(span):
     """Get resource name for span"""
     if SpanAttributes.HTTP_METHOD in span.attributes:
@@ -245,15 +373,6 @@ def _get_resource(span):
     return span.name
 
 
-def _get_span_type(span):
-    """Get Datadog span type"""
-    instrumentation_name = (
-        span.instrumentation_info.name if span.instrumentation_info else None
-    )
-    span_type = _INSTRUMENTATION_SPAN_TYPES.get(instrumentation_name)
-    return span_type
-
-
 def _get_exc_info(span):
     """Parse span status description for exception type and value"""
     exc_type, exc_val = span.status.description.split(":", 1)
@@ -266,16 +385,13 @@ def _get_origin(span):
     return origin
 
 
-def _get_sampling_rate(span):
-    ctx = span.get_span_context()
+def _get_sampler_rate():
+    """Get the rate of the global tracer provider sampler, if it has one"""
     tracer_provider = trace_api.get_tracer_provider()
-    if not hasattr(tracer_provider, "sampler"):
-        return None
-    sampler = tracer_provider.sampler
+    sampler = getattr(tracer_provider, "sampler", None)
     return (
         sampler.rate
-        if ctx.trace_flags.sampled
-        and isinstance(sampler, sampling.TraceIdRatioBased)
+        if isinstance(sampler, sampling.TraceIdRatioBased)
         else None
     )
 
@@ -26,6 +26,9 @@ from opentelemetry.util._time import _time_ns
 
 logger = logging.getLogger(__name__)
 
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+
 
 class DatadogExportSpanProcessor(SpanProcessor):
     """Datadog exporter span processor
@@ -34,6 +37,32 @@ class DatadogExportSpanProcessor(SpanProcessor):
     batches all opened spans into a list per trace. When all spans for a trace
     are ended, the trace is queues up for export. This is required for exporting
     to the Datadog Agent which expects to received list of spans for each trace.
+
+    The number of spans buffered across all the open traces is bounded by
+    ``max_buffered_spans``. When a new span would exceed it, the least recently
+    active traces are evicted. Traces without any span started or ended for
+    ``stale_trace_timeout_millis`` are evicted as well, which releases traces
+    whose root span never ends. The ended spans of an evicted trace are
+    exported as a partial trace, its spans that are still open are dropped.
+
+    Completed and evicted traces are moved to a queue of at most
+    ``max_queue_size`` traces that the worker thread exports without holding
+    the lock used by ``on_start`` and ``on_end``. When the queue is full,
+    either the oldest (``DROP_OLDEST``) or the new (``DROP_NEWEST``) trace is
+    dropped. The worker is woken up early once ``max_export_batch_size``
+    traces are queued.
+
+    Args:
+        span_exporter: The exporter the traces are sent to.
+        schedule_delay_millis: Delay between two consecutive exports.
+        max_trace_size: Maximum number of spans buffered for a single trace.
+        max_buffered_spans: Maximum number of spans buffered for all traces.
+        stale_trace_timeout_millis: Evict traces inactive for this long,
+            ``None`` to never evict traces because of their age.
+        max_queue_size: Maximum number of traces waiting to be exported.
+        max_export_batch_size: Number of queued traces that triggers an
+            export before ``schedule_delay_millis`` elapses.
+        queue_full_policy: ``DROP_OLDEST`` or ``DROP_NEWEST``.
     """
 
     _FLUSH_TOKEN = INVALID_TRACE_ID
@@ -43,29 +72,86 @@ class DatadogExportSpanProcessor(SpanProcessor):
         span_exporter: SpanExporter,
         schedule_delay_millis: float = 5000,
         max_trace_size: int = 4096,
+        max_buffered_spans: int = 65536,
+        stale_trace_timeout_millis: typing.Optional[float] = None,
+        max_queue_size: int = 2048,
+        max_export_batch_size: int = 512,
+        queue_full_policy: str = DROP_OLDEST,
     ):
         if max_trace_size <= 0:
             raise ValueError("max_queue_size must be a positive integer.")
 
+        if max_buffered_spans <= 0:
+            raise ValueError("max_buffered_spans must be a positive integer.")
+
+        if (
+            stale_trace_timeout_millis is not None
+            and stale_trace_timeout_millis <= 0
+        ):
+            raise ValueError("stale_trace_timeout_millis must be positive.")
+
         if schedule_delay_millis <= 0:
             raise ValueError("schedule_delay_millis must be positive.")
 
+        if max_queue_size <= 0:
+            raise ValueError("max_queue_size must be a positive integer.")
+
+        if max_export_batch_size <= 0:
+            raise ValueError(
+                "max_export_batch_size must be a positive integer."
+            )
+
+        if max_export_batch_size > max_queue_size:
+            raise ValueError(
+                "max_export_batch_size must be less than or equal to max_queue_size."
+            )
+
+        if queue_full_policy not in (DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(
+                f"queue_full_policy must be {DROP_OLDEST!r} or {DROP_NEWEST!r}."
+            )
+
         self.span_exporter = span_exporter
 
-        # queue trace_ids for traces with recently ended spans for worker thread to check
-        # for exporting
-        self.check_traces_queue = (
+        # spans of completed and evicted traces waiting to be exported by the
+        # worker thread, along with whether some of their spans were dropped
+        self.export_queue = (
             collections.deque()
-        )  # type: typing.Deque[int]
+        )  # type: typing.Deque[typing.Tuple[typing.List[Span], bool]]
+        # flush tokens for the worker thread to acknowledge once the traces
+        # queued before them are exported
+        self.flush_queue = collections.deque()  # type: typing.Deque[int]
 
         self.traces_lock = threading.Lock()
         # dictionary of trace_ids to a list of spans where the first span is the
-        # first opened span for the trace
-        self.traces = collections.defaultdict(list)
+        # first opened span for the trace, ordered from the least to the most
+        # recently active trace
+        self.traces = (
+            collections.OrderedDict()
+        )  # type: typing.OrderedDict[int, typing.List[Span]]
         # counter to keep track of the number of spans and ended spans for a
         # trace_id
         self.traces_spans_count = collections.Counter()
         self.traces_spans_ended_count = collections.Counter()
+        # time of the last span started or ended for a trace_id
+        self.traces_last_active = {}  # type: typing.Dict[int, int]
+        # ids of the spans dropped because of max_trace_size for a trace_id
+        self._traces_dropped_span_ids = collections.defaultdict(set)
+        # trace and span ids of the spans that were still open when their
+        # trace was evicted, so that they are ignored when they end, bounded
+        # by max_buffered_spans
+        self._evicted_span_ids = (
+            collections.OrderedDict()
+        )  # type: typing.OrderedDict[typing.Tuple[int, int], None]
+        self._buffered_spans = 0
+
+        # counters for the spans and traces that could not be fully exported
+        self.dropped_spans = 0
+        self.dropped_traces = 0
+        self.evicted_traces = 0
+        self.evicted_spans = 0
+        # highest number of traces waiting in export_queue
+        self.max_queue_depth = 0
 
         self.worker_thread = threading.Thread(target=self.worker, daemon=True)
 
@@ -77,6 +163,11 @@ class DatadogExportSpanProcessor(SpanProcessor):
         self._flushing = False
 
         self.max_trace_size = max_trace_size
+        self.max_buffered_spans = max_buffered_spans
+        self.stale_trace_timeout_millis = stale_trace_timeout_millis
+        self.max_queue_size = max_queue_size
+        self.max_export_batch_size = max_export_batch_size
+        self.queue_full_policy = queue_full_policy
         self._spans_dropped = False
         self.schedule_delay_millis = schedule_delay_millis
         self.done = False
@@ -93,12 +184,31 @@ class DatadogExportSpanProcessor(SpanProcessor):
             # span
             if self.traces_spans_count[trace_id] == self.max_trace_size:
                 logger.warning("Max spans for trace, spans will be dropped.")
-                self._spans_dropped = True
+                self._drop_span(trace_id, ctx.span_id)
+                return
+
+            # make room for the new span by evicting the least recently active
+            # traces
+            while self._buffered_spans >= self.max_buffered_spans:
+                lru_trace_id = next(iter(self.traces))
+                if lru_trace_id == trace_id:
+                    break
+                self._evict_trace(lru_trace_id)
+
+            if self._buffered_spans >= self.max_buffered_spans:
+                logger.warning(
+                    "Max buffered spans reached, spans will be dropped."
+                )
+                self._drop_span(trace_id, ctx.span_id)
                 return
 
             # add span to end of list for a trace and update the counter
+            if trace_id not in self.traces:
+                self.traces[trace_id] = []
             self.traces[trace_id].append(span)
             self.traces_spans_count[trace_id] += 1
+            self._buffered_spans += 1
+            self._touch_trace(trace_id)
 
     def on_end(self, span: Span) -> None:
         if self.done:
@@ -109,17 +219,141 @@ class DatadogExportSpanProcessor(SpanProcessor):
         trace_id = ctx.trace_id
 
         with self.traces_lock:
+            # the span was open when its trace was evicted, it must not be
+            # counted against spans started for the same trace since then
+            evicted_span_key = (trace_id, ctx.span_id)
+            if evicted_span_key in self._evicted_span_ids:
+                del self._evicted_span_ids[evicted_span_key]
+                return
+
+            # the span was dropped or its trace was evicted
+            if trace_id not in self.traces:
+                return
+            dropped_span_ids = self._traces_dropped_span_ids.get(trace_id)
+            if dropped_span_ids and ctx.span_id in dropped_span_ids:
+                dropped_span_ids.discard(ctx.span_id)
+                return
+
             self.traces_spans_ended_count[trace_id] += 1
-            if self.is_trace_exportable(trace_id):
-                self.check_traces_queue.appendleft(trace_id)
+            if not self.is_trace_exportable(trace_id):
+                self._touch_trace(trace_id)
+                return
+
+            self._enqueue_trace(self._remove_trace(trace_id), False)
+            notify_worker = (
+                len(self.export_queue) >= self.max_export_batch_size
+            )
+
+        # wake up the worker outside of traces_lock, it takes traces_lock while
+        # holding the condition to evict stale traces
+        if notify_worker:
+            with self.condition:
+                self.condition.notify()
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of traces waiting to be exported."""
+        return len(self.export_queue)
+
+    def _enqueue_trace(self, spans: typing.List[Span], partial: bool) -> None:
+        """Queues a trace for the worker thread to export.
+
+        Must be called with ``traces_lock`` held.
+        """
+        if len(self.export_queue) >= self.max_queue_size:
+            if self.queue_full_policy == DROP_NEWEST:
+                dropped_spans = spans
+            else:
+                dropped_spans, _ = self.export_queue.popleft()
+                self.export_queue.append((spans, partial))
+            self.dropped_traces += 1
+            self.dropped_spans += len(dropped_spans)
+            logger.warning("Export queue is full, trace will be dropped.")
+            return
+
+        self.export_queue.append((spans, partial))
+        self.max_queue_depth = max(
+            self.max_queue_depth, len(self.export_queue)
+        )
+
+    def _touch_trace(self, trace_id: int) -> None:
+        """Marks a trace as the most recently active one.
+
+        Must be called with ``traces_lock`` held.
+        """
+        self.traces.move_to_end(trace_id)
+        self.traces_last_active[trace_id] = _time_ns()
+
+    def _drop_span(self, trace_id: int, span_id: int) -> None:
+        """Records a span that is not buffered.
+
+        Must be called with ``traces_lock`` held.
+        """
+        self._spans_dropped = True
+        self.dropped_spans += 1
+        if trace_id in self.traces:
+            self._traces_dropped_span_ids[trace_id].add(span_id)
+
+    def _remove_trace(self, trace_id: int) -> typing.List[Span]:
+        """Stops tracking a trace and returns its spans.
+
+        Must be called with ``traces_lock`` held.
+        """
+        spans = self.traces.pop(trace_id)
+        del self.traces_spans_count[trace_id]
+        del self.traces_spans_ended_count[trace_id]
+        del self.traces_last_active[trace_id]
+        self._traces_dropped_span_ids.pop(trace_id, None)
+        self._buffered_spans -= len(spans)
+        return spans
+
+    def _evict_trace(self, trace_id: int) -> None:
+        """Evicts a trace, queueing its ended spans as a partial trace.
+
+        Must be called with ``traces_lock`` held.
+        """
+        spans = self._remove_trace(trace_id)
+        ended_spans = []
+        for span in spans:
+            if span.end_time is not None:
+                ended_spans.append(span)
+                continue
+            self._evicted_span_ids[(trace_id, span.context.span_id)] = None
+            if len(self._evicted_span_ids) > self.max_buffered_spans:
+                self._evicted_span_ids.popitem(last=False)
+
+        self.evicted_traces += 1
+        self.evicted_spans += len(ended_spans)
+        self.dropped_spans += len(spans) - len(ended_spans)
+        if ended_spans:
+            self._enqueue_trace(ended_spans, len(ended_spans) < len(spans))
+
+    def _evict_stale_traces(self) -> None:
+        if self.stale_trace_timeout_millis is None:
+            return
+
+        deadline = _time_ns() - self.stale_trace_timeout_millis * 1e6
+        with self.traces_lock:
+            while self.traces:
+                trace_id = next(iter(self.traces))
+                if self.traces_last_active[trace_id] > deadline:
+                    break
+                logger.debug("Evicting stale trace %032x.", trace_id)
+                self._evict_trace(trace_id)
 
     def worker(self):
         timeout = self.schedule_delay_millis / 1e3
         while not self.done:
             if not self._flushing:
                 with self.condition:
-                    self.condition.wait(timeout)
-                    if not self.check_traces_queue:
+                    # traces, flush requests or shutdown requested before the
+                    # condition was acquired would not notify a waiting worker
+                    if not (
+                        self.export_queue or self.flush_queue or self.done
+                    ):
+                        self.condition.wait(timeout)
+                    self._evict_stale_traces()
+                    if not self.export_queue and not self.flush_queue:
                         # spurious notification, let's wait again, reset timeout
                         timeout = self.schedule_delay_millis / 1e3
                         continue
@@ -145,40 +379,43 @@ class DatadogExportSpanProcessor(SpanProcessor):
         )
 
     def export(self) -> None:
-        """Exports traces with finished spans."""
+        """Exports the queued traces.
+
+        The traces are taken out of the queue under ``traces_lock`` and
+        exported without holding it, so spans can keep starting and ending
+        meanwhile.
+        """
         notify_flush = False
-        export_trace_ids = []
+        while self.flush_queue:
+            self.flush_queue.pop()
+            notify_flush = True
 
-        while self.check_traces_queue:
-            trace_id = self.check_traces_queue.pop()
-            if trace_id is self._FLUSH_TOKEN:
-                notify_flush = True
-            else:
-                with self.traces_lock:
-                    # check whether trace is exportable again in case that new
-                    # spans were started since we last concluded trace was
-                    # exportable
-                    if self.is_trace_exportable(trace_id):
-                        export_trace_ids.append(trace_id)
-                        del self.traces_spans_count[trace_id]
-                        del self.traces_spans_ended_count[trace_id]
-
-        if len(export_trace_ids) > 0:
+        # on_end drops the oldest queued trace when the queue is full, so the
+        # queue is swapped under traces_lock rather than popped without it
+        with self.traces_lock:
+            export_traces = list(self.export_queue)
+            self.export_queue.clear()
+
+        if len(export_traces) > 0:
             token = attach(set_value(_SUPPRESS_INSTRUMENTATION_KEY, True))
 
-            for trace_id in export_trace_ids:
-                with self.traces_lock:
+            # exporters that can flag partial traces receive whole batches
+            export_batch = getattr(self.span_exporter, "export_traces", None)
+            if callable(export_batch):
+                try:
+                    export_batch(export_traces)
+                # pylint: disable=broad-except
+                except Exception:
+                    logger.exception("Exception while exporting Span batch.")
+            else:
+                for spans, _ in export_traces:
                     try:
-                        # Ignore type b/c the Optional[None]+slicing is too "clever"
-                        # for mypy
-                        self.span_exporter.export(self.traces[trace_id])  # type: ignore
+                        self.span_exporter.export(spans)
                     # pylint: disable=broad-except
                     except Exception:
                         logger.exception(
                             "Exception while exporting Span batch."
                         )
-                    finally:
-                        del self.traces[trace_id]
 
             detach(token)
 
@@ -192,7 +429,7 @@ class DatadogExportSpanProcessor(SpanProcessor):
         Can only be called from the worker thread context because it invokes
         `export` that is not thread safe.
         """
-        while self.check_traces_queue:
+        while self.export_queue or self.flush_queue:
             self.export()
 
     def force_flush(self, timeout_millis: int = 30000) -> bool:
@@ -201,14 +438,17 @@ class DatadogExportSpanProcessor(SpanProcessor):
             return True
 
         self._flushing = True
-        self.check_traces_queue.appendleft(self._FLUSH_TOKEN)
-
-        # wake up worker thread
-        with self.condition:
-            self.condition.notify_all()
 
-        # wait for token to be processed
+        # hold flush_condition until waiting on it so that the worker cannot
+        # acknowledge the token before this thread waits for it
         with self.flush_condition:
+            self.flush_queue.appendleft(self._FLUSH_TOKEN)
+
+            # wake up worker thread
+            with self.condition:
+                self.condition.notify_all()
+
+            # wait for token to be processed
             ret = self.flush_condition.wait(timeout_millis / 1e3)
 
         self._flushing = False
@@ -0,0 +1,122 @@
+# Copyright The OpenTelemetry Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""HTTP transport to the Datadog Agent over TCP or a unix domain socket."""
+
+import http.client
+import platform
+import socket
+import threading
+import typing
+from urllib.parse import urlparse
+
+from opentelemetry.exporter.datadog.version import __version__
+
+_DEFAULT_TIMEOUT = 2.0
+
+
+class _UDSHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over a unix domain socket"""
+
+    def __init__(self, path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self._path = path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self._path)
+        self.sock = sock
+
+
+class AgentClient:
+    """Sends payloads to the Datadog Agent.
+
+    The connection to the agent is kept open and reused between requests. It
+    is reopened once when a request fails because the agent closed it.
+
+    Args:
+        agent_url: ``http``, ``https`` or ``unix`` url of the agent.
+        timeout: Timeout in seconds of the requests to the agent.
+    """
+
+    def __init__(self, agent_url: str, timeout: float = _DEFAULT_TIMEOUT):
+        url_parsed = urlparse(agent_url)
+        if url_parsed.scheme not in ("http", "https", "unix"):
+            raise ValueError(
+                f"Unknown scheme `{url_parsed.scheme}` for agent URL"
+            )
+        self._url = url_parsed
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self._connection = (
+            None
+        )  # type: typing.Optional[http.client.HTTPConnection]
+        self._headers = {
+            "Content-Type": "application/msgpack",
+            "Datadog-Meta-Lang": "python",
+            "Datadog-Meta-Lang-Version": platform.python_version(),
+            "Datadog-Meta-Lang-Interpreter": platform.python_implementation(),
+            "Datadog-Meta-Tracer-Version": __version__,
+        }
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self._url.scheme == "unix":
+            return _UDSHTTPConnection(self._url.path, self._timeout)
+        if self._url.scheme == "https":
+            return http.client.HTTPSConnection(
+                self._url.hostname, self._url.port, timeout=self._timeout
+            )
+        return http.client.HTTPConnection(
+            self._url.hostname, self._url.port, timeout=self._timeout
+        )
+
+    def _request(
+        self, path: str, payload: bytes, headers: typing.Dict[str, str]
+    ) -> int:
+        if self._connection is None:
+            self._connection = self._connect()
+        try:
+            self._connection.request(
+                "PUT", path, body=payload, headers=headers
+            )
+            response = self._connection.getresponse()
+            response.read()
+        except (http.client.HTTPException, OSError):
+            self._close()
+            raise
+        return response.status
+
+    def send(self, path: str, payload: bytes, trace_count: int) -> int:
+        """Sends a payload of ``trace_count`` traces and returns the status
+        of the response."""
+        headers = dict(self._headers)
+        headers["X-Datadog-Trace-Count"] = str(trace_count)
+
+        with self._lock:
+            try:
+                return self._request(path, payload, headers)
+            except ConnectionError:
+                # the agent may have closed the connection kept open since
+                # the previous request, retry once on a new connection
+                return self._request(path, payload, headers)
+
+    def _close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def close(self):
+        with self._lock:
+            self._close()
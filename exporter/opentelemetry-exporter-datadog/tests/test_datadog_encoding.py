@@ -0,0 +1,297 @@
+# Copyright The OpenTelemetry Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import socketserver
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import msgpack
+
+from opentelemetry import trace as trace_api
+from opentelemetry.exporter import datadog
+from opentelemetry.sdk import trace
+from opentelemetry.sdk.trace import Resource
+from opentelemetry.sdk.trace.export import SpanExportResult
+
+
+class _FakeAgentHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_PUT(self):  # pylint: disable=invalid-name
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.requests.append(
+            {
+                "path": self.path,
+                "headers": dict(self.headers),
+                "payload": msgpack.unpackb(
+                    body, raw=False, strict_map_key=False
+                ),
+                "connection": id(self.connection),
+            }
+        )
+        self.send_response(self.server.status)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class _FakeAgent(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("localhost", 0), _FakeAgentHandler)
+        self.requests = []
+        self.status = 200
+
+    @property
+    def url(self):
+        return f"http://localhost:{self.server_address[1]}"
+
+
+if hasattr(socketserver, "UnixStreamServer"):
+
+    class _FakeUDSAgent(
+        socketserver.ThreadingMixIn, socketserver.UnixStreamServer
+    ):
+        daemon_threads = True
+
+        def __init__(self, path):
+            super().__init__(path, _FakeAgentHandler)
+            self.requests = []
+            self.status = 200
+
+        def get_request(self):
+            request, _ = super().get_request()
+            # BaseHTTPRequestHandler expects a (host, port) client address
+            return request, ("localhost", 0)
+
+        @property
+        def url(self):
+            return f"unix://{self.server_address}"
+
+
+class TestDatadogAgentEncoding(unittest.TestCase):
+    def setUp(self):
+        self.agent = _FakeAgent()
+        self._start(self.agent)
+
+    def _start(self, agent):
+        thread = threading.Thread(target=agent.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(agent.server_close)
+        self.addCleanup(agent.shutdown)
+
+    def _exporter(self, agent, api_version="v0.4", **kwargs):
+        exporter = datadog.DatadogSpanExporter(
+            agent_url=agent.url, api_version=api_version, **kwargs
+        )
+        self.addCleanup(exporter.shutdown)
+        return exporter
+
+    @staticmethod
+    def _tracer(exporter):
+        span_processor = datadog.DatadogExportSpanProcessor(exporter)
+        tracer_provider = trace.TracerProvider(
+            resource=Resource(
+                {"service.name": "test-service", "deployment": "test"}
+            )
+        )
+        tracer_provider.add_span_processor(span_processor)
+        return tracer_provider, tracer_provider.get_tracer(__name__)
+
+    def test_export_v04(self):
+        exporter = self._exporter(self.agent, env="test", version="1.0")
+        tracer_provider, tracer = self._tracer(exporter)
+
+        with tracer.start_as_current_span("root", attributes={"count": 2}):
+            with tracer.start_span("child", attributes={"flag": True}):
+                pass
+        with tracer.start_span("other"):
+            pass
+
+        tracer_provider.force_flush()
+        tracer_provider.shutdown()
+
+        self.assertEqual(len(self.agent.requests), 1)
+        request = self.agent.requests[0]
+        self.assertEqual(request["path"], "/v0.4/traces")
+        self.assertEqual(request["headers"]["X-Datadog-Trace-Count"], "2")
+        self.assertEqual(
+            request["headers"]["Content-Type"], "application/msgpack"
+        )
+
+        payload = request["payload"]
+        self.assertEqual(
+            [[span["resource"] for span in trace] for trace in payload],
+            [["root", "child"], ["other"]],
+        )
+        root, child = payload[0]
+        self.assertEqual(child["trace_id"], root["trace_id"])
+        self.assertEqual(child["parent_id"], root["span_id"])
+        self.assertEqual(root["parent_id"], 0)
+        self.assertEqual(root["service"], "test-service")
+        self.assertEqual(root["error"], 0)
+        self.assertGreater(root["duration"], 0)
+        self.assertEqual(root["metrics"], {"count": 2})
+        self.assertEqual(
+            root["meta"],
+            {"deployment": "test", "env": "test", "version": "1.0"},
+        )
+        self.assertEqual(
+            child["meta"],
+            {"deployment": "test", "env": "test", "flag": "True"},
+        )
+
+    def test_export_http_status_code(self):
+        exporter = self._exporter(self.agent)
+        tracer_provider, tracer = self._tracer(exporter)
+
+        with tracer.start_span(
+            "GET", attributes={"http.method": "GET", "http.status_code": 200}
+        ):
+            pass
+
+        tracer_provider.shutdown()
+
+        (span,) = self.agent.requests[0]["payload"][0]
+        self.assertEqual(span["meta"]["http.status_code"], "200")
+        self.assertNotIn("metrics", span)
+
+    def test_export_v05(self):
+        exporter = self._exporter(
+            self.agent, api_version="v0.5", env="test", version="1.0"
+        )
+        tracer_provider, tracer = self._tracer(exporter)
+
+        with tracer.start_as_current_span("root", attributes={"count": 2}):
+            with tracer.start_span("child", attributes={"flag": True}):
+                pass
+        with tracer.start_span("other"):
+            pass
+
+        tracer_provider.force_flush()
+        tracer_provider.shutdown()
+
+        self.assertEqual(len(self.agent.requests), 1)
+        request = self.agent.requests[0]
+        self.assertEqual(request["path"], "/v0.5/traces")
+        self.assertEqual(request["headers"]["X-Datadog-Trace-Count"], "2")
+
+        strings, traces = request["payload"]
+        self.assertEqual(strings[0], "")
+        # every string is only sent once
+        self.assertEqual(len(strings), len(set(strings)))
+        self.assertEqual(
+            [[strings[span[2]] for span in trace] for trace in traces],
+            [["root", "child"], ["other"]],
+        )
+        root, child = traces[0]
+        self.assertEqual(len(root), 12)
+        self.assertEqual(strings[root[0]], "test-service")
+        self.assertEqual(child[0], root[0])
+        self.assertEqual(child[3], root[3])
+        self.assertEqual(child[5], root[4])
+        self.assertEqual(root[5], 0)
+        self.assertGreater(root[7], 0)
+        self.assertEqual(root[8], 0)
+        self.assertEqual(
+            {strings[key]: value for key, value in root[10].items()},
+            {"count": 2},
+        )
+        self.assertEqual(
+            {strings[key]: strings[value] for key, value in child[9].items()},
+            {"deployment": "test", "env": "test", "flag": "True"},
+        )
+        self.assertEqual(strings[root[11]], "")
+
+    def test_connection_reused(self):
+        exporter = self._exporter(self.agent)
+        tracer_provider, tracer = self._tracer(exporter)
+
+        for name in ("foo", "bar"):
+            with tracer.start_span(name):
+                pass
+            tracer_provider.force_flush()
+        tracer_provider.shutdown()
+
+        self.assertEqual(len(self.agent.requests), 2)
+        self.assertEqual(
+            self.agent.requests[0]["connection"],
+            self.agent.requests[1]["connection"],
+        )
+
+    def test_export_groups_spans_by_trace(self):
+        exporter = self._exporter(self.agent)
+        spans = []
+        for trace_id, span_id in ((1, 1), (2, 2), (1, 3)):
+            span = trace._Span(  # pylint: disable=protected-access
+                str(span_id),
+                context=trace_api.SpanContext(
+                    trace_id=trace_id, span_id=span_id, is_remote=False
+                ),
+            )
+            span.start()
+            span.end()
+            spans.append(span)
+
+        self.assertEqual(exporter.export(spans), SpanExportResult.SUCCESS)
+
+        payload = self.agent.requests[0]["payload"]
+        self.assertEqual(
+            [[span["span_id"] for span in trace] for trace in payload],
+            [[1, 3], [2]],
+        )
+
+    def test_agent_error(self):
+        self.agent.status = 500
+        exporter = self._exporter(self.agent)
+        span = trace._Span(  # pylint: disable=protected-access
+            "foo",
+            context=trace_api.SpanContext(
+                trace_id=1, span_id=1, is_remote=False
+            ),
+        )
+        span.start()
+        span.end()
+
+        with self.assertLogs(level="ERROR"):
+            self.assertEqual(exporter.export([span]), SpanExportResult.FAILURE)
+
+    def test_invalid_api_version(self):
+        with self.assertRaises(ValueError):
+            datadog.DatadogSpanExporter(api_version="v0.1")
+
+    @unittest.skipIf(
+        sys.platform == "win32", reason="unix sockets are not available"
+    )
+    def test_unix_socket(self):
+        with tempfile.TemporaryDirectory() as directory:
+            agent = _FakeUDSAgent(os.path.join(directory, "apm.socket"))
+            self._start(agent)
+            exporter = self._exporter(agent)
+            tracer_provider, tracer = self._tracer(exporter)
+
+            with tracer.start_span("foo"):
+                pass
+            tracer_provider.shutdown()
+
+        self.assertEqual(len(agent.requests), 1)
+        self.assertEqual(agent.requests[0]["payload"][0][0]["resource"], "foo")
@@ -15,6 +15,7 @@
 import itertools
 import logging
 import sys
+import threading
 import time
 import unittest
 from unittest import mock
@@ -518,17 +519,23 @@ class TestDatadogSpanExporter(unittest.TestCase):
             with tracer.start_span("foo"):
                 pass
 
-            # give some time for exporter to loop
-            # since wait is mocked it should return immediately
-            time.sleep(0.1)
-            mock_wait_calls = list(mock_wait.mock_calls)
+            # give some time for exporter to loop, the worker may still be in
+            # a real wait when the span ends
+            # since wait is mocked it should return immediately afterwards
+            after_calls = None
+            deadline = time.time() + 1
+            while not after_calls and time.time() < deadline:
+                time.sleep(0.05)
+                mock_wait_calls = list(mock_wait.mock_calls)
 
-            # find the index of the call that processed the singular span
-            for idx, wait_call in enumerate(mock_wait_calls):
-                _, args, __ = wait_call
-                if args[0] <= 0:
-                    after_calls = mock_wait_calls[idx + 1 :]
-                    break
+                # find the index of the call that processed the singular span
+                for idx, wait_call in enumerate(mock_wait_calls):
+                    _, args, __ = wait_call
+                    if args[0] <= 0:
+                        after_calls = mock_wait_calls[idx + 1 :]
+                        break
+
+            self.assertTrue(after_calls)
 
             self.assertTrue(
                 all(args[0] >= 0.05 for _, args, __ in after_calls)
@@ -536,6 +543,247 @@ class TestDatadogSpanExporter(unittest.TestCase):
 
         span_processor.shutdown()
 
+    def test_span_processor_max_buffered_spans(self):
+        """Test that the least recently active trace is evicted"""
+        span_processor = datadog.DatadogExportSpanProcessor(
+            self.exporter, max_buffered_spans=2
+        )
+        tracer_provider = trace.TracerProvider()
+        tracer_provider.add_span_processor(span_processor)
+        tracer = tracer_provider.get_tracer(__name__)
+
+        root = tracer.start_span("root")
+        with tracer.start_span(
+            "child", context=trace_api.set_span_in_context(root)
+        ):
+            pass
+
+        # evicts the trace of root, whose child is exported as partial trace
+        with tracer.start_span("other"):
+            pass
+        root.end()
+
+        self.assertTrue(span_processor.force_flush())
+        datadog_spans = get_spans(tracer, self.exporter)
+        self.assertEqual(
+            [span["resource"] for span in datadog_spans], ["child", "other"]
+        )
+        self.assertEqual(
+            datadog_spans[0]["meta"][datadog.constants.PARTIAL_TRACE_TAG_KEY],
+            "true",
+        )
+        self.assertNotIn(
+            datadog.constants.PARTIAL_TRACE_TAG_KEY,
+            datadog_spans[1].get("meta", {}),
+        )
+        self.assertEqual(span_processor.evicted_traces, 1)
+        self.assertEqual(span_processor.evicted_spans, 1)
+        self.assertEqual(span_processor.dropped_spans, 1)
+        self.assertEqual(span_processor.traces, {})
+        tracer_provider.shutdown()
+
+    def test_span_processor_evicted_late_spans(self):
+        """Test that spans ending after the eviction of their trace are not
+        counted against spans started for the same trace since then"""
+        span_processor = datadog.DatadogExportSpanProcessor(
+            self.exporter, max_buffered_spans=2
+        )
+        tracer_provider = trace.TracerProvider()
+        tracer_provider.add_span_processor(span_processor)
+        tracer = tracer_provider.get_tracer(__name__)
+
+        root = tracer.start_span("root")
+        root_context = trace_api.set_span_in_context(root)
+        child = tracer.start_span("child", context=root_context)
+        # evicts the trace of root, both spans are still open
+        other = tracer.start_span("other")
+        late_child = tracer.start_span("late_child", context=root_context)
+        trace_id = root.get_span_context().trace_id
+
+        child.end()
+        self.assertIn(trace_id, span_processor.traces)
+        root.end()
+        self.assertIn(trace_id, span_processor.traces)
+        late_child.end()
+        self.assertNotIn(trace_id, span_processor.traces)
+        other.end()
+
+        self.assertTrue(span_processor.force_flush())
+        datadog_spans = get_spans(tracer, self.exporter)
+        self.assertEqual(
+            [span["resource"] for span in datadog_spans],
+            ["late_child", "other"],
+        )
+        self.assertEqual(span_processor.dropped_spans, 2)
+        # pylint: disable=protected-access
+        self.assertFalse(span_processor._evicted_span_ids)
+        tracer_provider.shutdown()
+
+    def test_span_processor_export_traces_duck_typed(self):
+        """Test that any exporter with export_traces receives the partial
+        flag of the traces"""
+        exporter = mock.Mock(spec=["export", "export_traces", "shutdown"])
+        span_processor = datadog.DatadogExportSpanProcessor(
+            exporter, max_buffered_spans=2
+        )
+        tracer_provider = trace.TracerProvider()
+        tracer_provider.add_span_processor(span_processor)
+        tracer = tracer_provider.get_tracer(__name__)
+
+        root = tracer.start_span("root")
+        with tracer.start_span(
+            "child", context=trace_api.set_span_in_context(root)
+        ):
+            pass
+        with tracer.start_span("other"):
+            pass
+        root.end()
+
+        self.assertTrue(span_processor.force_flush())
+        traces = [
+            (spans[0].name, partial)
+            for call_args in exporter.export_traces.call_args_list
+            for spans, partial in call_args[0][0]
+        ]
+        self.assertEqual(traces, [("child", True), ("other", False)])
+        self.assertFalse(exporter.export.called)
+        tracer_provider.shutdown()
+
+    def test_span_processor_stale_traces(self):
+        """Test that traces without activity are evicted"""
+        span_processor = datadog.DatadogExportSpanProcessor(
+            self.exporter,
+            schedule_delay_millis=10,
+            stale_trace_timeout_millis=50,
+        )
+        tracer_provider = trace.TracerProvider()
+        tracer_provider.add_span_processor(span_processor)
+        tracer = tracer_provider.get_tracer(__name__)
+
+        root = tracer.start_span("root")
+        with tracer.start_span(
+            "child", context=trace_api.set_span_in_context(root)
+        ):
+            pass
+
+        time.sleep(0.2)
+        datadog_spans = get_spans(tracer, self.exporter, shutdown=False)
+        self.assertEqual(
+            [span["resource"] for span in datadog_spans], ["child"]
+        )
+        self.assertEqual(span_processor.evicted_traces, 1)
+        self.assertEqual(span_processor.traces, {})
+
+        # ending the leaked root later does not export anything
+        root.end()
+        self.assertTrue(span_processor.force_flush())
+        self.assertEqual(len(get_spans(tracer, self.exporter)), 1)
+        tracer_provider.shutdown()
+
+    def test_span_processor_queue_full_policy(self):
+        """Test that traces are dropped when the export queue is full"""
+        for policy, expected in (
+            (datadog.spanprocessor.DROP_OLDEST, ["bar", "baz"]),
+            (datadog.spanprocessor.DROP_NEWEST, ["foo", "bar"]),
+        ):
+            with self.subTest(policy=policy):
+                exporter = MockDatadogSpanExporter()
+                span_processor = datadog.DatadogExportSpanProcessor(
+                    exporter,
+                    max_queue_size=2,
+                    max_export_batch_size=2,
+                    queue_full_policy=policy,
+                )
+                tracer_provider = trace.TracerProvider()
+                tracer_provider.add_span_processor(span_processor)
+                tracer = tracer_provider.get_tracer(__name__)
+
+                # keep the worker from exporting before the queue is full
+                with mock.patch.object(span_processor.condition, "notify"):
+                    for name in ("foo", "bar", "baz"):
+                        with tracer.start_span(name):
+                            pass
+
+                self.assertEqual(span_processor.queue_depth, 2)
+                self.assertEqual(span_processor.max_queue_depth, 2)
+                self.assertEqual(span_processor.dropped_traces, 1)
+                self.assertEqual(span_processor.dropped_spans, 1)
+
+                self.assertTrue(span_processor.force_flush())
+                self.assertEqual(span_processor.queue_depth, 0)
+                datadog_spans = get_spans(tracer, exporter)
+                self.assertEqual(
+                    [span["resource"] for span in datadog_spans], expected
+                )
+                tracer_provider.shutdown()
+
+    def test_span_processor_concurrent_queue_full(self):
+        """Test that dropping queued traces races safely with the worker"""
+        exporter = MockDatadogSpanExporter()
+        span_processor = datadog.DatadogExportSpanProcessor(
+            exporter,
+            schedule_delay_millis=1,
+            max_queue_size=2,
+            max_export_batch_size=1,
+        )
+        tracer_provider = trace.TracerProvider()
+        tracer_provider.add_span_processor(span_processor)
+        tracer = tracer_provider.get_tracer(__name__)
+
+        errors = []
+
+        def create_spans():
+            try:
+                for _ in range(500):
+                    with tracer.start_span("foo"):
+                        pass
+            # pylint: disable=broad-except
+            except Exception as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=create_spans) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertTrue(span_processor.force_flush())
+        datadog_spans = get_spans(tracer, exporter)
+        self.assertEqual(
+            len(datadog_spans) + span_processor.dropped_spans, 2000
+        )
+
+    def test_span_processor_exports_without_lock(self):
+        """Test that traces are exported without holding traces_lock"""
+        exporter = MockDatadogSpanExporter()
+        span_processor = datadog.DatadogExportSpanProcessor(exporter)
+        locked = []
+        exporter.agent_writer.write.side_effect = lambda spans: locked.append(
+            span_processor.traces_lock.locked()
+        )
+        tracer_provider = trace.TracerProvider()
+        tracer_provider.add_span_processor(span_processor)
+        tracer = tracer_provider.get_tracer(__name__)
+
+        for name in ("foo", "bar"):
+            with tracer.start_span(name):
+                pass
+
+        self.assertTrue(span_processor.force_flush())
+        self.assertEqual(locked, [False, False])
+        tracer_provider.shutdown()
+
+    def test_span_processor_invalid_queue_options(self):
+        with self.assertRaises(ValueError):
+            datadog.DatadogExportSpanProcessor(
+                self.exporter, max_queue_size=8, max_export_batch_size=16
+            )
+        with self.assertRaises(ValueError):
+            datadog.DatadogExportSpanProcessor(
+                self.exporter, queue_full_policy="block"
+            )
+
     def test_span_processor_accepts_parent_context(self):
         span_processor = mock.Mock(
             wraps=datadog.DatadogExportSpanProcessor(self.exporter)
@@ -630,6 +878,54 @@ class TestDatadogSpanExporter(unittest.TestCase):
         expected = [0.5]
         self.assertListEqual(actual, expected)
 
+    def test_translation_caches(self):
+        resource = Resource(
+            attributes={"key_resource": "some_resource", "service.name": "svc"}
+        )
+        spans = []
+        for index in range(3):
+            span = trace._Span(
+                name=str(index),
+                context=trace_api.SpanContext(
+                    trace_id=0x000000000000000000000000DEADBEEF,
+                    span_id=index + 1,
+                    is_remote=False,
+                ),
+                resource=resource,
+                instrumentation_info=InstrumentationInfo(
+                    "opentelemetry.instrumentation.redis", "0"
+                ),
+                kind=trace_api.SpanKind.CLIENT,
+            )
+            span.start()
+            span.end()
+            spans.append(span)
+
+        # pylint: disable=protected-access
+        exporter = datadog.DatadogSpanExporter()
+        with mock.patch(
+            "opentelemetry.exporter.datadog.exporter._extract_tags_from_resource",
+            wraps=datadog.exporter._extract_tags_from_resource,
+        ) as extract_tags, mock.patch(
+            "opentelemetry.trace.get_tracer_provider",
+            wraps=trace_api.get_tracer_provider,
+        ) as get_tracer_provider:
+            datadog_spans = [
+                span.to_dict()
+                for span in exporter._translate_to_datadog(spans)
+                + exporter._translate_to_datadog(spans)
+            ]
+
+        self.assertEqual(extract_tags.call_count, 1)
+        self.assertEqual(get_tracer_provider.call_count, 2)
+        for span in datadog_spans:
+            self.assertEqual(span["service"], "svc")
+            self.assertEqual(span["meta"]["key_resource"], "some_resource")
+            self.assertEqual(span["type"], "redis")
+            self.assertEqual(
+                span["name"], "opentelemetry.instrumentation.redis.CLIENT"
+            )
+
     def test_service_name_fallback(self):
         context = trace_api.SpanContext(
             trace_id=0x000000000000000000000000DEADBEEF,
@@ -101,8 +101,10 @@ class AsyncCursorTracer(CursorTracer):
         cursor,
         query_method: typing.Callable[..., typing.Any],
         *args: typing.Tuple[typing.Any, typing.Any],
+        executemany: bool = False,
         **kwargs: typing.Dict[typing.Any, typing.Any]
     ):
+        self._description = (None, None)
         name = ""
         if args:
             name = self.get_operation_name(cursor, args)
@@ -117,7 +119,7 @@ class AsyncCursorTracer(CursorTracer):
         with self._db_api_integration._tracer.start_as_current_span(
             name, kind=SpanKind.CLIENT
         ) as span:
-            self._populate_span(span, cursor, *args)
+            self._populate_span(span, cursor, *args, executemany=executemany)
             return await query_method(*args, **kwargs)
 
 
@@ -139,7 +141,11 @@ def get_traced_cursor_proxy(cursor, db_api_integration, *args, **kwargs):
 
         async def executemany(self, *args, **kwargs):
             result = await _traced_cursor.traced_execution(
-                self, self.__wrapped__.executemany, *args, **kwargs
+                self,
+                self.__wrapped__.executemany,
+                *args,
+                executemany=True,
+                **kwargs
             )
             return result
 
@@ -91,6 +91,17 @@ The client response hook is called with the internal span and an ASGI event whic
 
    OpenTelemetryMiddleware().(application, server_request_hook=server_request_hook, client_request_hook=client_request_hook, client_response_hook=client_response_hook)
 
+Aggregating ASGI messages
+*************************
+By default an internal span is created for every message received or sent by the application. Streaming responses and
+long-lived websockets can send thousands of messages per request, the ``aggregated_message_types`` argument lists the
+message types which are instead summarized on the server span with ``asgi.<type>.count`` and ``asgi.<type>.size``
+attributes and ``asgi.message.first``/``asgi.message.last`` events.
+
+.. code-block:: python
+
+    app = OpenTelemetryMiddleware(app, aggregated_message_types=["http.response.body", "websocket.send"])
+
 Capture HTTP request and response headers
 *****************************************
 You can configure the agent to capture predefined HTTP headers as span attributes, according to the `semantic convention <https://github.com/open-telemetry/opentelemetry-specification/blob/main/specification/trace/semantic_conventions/http.md#http-request-and-response-headers>`_.
@@ -139,6 +150,9 @@ The value of the attribute will be single item list containing all the header va
 Example of the added span attribute,
 ``http.response.header.custom_response_header = ["<value1>,<value2>"]``
 
+The headers to capture are read from the environment when the middleware is created. Call
+``OpenTelemetryMiddleware.reload_custom_headers`` to apply changes made to these environment variables afterwards.
+
 Note:
     Environment variable names to caputre http headers are still experimental, and thus are subject to change.
 
@@ -166,6 +180,7 @@ from opentelemetry.propagators.textmap import Getter, Setter
 from opentelemetry.semconv.trace import SpanAttributes
 from opentelemetry.trace import Span, set_span_in_context
 from opentelemetry.trace.status import Status, StatusCode
+from opentelemetry.util._time import _time_ns
 from opentelemetry.util.http import (
     OTEL_INSTRUMENTATION_HTTP_CAPTURE_HEADERS_SERVER_REQUEST,
     OTEL_INSTRUMENTATION_HTTP_CAPTURE_HEADERS_SERVER_RESPONSE,
@@ -180,6 +195,13 @@ _ClientRequestHookT = typing.Optional[typing.Callable[[Span, dict], None]]
 _ClientResponseHookT = typing.Optional[typing.Callable[[Span, dict], None]]
 
 
+def _index_headers(headers) -> typing.Dict[bytes, typing.List[bytes]]:
+    index = {}
+    for key, value in headers:
+        index.setdefault(key, []).append(value)
+    return index
+
+
 class ASGIGetter(Getter):
     def get(
         self, carrier: dict, key: str
@@ -194,24 +216,42 @@ class ASGIGetter(Getter):
             A list with a single string with the header value if it exists,
                 else None.
         """
-        headers = carrier.get("headers")
-        if not headers:
-            return None
-
         # asgi header keys are in lower case
-        key = key.lower()
-        decoded = [
-            _value.decode("utf8")
-            for (_key, _value) in headers
-            if _key.decode("utf8") == key
-        ]
-        if not decoded:
+        values = self._get_headers_index(carrier).get(
+            key.lower().encode("utf8")
+        )
+        if not values:
             return None
-        return decoded
+        return [value.decode("utf8") for value in values]
 
     def keys(self, carrier: dict) -> typing.List[str]:
         return list(carrier.keys())
 
+    def _get_headers_index(  # pylint: disable=no-self-use
+        self, carrier: dict
+    ) -> typing.Dict[bytes, typing.List[bytes]]:
+        """Returns the headers of the carrier indexed by name"""
+        return _index_headers(carrier.get("headers") or ())
+
+
+class _RequestASGIGetter(ASGIGetter):
+    """Getter sharing an index of the headers of a request scope between
+    all the header lookups of the middleware.
+
+    The index is built when the middleware receives the request, before the
+    application can change the headers, and only lives as long as the
+    middleware call.
+    """
+
+    def __init__(self, scope: dict):
+        self._scope = scope
+        self._index = _index_headers(scope.get("headers") or ())
+
+    def _get_headers_index(self, carrier):
+        if carrier is self._scope:
+            return self._index
+        return super()._get_headers_index(carrier)
+
 
 asgi_getter = ASGIGetter()
 
@@ -240,7 +280,7 @@ class ASGISetter(Setter):
 asgi_setter = ASGISetter()
 
 
-def collect_request_attributes(scope):
+def collect_request_attributes(scope, getter=asgi_getter):
     """Collects HTTP request attributes from the ASGI scope and returns a
     dictionary to be used as span creation attributes."""
     server_host, port, http_url = get_host_port_url_tuple(scope)
@@ -262,12 +302,12 @@ def collect_request_attributes(scope):
     if http_method:
         result[SpanAttributes.HTTP_METHOD] = http_method
 
-    http_host_value_list = asgi_getter.get(scope, "host")
+    http_host_value_list = getter.get(scope, "host")
     if http_host_value_list:
         result[SpanAttributes.HTTP_SERVER_NAME] = ",".join(
             http_host_value_list
         )
-    http_user_agent = asgi_getter.get(scope, "user-agent")
+    http_user_agent = getter.get(scope, "user-agent")
     if http_user_agent:
         result[SpanAttributes.HTTP_USER_AGENT] = http_user_agent[0]
 
@@ -281,41 +321,89 @@ def collect_request_attributes(scope):
     return result
 
 
-def collect_custom_request_headers_attributes(scope):
-    """returns custom HTTP request headers to be added into SERVER span as span attributes
-    Refer specification https://github.com/open-telemetry/opentelemetry-specification/blob/main/specification/trace/semantic_conventions/http.md#http-request-and-response-headers"""
+def _get_custom_headers_attribute_names(env_var, normalise_header_name):
+    return {
+        header.lower().encode("utf8"): normalise_header_name(header)
+        for header in get_custom_headers(env_var)
+    }
 
-    attributes = {}
-    custom_request_headers = get_custom_headers(
-        OTEL_INSTRUMENTATION_HTTP_CAPTURE_HEADERS_SERVER_REQUEST
+
+def get_custom_request_headers_attribute_names() -> typing.Dict[bytes, str]:
+    """Returns the request headers configured to be captured, mapped from
+    their lowercase encoded names to the span attribute names."""
+    return _get_custom_headers_attribute_names(
+        OTEL_INSTRUMENTATION_HTTP_CAPTURE_HEADERS_SERVER_REQUEST,
+        normalise_request_header_name,
     )
 
-    for header in custom_request_headers:
-        values = asgi_getter.get(scope, header)
-        if values:
-            key = normalise_request_header_name(header)
-            attributes.setdefault(key, []).extend(values)
 
-    return attributes
+def get_custom_response_headers_attribute_names() -> typing.Dict[bytes, str]:
+    """Returns the response headers configured to be captured, mapped from
+    their lowercase encoded names to the span attribute names."""
+    return _get_custom_headers_attribute_names(
+        OTEL_INSTRUMENTATION_HTTP_CAPTURE_HEADERS_SERVER_RESPONSE,
+        normalise_response_header_name,
+    )
 
 
-def collect_custom_response_headers_attributes(message):
-    """returns custom HTTP response headers to be added into SERVER span as span attributes
-    Refer specification https://github.com/open-telemetry/opentelemetry-specification/blob/main/specification/trace/semantic_conventions/http.md#http-request-and-response-headers"""
+def _collect_custom_headers_attributes(
+    carrier, headers_attribute_names, getter=asgi_getter
+):
     attributes = {}
-    custom_response_headers = get_custom_headers(
-        OTEL_INSTRUMENTATION_HTTP_CAPTURE_HEADERS_SERVER_RESPONSE
-    )
+    if not headers_attribute_names or not carrier.get("headers"):
+        return attributes
 
-    for header in custom_response_headers:
-        values = asgi_getter.get(message, header)
+    # pylint: disable=protected-access
+    index = getter._get_headers_index(carrier)
+    for key, attribute_name in headers_attribute_names.items():
+        values = index.get(key)
         if values:
-            key = normalise_response_header_name(header)
-            attributes.setdefault(key, []).extend(values)
+            attributes.setdefault(attribute_name, []).extend(
+                value.decode("utf8") for value in values
+            )
 
     return attributes
 
 
+def collect_custom_request_headers_attributes(
+    scope, headers_attribute_names=None, getter=asgi_getter
+):
+    """returns custom HTTP request headers to be added into SERVER span as span attributes
+    Refer specification https://github.com/open-telemetry/opentelemetry-specification/blob/main/specification/trace/semantic_conventions/http.md#http-request-and-response-headers
+
+    Args:
+        scope: ASGI scope object
+        headers_attribute_names: Headers to capture as returned by
+            `get_custom_request_headers_attribute_names`. If omitted, the
+            configuration is read from the environment.
+        getter: The `ASGIGetter` reading the headers of the scope.
+    """
+    if headers_attribute_names is None:
+        headers_attribute_names = get_custom_request_headers_attribute_names()
+
+    return _collect_custom_headers_attributes(
+        scope, headers_attribute_names, getter
+    )
+
+
+def collect_custom_response_headers_attributes(
+    message, headers_attribute_names=None
+):
+    """returns custom HTTP response headers to be added into SERVER span as span attributes
+    Refer specification https://github.com/open-telemetry/opentelemetry-specification/blob/main/specification/trace/semantic_conventions/http.md#http-request-and-response-headers
+
+    Args:
+        message: ASGI event object
+        headers_attribute_names: Headers to capture as returned by
+            `get_custom_response_headers_attribute_names`. If omitted, the
+            configuration is read from the environment.
+    """
+    if headers_attribute_names is None:
+        headers_attribute_names = get_custom_response_headers_attribute_names()
+
+    return _collect_custom_headers_attributes(message, headers_attribute_names)
+
+
 def get_host_port_url_tuple(scope):
     """Returns (host, port, full_url) tuple."""
     server = scope.get("server") or ["0.0.0.0", 80]
@@ -361,6 +449,60 @@ def get_default_span_details(scope: dict) -> Tuple[str, dict]:
     return span_name, {}
 
 
+def _get_message_size(message: dict) -> int:
+    """Returns the size of the body of an ASGI message, in characters for
+    websocket text messages and in bytes otherwise."""
+    body = message.get("body")
+    if body is None:
+        body = message.get("bytes")
+    if body is None:
+        body = message.get("text")
+    return len(body) if body else 0
+
+
+class _MessageAggregator:
+    """Summarizes the ASGI messages of a request on its server span.
+
+    For each aggregated message type, the number of messages and the total
+    size of their bodies are recorded as ``asgi.<type>.count`` and
+    ``asgi.<type>.size`` attributes, and the times of the first and last
+    messages as ``asgi.message.first`` and ``asgi.message.last`` events.
+    """
+
+    def __init__(self, message_types: typing.Collection[str]):
+        self._message_types = message_types
+        # message type -> [count, size, first timestamp, last timestamp]
+        self._stats = {}
+
+    def add(self, message: dict) -> bool:
+        """Records the message if its type is aggregated, returns whether it
+        was recorded."""
+        message_type = message["type"]
+        if message_type not in self._message_types:
+            return False
+        now = _time_ns()
+        stats = self._stats.get(message_type)
+        if stats is None:
+            stats = self._stats[message_type] = [0, 0, now, now]
+        stats[0] += 1
+        stats[1] += _get_message_size(message)
+        stats[3] = now
+        return True
+
+    def finish(self, span: Span):
+        if not span.is_recording():
+            return
+        for message_type, (count, size, first, last) in self._stats.items():
+            span.set_attribute(f"asgi.{message_type}.count", count)
+            span.set_attribute(f"asgi.{message_type}.size", size)
+            span.add_event(
+                "asgi.message.first", {"type": message_type}, timestamp=first
+            )
+            span.add_event(
+                "asgi.message.last", {"type": message_type}, timestamp=last
+            )
+
+
 class OpenTelemetryMiddleware:
     """The ASGI application middleware.
 
@@ -380,6 +522,11 @@ class OpenTelemetryMiddleware:
                       event which is sent as a dictionary for when the method send is called.
         tracer_provider: The optional tracer provider to use. If omitted
             the current globally configured one is used.
+        aggregated_message_types: Optional collection of ASGI message types,
+            e.g. ``http.response.body`` or ``websocket.send``, which are not
+            traced with a span per message. Their count, size and first and
+            last timestamps are recorded on the server span instead. The
+            client request and response hooks are not called for them.
     """
 
     def __init__(
@@ -391,6 +538,9 @@ class OpenTelemetryMiddleware:
         client_request_hook: _ClientRequestHookT = None,
         client_response_hook: _ClientResponseHookT = None,
         tracer_provider=None,
+        aggregated_message_types: typing.Optional[
+            typing.Collection[str]
+        ] = None,
     ):
         self.app = guarantee_single_callable(app)
         self.tracer = trace.get_tracer(__name__, __version__, tracer_provider)
@@ -401,6 +551,24 @@ class OpenTelemetryMiddleware:
         self.server_request_hook = server_request_hook
         self.client_request_hook = client_request_hook
         self.client_response_hook = client_response_hook
+        self.aggregated_message_types = frozenset(
+            aggregated_message_types or ()
+        )
+        self.reload_custom_headers()
+
+    def reload_custom_headers(self):
+        """Reads again the request and response headers to capture from the
+        environment.
+
+        The configuration is read once when the middleware is created, call
+        this method to apply later changes.
+        """
+        self._custom_request_headers = (
+            get_custom_request_headers_attribute_names()
+        )
+        self._custom_response_headers = (
+            get_custom_response_headers_attribute_names()
+        )
 
     async def __call__(self, scope, receive, send):
         """The ASGI application
@@ -419,25 +587,28 @@ class OpenTelemetryMiddleware:
 
         span_name, additional_attributes = self.default_span_details(scope)
 
+        getter = _RequestASGIGetter(scope)
         span, token = _start_internal_or_server_span(
             tracer=self.tracer,
             span_name=span_name,
             start_time=None,
             context_carrier=scope,
-            context_getter=asgi_getter,
+            context_getter=getter,
         )
 
         try:
             with trace.use_span(span, end_on_exit=True) as current_span:
                 if current_span.is_recording():
-                    attributes = collect_request_attributes(scope)
+                    attributes = collect_request_attributes(scope, getter)
                     attributes.update(additional_attributes)
                     for key, value in attributes.items():
                         current_span.set_attribute(key, value)
 
                     if current_span.kind == trace.SpanKind.SERVER:
                         custom_attributes = (
-                            collect_custom_request_headers_attributes(scope)
+                            collect_custom_request_headers_attributes(
+                                scope, self._custom_request_headers, getter
+                            )
                         )
                         if len(custom_attributes) > 0:
                             current_span.set_attributes(custom_attributes)
@@ -445,8 +616,14 @@ class OpenTelemetryMiddleware:
                 if callable(self.server_request_hook):
                     self.server_request_hook(current_span, scope)
 
+                aggregator = None
+                if self.aggregated_message_types:
+                    aggregator = _MessageAggregator(
+                        self.aggregated_message_types
+                    )
+
                 otel_receive = self._get_otel_receive(
-                    span_name, scope, receive
+                    span_name, scope, receive, aggregator
                 )
 
                 otel_send = self._get_otel_send(
@@ -454,70 +631,110 @@ class OpenTelemetryMiddleware:
                     span_name,
                     scope,
                     send,
+                    aggregator,
                 )
 
-                await self.app(scope, otel_receive, otel_send)
+                try:
+                    await self.app(scope, otel_receive, otel_send)
+                finally:
+                    if aggregator is not None:
+                        aggregator.finish(current_span)
         finally:
             if token:
                 context.detach(token)
 
-    def _get_otel_receive(self, server_span_name, scope, receive):
+    def _get_otel_receive(
+        self, server_span_name, scope, receive, aggregator=None
+    ):
+        receive_span_name = " ".join(
+            (server_span_name, scope["type"], "receive")
+        )
+
+        def _trace_message(receive_span, message):
+            if receive_span.is_recording():
+                if message["type"] == "websocket.receive":
+                    set_status_code(receive_span, 200)
+                receive_span.set_attribute("type", message["type"])
+
         @wraps(receive)
         async def otel_receive():
-            with self.tracer.start_as_current_span(
-                " ".join((server_span_name, scope["type"], "receive"))
-            ) as receive_span:
-                if callable(self.client_request_hook):
-                    self.client_request_hook(receive_span, scope)
-                message = await receive()
-                if receive_span.is_recording():
-                    if message["type"] == "websocket.receive":
-                        set_status_code(receive_span, 200)
-                    receive_span.set_attribute("type", message["type"])
+            if aggregator is None:
+                with self.tracer.start_as_current_span(
+                    receive_span_name
+                ) as receive_span:
+                    if callable(self.client_request_hook):
+                        self.client_request_hook(receive_span, scope)
+                    message = await receive()
+                    _trace_message(receive_span, message)
+                return message
+
+            # The type of the message is only known once it is received, the
+            # span of a message which is not aggregated is created afterwards.
+            start_time = _time_ns()
+            message = await receive()
+            if not aggregator.add(message):
+                with self.tracer.start_as_current_span(
+                    receive_span_name, start_time=start_time
+                ) as receive_span:
+                    if callable(self.client_request_hook):
+                        self.client_request_hook(receive_span, scope)
+                    _trace_message(receive_span, message)
             return message
 
         return otel_receive
 
-    def _get_otel_send(self, server_span, server_span_name, scope, send):
+    def _get_otel_send(
+        self, server_span, server_span_name, scope, send, aggregator=None
+    ):
+        send_span_name = " ".join((server_span_name, scope["type"], "send"))
+
+        def _trace_message(send_span, message):
+            status_code = None
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "websocket.send":
+                status_code = 200
+            if status_code is not None:
+                set_status_code(server_span, status_code)
+                set_status_code(send_span, status_code)
+            if send_span.is_recording():
+                send_span.set_attribute("type", message["type"])
+            if (
+                server_span.is_recording()
+                and server_span.kind == trace.SpanKind.SERVER
+                and "headers" in message
+            ):
+                custom_response_attributes = (
+                    collect_custom_response_headers_attributes(
+                        message, self._custom_response_headers
+                    )
+                )
+                if len(custom_response_attributes) > 0:
+                    server_span.set_attributes(custom_response_attributes)
+
+            propagator = get_global_response_propagator()
+            if propagator:
+                propagator.inject(
+                    message,
+                    context=set_span_in_context(
+                        server_span, trace.context_api.Context()
+                    ),
+                    setter=asgi_setter,
+                )
+
         @wraps(send)
         async def otel_send(message):
+            if aggregator is not None and aggregator.add(message):
+                _trace_message(trace.INVALID_SPAN, message)
+                await send(message)
+                return
+
             with self.tracer.start_as_current_span(
-                " ".join((server_span_name, scope["type"], "send"))
+                send_span_name
             ) as send_span:
                 if callable(self.client_response_hook):
                     self.client_response_hook(send_span, message)
-                if send_span.is_recording():
-                    if message["type"] == "http.response.start":
-                        status_code = message["status"]
-                        set_status_code(server_span, status_code)
-                        set_status_code(send_span, status_code)
-                    elif message["type"] == "websocket.send":
-                        set_status_code(server_span, 200)
-                        set_status_code(send_span, 200)
-                    send_span.set_attribute("type", message["type"])
-                    if (
-                        server_span.is_recording()
-                        and server_span.kind == trace.SpanKind.SERVER
-                        and "headers" in message
-                    ):
-                        custom_response_attributes = (
-                            collect_custom_response_headers_attributes(message)
-                        )
-                        if len(custom_response_attributes) > 0:
-                            server_span.set_attributes(
-                                custom_response_attributes
-                            )
-
-                propagator = get_global_response_propagator()
-                if propagator:
-                    propagator.inject(
-                        message,
-                        context=set_span_in_context(
-                            server_span, trace.context_api.Context()
-                        ),
-                        setter=asgi_setter,
-                    )
-
+                _trace_message(send_span, message)
                 await send(message)
 
         return otel_send
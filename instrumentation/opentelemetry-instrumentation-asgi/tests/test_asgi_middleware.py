@@ -51,6 +51,28 @@ async def http_app(scope, receive, send):
         await send({"type": "http.response.body", "body": b"*"})
 
 
+async def streaming_http_app(scope, receive, send):
+    message = await receive()
+    assert scope["type"] == "http"
+    if message.get("type") == "http.request":
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [[b"Content-Type", b"text/event-stream"]],
+            }
+        )
+        for _ in range(10):
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": b"data: *\n\n",
+                    "more_body": True,
+                }
+            )
+        await send({"type": "http.response.body", "body": b""})
+
+
 async def websocket_app(scope, receive, send):
     assert scope["type"] == "websocket"
     while True:
@@ -370,6 +392,87 @@ class TestAsgiApplication(AsgiTestBase):
 
         set_global_response_propagator(orig)
 
+    def test_aggregated_message_types(self):
+        app = otel_asgi.OpenTelemetryMiddleware(
+            streaming_http_app,
+            aggregated_message_types=["http.response.body"],
+        )
+        self.seed_app(app)
+        self.send_default_request()
+        outputs = self.get_all_output()
+        self.assertEqual(len(outputs), 12)
+        span_list = self.memory_exporter.get_finished_spans()
+        self.assertEqual(
+            [span.name for span in span_list],
+            ["/ http receive", "/ http send", "/"],
+        )
+        self.assertEqual(
+            span_list[1].attributes["type"], "http.response.start"
+        )
+
+        server_span = span_list[2]
+        self.assertEqual(
+            server_span.attributes[SpanAttributes.HTTP_STATUS_CODE], 200
+        )
+        self.assertEqual(
+            server_span.attributes["asgi.http.response.body.count"], 11
+        )
+        self.assertEqual(
+            server_span.attributes["asgi.http.response.body.size"], 90
+        )
+        first, last = server_span.events
+        self.assertEqual(first.name, "asgi.message.first")
+        self.assertEqual(last.name, "asgi.message.last")
+        self.assertEqual(first.attributes["type"], "http.response.body")
+        self.assertLessEqual(first.timestamp, last.timestamp)
+
+    def test_websocket_aggregated_message_types(self):
+        self.scope = {
+            "type": "websocket",
+            "http_version": "1.1",
+            "scheme": "ws",
+            "path": "/",
+            "query_string": b"",
+            "headers": [],
+            "client": ("127.0.0.1", 32767),
+            "server": ("127.0.0.1", 80),
+        }
+        app = otel_asgi.OpenTelemetryMiddleware(
+            simple_asgi,
+            aggregated_message_types=["websocket.receive", "websocket.send"],
+        )
+        self.seed_app(app)
+        self.send_input({"type": "websocket.connect"})
+        self.send_input({"type": "websocket.receive", "text": "ping"})
+        self.send_input({"type": "websocket.receive", "text": "ping"})
+        self.send_input({"type": "websocket.disconnect"})
+        self.get_all_output()
+        span_list = self.memory_exporter.get_finished_spans()
+        self.assertEqual(
+            [span.attributes.get("type") for span in span_list],
+            [
+                "websocket.connect",
+                "websocket.accept",
+                "websocket.disconnect",
+                None,
+            ],
+        )
+        server_span = span_list[3]
+        self.assertEqual(
+            server_span.attributes[SpanAttributes.HTTP_STATUS_CODE], 200
+        )
+        self.assertEqual(
+            server_span.attributes["asgi.websocket.receive.count"], 2
+        )
+        self.assertEqual(
+            server_span.attributes["asgi.websocket.receive.size"], 8
+        )
+        self.assertEqual(
+            server_span.attributes["asgi.websocket.send.count"], 2
+        )
+        self.assertEqual(server_span.attributes["asgi.websocket.send.size"], 8)
+        self.assertEqual(len(server_span.events), 4)
+
     def test_websocket(self):
         self.scope = {
             "type": "websocket",
@@ -628,16 +731,19 @@ class TestWrappedApplication(AsgiTestBase):
         )
 
 
-@mock.patch.dict(
-    "os.environ",
-    {
-        OTEL_INSTRUMENTATION_HTTP_CAPTURE_HEADERS_SERVER_REQUEST: "Custom-Test-Header-1,Custom-Test-Header-2,Custom-Test-Header-3",
-        OTEL_INSTRUMENTATION_HTTP_CAPTURE_HEADERS_SERVER_RESPONSE: "Custom-Test-Header-1,Custom-Test-Header-2,Custom-Test-Header-3",
-    },
-)
 class TestCustomHeaders(AsgiTestBase, TestBase):
     def setUp(self):
         super().setUp()
+        # the headers to capture are read when the middleware is created
+        env_patch = mock.patch.dict(
+            "os.environ",
+            {
+                OTEL_INSTRUMENTATION_HTTP_CAPTURE_HEADERS_SERVER_REQUEST: "Custom-Test-Header-1,Custom-Test-Header-2,Custom-Test-Header-3",
+                OTEL_INSTRUMENTATION_HTTP_CAPTURE_HEADERS_SERVER_RESPONSE: "Custom-Test-Header-1,Custom-Test-Header-2,Custom-Test-Header-3",
+            },
+        )
+        env_patch.start()
+        self.addCleanup(env_patch.stop)
         self.tracer_provider, self.exporter = TestBase.create_tracer_provider()
         self.tracer = self.tracer_provider.get_tracer(__name__)
         self.app = otel_asgi.OpenTelemetryMiddleware(
@@ -693,6 +799,56 @@ class TestCustomHeaders(AsgiTestBase, TestBase):
                 for key, _ in not_expected.items():
                     self.assertNotIn(key, span.attributes)
 
+    def test_http_custom_request_headers_reload(self):
+        self.scope["headers"].extend(
+            [
+                (b"custom-test-header-1", b"test-header-value-1"),
+                (b"custom-test-header-4", b"test-header-value-4"),
+            ]
+        )
+        with mock.patch.dict(
+            "os.environ",
+            {
+                OTEL_INSTRUMENTATION_HTTP_CAPTURE_HEADERS_SERVER_REQUEST: "Custom-Test-Header-4"
+            },
+        ):
+            for reload in (False, True):
+                if reload:
+                    self.app.reload_custom_headers()
+                self.seed_app(self.app)
+                self.send_default_request()
+                self.get_all_output()
+        server_spans = [
+            span
+            for span in self.exporter.get_finished_spans()
+            if span.parent is None
+        ]
+        self.assertEqual(len(server_spans), 2)
+        self.assertSpanHasAttributes(
+            server_spans[0],
+            {
+                "http.request.header.custom_test_header_1": (
+                    "test-header-value-1",
+                ),
+            },
+        )
+        self.assertNotIn(
+            "http.request.header.custom_test_header_4",
+            server_spans[0].attributes,
+        )
+        self.assertSpanHasAttributes(
+            server_spans[1],
+            {
+                "http.request.header.custom_test_header_4": (
+                    "test-header-value-4",
+                ),
+            },
+        )
+        self.assertNotIn(
+            "http.request.header.custom_test_header_1",
+            server_spans[1].attributes,
+        )
+
     def test_http_custom_response_headers_in_span_attributes(self):
         self.app = otel_asgi.OpenTelemetryMiddleware(
             http_app_with_custom_headers, tracer_provider=self.tracer_provider
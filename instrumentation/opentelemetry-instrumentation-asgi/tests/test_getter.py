@@ -12,9 +12,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from unittest import TestCase
+from unittest import TestCase, mock
 
-from opentelemetry.instrumentation.asgi import ASGIGetter
+from opentelemetry.instrumentation.asgi import ASGIGetter, _RequestASGIGetter
 
 
 class TestASGIGetter(TestCase):
@@ -44,6 +44,43 @@ class TestASGIGetter(TestCase):
             "Should be case insensitive",
         )
 
+    def test_get_multiple_values(self):
+        getter = ASGIGetter()
+        carrier = {
+            "headers": [
+                (b"test-key", b"val1"),
+                (b"other-key", b"other"),
+                (b"test-key", b"val2"),
+            ]
+        }
+        self.assertEqual(getter.get(carrier, "test-key"), ["val1", "val2"])
+        self.assertIsNone(getter.get(carrier, "missing-key"))
+
+    def test_get_scope_not_modified(self):
+        getter = ASGIGetter()
+        scope = {"type": "http", "headers": [(b"test-key", b"val")]}
+        self.assertEqual(getter.get(scope, "test-key"), ["val"])
+        self.assertEqual(
+            scope, {"type": "http", "headers": [(b"test-key", b"val")]}
+        )
+
+    def test_request_getter_shares_index(self):
+        headers = [(b"test-key", b"val")]
+        scope = {"type": "http", "headers": headers}
+        getter = _RequestASGIGetter(scope)
+        with mock.patch(
+            "opentelemetry.instrumentation.asgi._index_headers"
+        ) as index_headers:
+            self.assertEqual(getter.get(scope, "test-key"), ["val"])
+            self.assertIsNone(getter.get(scope, "missing-key"))
+            self.assertFalse(index_headers.called)
+        self.assertEqual(scope, {"type": "http", "headers": headers})
+
+        # other carriers are looked up in their own headers
+        message = {"type": "http.response.start", "headers": [(b"k", b"v")]}
+        self.assertEqual(getter.get(message, "k"), ["v"])
+        self.assertIsNone(getter.get(message, "test-key"))
+
     def test_keys(self):
         getter = ASGIGetter()
         keys = getter.keys({})
@@ -40,21 +40,67 @@ API
 import functools
 import logging
 import typing
+from collections.abc import Mapping
+from types import MappingProxyType
 
 import wrapt
 
 from opentelemetry import trace as trace_api
 from opentelemetry.instrumentation.dbapi.version import __version__
-from opentelemetry.instrumentation.utils import (
-    _generate_opentelemetry_traceparent,
-    _generate_sql_comment,
-    unwrap,
-)
+from opentelemetry.instrumentation.utils import _SQLCommenter, unwrap
 from opentelemetry.semconv.trace import SpanAttributes
-from opentelemetry.trace import Span, SpanKind, TracerProvider, get_tracer
+from opentelemetry.trace import SpanKind, TracerProvider, get_tracer
 
 _logger = logging.getLogger(__name__)
 
+# Statements longer than this are not memoized so that the cache stays small
+# even when queries have their values inlined.
+_STATEMENT_CACHE_MAX_LENGTH = 4096
+_STATEMENT_CACHE_SIZE = 512
+
+
+@functools.lru_cache(maxsize=_STATEMENT_CACHE_SIZE)
+def _describe_statement(statement):
+    """Returns the operation name and the decoded text of a statement."""
+    if isinstance(statement, bytes):
+        return "", statement.decode("utf8", "replace")
+    operation = statement.split(maxsplit=1)
+    return (operation[0] if operation else ""), statement
+
+
+def _get_statement_description(statement):
+    if len(statement) > _STATEMENT_CACHE_MAX_LENGTH:
+        return _describe_statement.__wrapped__(statement)
+    return _describe_statement(statement)
+
+
+# Number of leading executemany rows used for the parameters preview and
+# the size estimation.
+_EXECUTEMANY_SAMPLE_ROWS = 10
+
+
+def _parameters_size(row) -> int:
+    if isinstance(row, (str, bytes, bytearray)):
+        return len(row)
+    if isinstance(row, Mapping):
+        row = row.values()
+    elif not isinstance(row, (list, tuple)):
+        row = (row,)
+    size = 0
+    for value in row:
+        if isinstance(value, (str, bytes, bytearray)):
+            size += len(value)
+        elif value is not None:
+            size += len(str(value))
+    return size
+
+
+def statement_cache_info():
+    """Returns the hits, misses, maxsize and currsize of the cache used to
+    memoize the span name and statement text of str and bytes statements.
+    """
+    return _describe_statement.cache_info()
+
 
 def trace_integration(
     connect_module: typing.Callable[..., typing.Any],
@@ -64,6 +110,8 @@ def trace_integration(
     tracer_provider: typing.Optional[TracerProvider] = None,
     capture_parameters: bool = False,
     enable_commenter: bool = False,
+    commenter_tags: typing.Optional[typing.Dict[str, str]] = None,
+    executemany_parameters_max_length: typing.Optional[int] = None,
     db_api_integration_factory=None,
 ):
     """Integrate with DB API library.
@@ -79,6 +127,12 @@ def trace_integration(
         tracer_provider: The :class:`opentelemetry.trace.TracerProvider` to
             use. If omitted the current configured one is used.
         capture_parameters: Configure if db.statement.parameters should be captured.
+        commenter_tags: Static tags, e.g. the service name or the database
+            driver, added to the sql comments when ``enable_commenter`` is set.
+        executemany_parameters_max_length: If set, the parameters of
+            ``executemany`` calls are summarized with their row count, an
+            estimated size and a preview of at most this many characters
+            instead of being captured in full.
     """
     wrap_connect(
         __name__,
@@ -90,6 +144,8 @@ def trace_integration(
         tracer_provider=tracer_provider,
         capture_parameters=capture_parameters,
         enable_commenter=enable_commenter,
+        commenter_tags=commenter_tags,
+        executemany_parameters_max_length=executemany_parameters_max_length,
         db_api_integration_factory=db_api_integration_factory,
     )
 
@@ -104,6 +160,8 @@ def wrap_connect(
     tracer_provider: typing.Optional[TracerProvider] = None,
     capture_parameters: bool = False,
     enable_commenter: bool = False,
+    commenter_tags: typing.Optional[typing.Dict[str, str]] = None,
+    executemany_parameters_max_length: typing.Optional[int] = None,
     db_api_integration_factory=None,
 ):
     """Integrate with DB API library.
@@ -119,6 +177,12 @@ def wrap_connect(
         tracer_provider: The :class:`opentelemetry.trace.TracerProvider` to
             use. If omitted the current configured one is used.
         capture_parameters: Configure if db.statement.parameters should be captured.
+        commenter_tags: Static tags, e.g. the service name or the database
+            driver, added to the sql comments when ``enable_commenter`` is set.
+        executemany_parameters_max_length: If set, the parameters of
+            ``executemany`` calls are summarized with their row count, an
+            estimated size and a preview of at most this many characters
+            instead of being captured in full.
 
     """
     db_api_integration_factory = (
@@ -140,6 +204,8 @@ def wrap_connect(
             tracer_provider=tracer_provider,
             capture_parameters=capture_parameters,
             enable_commenter=enable_commenter,
+            commenter_tags=commenter_tags,
+            executemany_parameters_max_length=executemany_parameters_max_length,
         )
         return db_integration.wrapped_connection(wrapped, args, kwargs)
 
@@ -173,6 +239,8 @@ def instrument_connection(
     tracer_provider: typing.Optional[TracerProvider] = None,
     capture_parameters: bool = False,
     enable_commenter: bool = False,
+    commenter_tags: typing.Optional[typing.Dict[str, str]] = None,
+    executemany_parameters_max_length: typing.Optional[int] = None,
 ):
     """Enable instrumentation in a database connection.
 
@@ -185,6 +253,12 @@ def instrument_connection(
         tracer_provider: The :class:`opentelemetry.trace.TracerProvider` to
             use. If omitted the current configured one is used.
         capture_parameters: Configure if db.statement.parameters should be captured.
+        commenter_tags: Static tags, e.g. the service name or the database
+            driver, added to the sql comments when ``enable_commenter`` is set.
+        executemany_parameters_max_length: If set, the parameters of
+            ``executemany`` calls are summarized with their row count, an
+            estimated size and a preview of at most this many characters
+            instead of being captured in full.
     Returns:
         An instrumented connection.
     """
@@ -200,6 +274,8 @@ def instrument_connection(
         tracer_provider=tracer_provider,
         capture_parameters=capture_parameters,
         enable_commenter=enable_commenter,
+        commenter_tags=commenter_tags,
+        executemany_parameters_max_length=executemany_parameters_max_length,
     )
     db_integration.get_connection_attributes(connection)
     return get_traced_connection_proxy(connection, db_integration)
@@ -231,6 +307,8 @@ class DatabaseApiIntegration:
         tracer_provider: typing.Optional[TracerProvider] = None,
         capture_parameters: bool = False,
         enable_commenter: bool = False,
+        commenter_tags: typing.Optional[typing.Dict[str, str]] = None,
+        executemany_parameters_max_length: typing.Optional[int] = None,
     ):
         self.connection_attributes = connection_attributes
         if self.connection_attributes is None:
@@ -249,6 +327,10 @@ class DatabaseApiIntegration:
         )
         self.capture_parameters = capture_parameters
         self.enable_commenter = enable_commenter
+        self.commenter_tags = commenter_tags or {}
+        self.executemany_parameters_max_length = (
+            executemany_parameters_max_length
+        )
         self.database_system = database_system
         self.connection_props = {}
         self.span_attributes = {}
@@ -300,90 +382,132 @@ class DatabaseApiIntegration:
             self.span_attributes[SpanAttributes.NET_PEER_PORT] = port
 
 
-def get_traced_connection_proxy(
-    connection, db_api_integration, *args, **kwargs
-):
-    # pylint: disable=abstract-method
-    class TracedConnectionProxy(wrapt.ObjectProxy):
-        # pylint: disable=unused-argument
-        def __init__(self, connection, *args, **kwargs):
-            wrapt.ObjectProxy.__init__(self, connection)
-
-        def cursor(self, *args, **kwargs):
-            return get_traced_cursor_proxy(
-                self.__wrapped__.cursor(*args, **kwargs), db_api_integration
-            )
+# pylint: disable=abstract-method
+class TracedConnectionProxy(wrapt.ObjectProxy):
+    # pylint: disable=unused-argument
+    def __init__(self, connection, db_api_integration, *args, **kwargs):
+        wrapt.ObjectProxy.__init__(self, connection)
+        self._self_db_api_integration = db_api_integration
+        # a single tracer is shared by every cursor of the connection
+        self._self_cursor_tracer = CursorTracer(db_api_integration)
+
+    def cursor(self, *args, **kwargs):
+        return TracedCursorProxy(
+            self.__wrapped__.cursor(*args, **kwargs), self._self_cursor_tracer
+        )
 
-        def __enter__(self):
-            self.__wrapped__.__enter__()
-            return self
+    def __enter__(self):
+        self.__wrapped__.__enter__()
+        return self
 
-        def __exit__(self, *args, **kwargs):
-            self.__wrapped__.__exit__(*args, **kwargs)
+    def __exit__(self, *args, **kwargs):
+        self.__wrapped__.__exit__(*args, **kwargs)
 
-    return TracedConnectionProxy(connection, *args, **kwargs)
+
+def get_traced_connection_proxy(
+    connection, db_api_integration, *args, **kwargs
+):
+    return TracedConnectionProxy(
+        connection, db_api_integration, *args, **kwargs
+    )
 
 
 class CursorTracer:
     def __init__(self, db_api_integration: DatabaseApiIntegration) -> None:
         self._db_api_integration = db_api_integration
         self._commenter_enabled = self._db_api_integration.enable_commenter
+        if self._commenter_enabled:
+            self._sql_commenter = _SQLCommenter(
+                **self._db_api_integration.commenter_tags
+            )
+        # built on first use, once the connection attributes are known
+        self._span_attributes = None
+        # statement and description of the current execution, so that its
+        # span name and db.statement share a single cache lookup
+        self._description = (None, None)
 
     def _populate_span(
         self,
         span: trace_api.Span,
         cursor,
-        *args: typing.Tuple[typing.Any, typing.Any]
+        *args: typing.Tuple[typing.Any, typing.Any],
+        executemany: bool = False
     ):
         if not span.is_recording():
             return
-        statement = self.get_statement(cursor, args)
-        span.set_attribute(
-            SpanAttributes.DB_SYSTEM, self._db_api_integration.database_system
-        )
+        if self._span_attributes is None:
+            self._span_attributes = MappingProxyType(
+                {
+                    SpanAttributes.DB_SYSTEM: self._db_api_integration.database_system,
+                    SpanAttributes.DB_NAME: self._db_api_integration.database,
+                    **self._db_api_integration.span_attributes,
+                }
+            )
+        span.set_attributes(self._span_attributes)
         span.set_attribute(
-            SpanAttributes.DB_NAME, self._db_api_integration.database
+            SpanAttributes.DB_STATEMENT, self.get_statement(cursor, args)
         )
-        span.set_attribute(SpanAttributes.DB_STATEMENT, statement)
-
-        for (
-            attribute_key,
-            attribute_value,
-        ) in self._db_api_integration.span_attributes.items():
-            span.set_attribute(attribute_key, attribute_value)
 
         if self._db_api_integration.capture_parameters and len(args) > 1:
-            span.set_attribute("db.statement.parameters", str(args[1]))
-
-    def get_operation_name(self, cursor, args):  # pylint: disable=no-self-use
+            if (
+                executemany
+                and self._db_api_integration.executemany_parameters_max_length
+                is not None
+            ):
+                self._populate_executemany_parameters(span, args[1])
+            else:
+                span.set_attribute("db.statement.parameters", str(args[1]))
+
+    def _populate_executemany_parameters(self, span: trace_api.Span, rows):
+        max_length = self._db_api_integration.executemany_parameters_max_length
+        if not isinstance(rows, (list, tuple)):
+            # Iterators can't be inspected without consuming them
+            preview = repr(rows)
+        else:
+            sample = rows[:_EXECUTEMANY_SAMPLE_ROWS]
+            preview = repr(sample)
+            if len(rows) > len(sample):
+                preview = preview[:-1] + ", ..." + preview[-1]
+            span.set_attribute("db.statement.parameters.row_count", len(rows))
+            if sample:
+                sample_size = sum(_parameters_size(row) for row in sample)
+                span.set_attribute(
+                    "db.statement.parameters.size",
+                    sample_size * len(rows) // len(sample),
+                )
+        if len(preview) > max_length:
+            preview = preview[:max_length] + "..."
+        span.set_attribute("db.statement.parameters", preview)
+
+    def _describe_statement(self, statement):
+        last_statement, description = self._description
+        if statement is not last_statement:
+            description = _get_statement_description(statement)
+            self._description = statement, description
+        return description
+
+    def get_operation_name(self, cursor, args):
         if args and isinstance(args[0], str):
-            return args[0].split()[0]
+            return self._describe_statement(args[0])[0]
         return ""
 
-    def get_statement(self, cursor, args):  # pylint: disable=no-self-use
+    def get_statement(self, cursor, args):
         if not args:
             return ""
         statement = args[0]
-        if isinstance(statement, bytes):
-            return statement.decode("utf8", "replace")
+        if isinstance(statement, (str, bytes)):
+            return self._describe_statement(statement)[1]
         return statement
 
-    @staticmethod
-    def _generate_comment(span: Span) -> str:
-        span_context = span.get_span_context()
-        meta = {}
-        if span_context.is_valid:
-            meta.update(_generate_opentelemetry_traceparent(span))
-        # TODO(schekuri): revisit to enrich with info such as route, db_driver etc...
-        return _generate_sql_comment(**meta)
-
     def traced_execution(
         self,
         cursor,
         query_method: typing.Callable[..., typing.Any],
         *args: typing.Tuple[typing.Any, typing.Any],
+        executemany: bool = False,
         **kwargs: typing.Dict[typing.Any, typing.Any]
     ):
+        self._description = (None, None)
         name = self.get_operation_name(cursor, args)
         if not name:
             name = (
@@ -395,10 +519,10 @@ class CursorTracer:
         with self._db_api_integration._tracer.start_as_current_span(
             name, kind=SpanKind.CLIENT
         ) as span:
-            self._populate_span(span, cursor, *args)
+            self._populate_span(span, cursor, *args, executemany=executemany)
             if args and self._commenter_enabled:
                 try:
-                    comment = self._generate_comment(span)
+                    comment = self._sql_commenter.comment(span)
                     if isinstance(args[0], bytes):
                         comment = comment.encode("utf8")
                     args_list = list(args)
@@ -411,36 +535,41 @@ class CursorTracer:
             return query_method(*args, **kwargs)
 
 
-def get_traced_cursor_proxy(cursor, db_api_integration, *args, **kwargs):
-    _cursor_tracer = CursorTracer(db_api_integration)
-
-    # pylint: disable=abstract-method
-    class TracedCursorProxy(wrapt.ObjectProxy):
+# pylint: disable=abstract-method
+class TracedCursorProxy(wrapt.ObjectProxy):
+    # pylint: disable=unused-argument
+    def __init__(self, cursor, cursor_tracer, *args, **kwargs):
+        wrapt.ObjectProxy.__init__(self, cursor)
+        self._self_cursor_tracer = cursor_tracer
 
-        # pylint: disable=unused-argument
-        def __init__(self, cursor, *args, **kwargs):
-            wrapt.ObjectProxy.__init__(self, cursor)
+    def execute(self, *args, **kwargs):
+        return self._self_cursor_tracer.traced_execution(
+            self.__wrapped__, self.__wrapped__.execute, *args, **kwargs
+        )
 
-        def execute(self, *args, **kwargs):
-            return _cursor_tracer.traced_execution(
-                self.__wrapped__, self.__wrapped__.execute, *args, **kwargs
-            )
+    def executemany(self, *args, **kwargs):
+        return self._self_cursor_tracer.traced_execution(
+            self.__wrapped__,
+            self.__wrapped__.executemany,
+            *args,
+            executemany=True,
+            **kwargs
+        )
 
-        def executemany(self, *args, **kwargs):
-            return _cursor_tracer.traced_execution(
-                self.__wrapped__, self.__wrapped__.executemany, *args, **kwargs
-            )
+    def callproc(self, *args, **kwargs):
+        return self._self_cursor_tracer.traced_execution(
+            self.__wrapped__, self.__wrapped__.callproc, *args, **kwargs
+        )
 
-        def callproc(self, *args, **kwargs):
-            return _cursor_tracer.traced_execution(
-                self.__wrapped__, self.__wrapped__.callproc, *args, **kwargs
-            )
+    def __enter__(self):
+        self.__wrapped__.__enter__()
+        return self
 
-        def __enter__(self):
-            self.__wrapped__.__enter__()
-            return self
+    def __exit__(self, *args, **kwargs):
+        self.__wrapped__.__exit__(*args, **kwargs)
 
-        def __exit__(self, *args, **kwargs):
-            self.__wrapped__.__exit__(*args, **kwargs)
 
-    return TracedCursorProxy(cursor, *args, **kwargs)
+def get_traced_cursor_proxy(cursor, db_api_integration, *args, **kwargs):
+    return TracedCursorProxy(
+        cursor, CursorTracer(db_api_integration), *args, **kwargs
+    )
@@ -0,0 +1,53 @@
+# Copyright The OpenTelemetry Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from opentelemetry.instrumentation.dbapi import DatabaseApiIntegration
+from opentelemetry.sdk.trace import TracerProvider
+
+QUERY = "SELECT * FROM users WHERE id = %s"
+
+
+class MockConnection:
+    # pylint: disable=no-self-use
+    def cursor(self):
+        return MockCursor()
+
+
+class MockCursor:
+    # pylint: disable=unused-argument, no-self-use
+    def execute(self, query, params=None):
+        return None
+
+
+def _traced_connection():
+    db_integration = DatabaseApiIntegration(
+        "benchmark", "testcomponent", tracer_provider=TracerProvider()
+    )
+    return db_integration.wrapped_connection(MockConnection, (), {})
+
+
+def test_cursor_creation_uninstrumented(benchmark):
+    benchmark(MockConnection().cursor)
+
+
+def test_cursor_creation_instrumented(benchmark):
+    benchmark(_traced_connection().cursor)
+
+
+def test_execute_uninstrumented(benchmark):
+    benchmark(MockConnection().cursor().execute, QUERY, (1,))
+
+
+def test_execute_instrumented(benchmark):
+    benchmark(_traced_connection().cursor().execute, QUERY, (1,))
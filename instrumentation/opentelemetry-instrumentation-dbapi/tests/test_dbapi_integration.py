@@ -13,11 +13,13 @@
 # limitations under the License.
 
 
+import functools
 import logging
 from unittest import mock
 
 from opentelemetry import trace as trace_api
 from opentelemetry.instrumentation import dbapi
+from opentelemetry.instrumentation.utils import _SQLCommenter
 from opentelemetry.sdk import resources
 from opentelemetry.semconv.trace import SpanAttributes
 from opentelemetry.test.test_base import TestBase
@@ -93,6 +95,58 @@ class TestDBApiIntegration(TestBase):
         self.assertEqual(spans_list[1].name, "multi")
         self.assertEqual(spans_list[2].name, "tab")
 
+    def test_proxy_classes_are_shared(self):
+        db_integration = dbapi.DatabaseApiIntegration(
+            "testname", "testcomponent"
+        )
+        connection1 = db_integration.wrapped_connection(mock_connect, {}, {})
+        connection2 = db_integration.wrapped_connection(mock_connect, {}, {})
+        cursor1 = connection1.cursor()
+        cursor2 = connection1.cursor()
+        cursor3 = connection2.cursor()
+        self.assertIs(type(connection1), type(connection2))
+        self.assertIs(type(connection1), dbapi.TracedConnectionProxy)
+        self.assertIs(type(cursor1), dbapi.TracedCursorProxy)
+        self.assertIs(type(cursor1), type(cursor3))
+        self.assertIs(cursor1._self_cursor_tracer, cursor2._self_cursor_tracer)
+        self.assertIsInstance(cursor1.__wrapped__, MockCursor)
+
+    def test_statement_cache(self):
+        db_integration = dbapi.DatabaseApiIntegration(
+            "testname", "testcomponent"
+        )
+        mock_connection = db_integration.wrapped_connection(
+            mock_connect, {}, {}
+        )
+        cursor = mock_connection.cursor()
+        statement = "SELECT statement_cache FROM test"
+        info = dbapi.statement_cache_info()
+        cursor.execute(statement)
+        cursor.execute(statement)
+        cursor.execute(statement.encode())
+        long_statement = "SELECT " + "x" * 5000
+        cursor.execute(long_statement)
+        new_info = dbapi.statement_cache_info()
+        # name and statement text share one lookup for each execution, only
+        # the first lookup of each cacheable statement misses
+        self.assertEqual(new_info.misses - info.misses, 2)
+        self.assertEqual(new_info.hits - info.hits, 1)
+
+        spans_list = self.memory_exporter.get_finished_spans()
+        self.assertEqual(len(spans_list), 4)
+        self.assertEqual(spans_list[1].name, "SELECT")
+        self.assertEqual(
+            spans_list[1].attributes[SpanAttributes.DB_STATEMENT], statement
+        )
+        self.assertEqual(
+            spans_list[2].attributes[SpanAttributes.DB_STATEMENT], statement
+        )
+        self.assertEqual(spans_list[3].name, "SELECT")
+        self.assertEqual(
+            spans_list[3].attributes[SpanAttributes.DB_STATEMENT],
+            long_statement,
+        )
+
     def test_span_succeeded_with_capture_of_statement_parameters(self):
         connection_props = {
             "database": "testdatabase",
@@ -228,6 +282,71 @@ class TestDBApiIntegration(TestBase):
             span.attributes[SpanAttributes.DB_STATEMENT], "Test query"
         )
 
+    def test_executemany_parameters_summary(self):
+        db_integration = dbapi.DatabaseApiIntegration(
+            "testname",
+            "testcomponent",
+            capture_parameters=True,
+            executemany_parameters_max_length=40,
+        )
+        mock_connection = db_integration.wrapped_connection(
+            mock_connect, {}, {}
+        )
+        cursor = mock_connection.cursor()
+        rows = [(index, "abcd") for index in range(1000)]
+        cursor.executemany("Test query", rows)
+        cursor.executemany("Test query", [(1, "abcd")])
+        cursor.executemany("Test query", iter(rows))
+        cursor.execute("Test query", rows[0])
+        spans_list = self.memory_exporter.get_finished_spans()
+        self.assertEqual(len(spans_list), 4)
+
+        attributes = spans_list[0].attributes
+        self.assertEqual(
+            attributes["db.statement.parameters"],
+            "[(0, 'abcd'), (1, 'abcd'), (2, 'abcd'), ...",
+        )
+        self.assertEqual(attributes["db.statement.parameters.row_count"], 1000)
+        self.assertEqual(attributes["db.statement.parameters.size"], 5000)
+
+        attributes = spans_list[1].attributes
+        self.assertEqual(
+            attributes["db.statement.parameters"], "[(1, 'abcd')]"
+        )
+        self.assertEqual(attributes["db.statement.parameters.row_count"], 1)
+        self.assertEqual(attributes["db.statement.parameters.size"], 5)
+
+        attributes = spans_list[2].attributes
+        self.assertTrue(
+            attributes["db.statement.parameters"].startswith("<list_iterator")
+        )
+        self.assertNotIn("db.statement.parameters.row_count", attributes)
+
+        attributes = spans_list[3].attributes
+        self.assertEqual(attributes["db.statement.parameters"], "(0, 'abcd')")
+
+    def test_executemany_parameters_summary_renamed_method(self):
+        db_integration = dbapi.DatabaseApiIntegration(
+            "testname",
+            "testcomponent",
+            capture_parameters=True,
+            executemany_parameters_max_length=40,
+        )
+        mock_connection = db_integration.wrapped_connection(
+            mock_connect, {}, {}
+        )
+        cursor = mock_connection.cursor()
+        # drivers can implement executemany with a differently named method
+        cursor.__wrapped__.executemany = functools.partial(
+            MockCursor.executemany, cursor.__wrapped__
+        )
+        cursor.executemany("Test query", [(1, "abcd")])
+        spans_list = self.memory_exporter.get_finished_spans()
+        self.assertEqual(len(spans_list), 1)
+        self.assertEqual(
+            spans_list[0].attributes["db.statement.parameters.row_count"], 1
+        )
+
     def test_executemany_comment(self):
         db_integration = dbapi.DatabaseApiIntegration(
             "testname", "testcomponent", enable_commenter=True
@@ -240,9 +359,37 @@ class TestDBApiIntegration(TestBase):
         spans_list = self.memory_exporter.get_finished_spans()
         self.assertEqual(len(spans_list), 1)
         span = spans_list[0]
-        comment = dbapi.CursorTracer._generate_comment(span)
+        comment = _SQLCommenter().comment(span)
+        self.assertIn(
+            f"traceparent='00-{trace_api.format_trace_id(span.context.trace_id)}"
+            f"-{trace_api.format_span_id(span.context.span_id)}-",
+            comment,
+        )
         self.assertIn(comment, cursor.query)
 
+    def test_executemany_comment_with_tags(self):
+        db_integration = dbapi.DatabaseApiIntegration(
+            "testname",
+            "testcomponent",
+            enable_commenter=True,
+            commenter_tags={"service": "test service", "db_driver": "mock"},
+        )
+        mock_connection = db_integration.wrapped_connection(
+            mock_connect, {}, {}
+        )
+        cursor = mock_connection.cursor()
+        cursor.executemany("Test query")
+        spans_list = self.memory_exporter.get_finished_spans()
+        self.assertEqual(len(spans_list), 1)
+        span_context = spans_list[0].get_span_context()
+        self.assertEqual(
+            cursor.query,
+            "Test query /*db_driver='mock',"
+            "service='test%%20service',"
+            f"traceparent='00-{span_context.trace_id:032x}-"
+            f"{span_context.span_id:016x}-1'*/",
+        )
+
     def test_callproc(self):
         db_integration = dbapi.DatabaseApiIntegration(
             "testname", "testcomponent"
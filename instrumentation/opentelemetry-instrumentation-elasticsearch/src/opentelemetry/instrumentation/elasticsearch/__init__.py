@@ -33,6 +33,14 @@ Usage
     es.index(index='my-index', doc_type='my-type', id=1, body={'my': 'data', 'timestamp': datetime.now()})
     es.get(index='my-index', doc_type='my-type', id=1)
 
+The ``AsyncElasticsearch`` client of ``elasticsearch[async]`` >= 7.8 is instrumented as well, with the
+same span names, attributes and hooks:
+
+.. code-block:: python
+
+    es = elasticsearch.AsyncElasticsearch()
+    await es.get(index='my-index', id=1)
+
 Elasticsearch instrumentation prefixes operation names with the string "Elasticsearch". This
 can be changed to a different string by either setting the `OTEL_PYTHON_ELASTICSEARCH_NAME_PREFIX`
 environment variable or by passing the prefix as an argument to the instrumentor. For example,
@@ -42,6 +50,11 @@ environment variable or by passing the prefix as an argument to the instrumentor
 
     ElasticsearchInstrumentor("my-custom-prefix").instrument()
 
+To keep the number of span names low, the id of documents is replaced by ``:id`` in the urls of the
+``_doc``, ``_update`` and ``_create`` apis and reported as ``elasticsearch.id``, and the indices targeted by
+the ``_search``, ``_msearch``, ``_count``, ``_mget`` and ``_bulk`` apis are replaced by ``<target>`` and
+reported as ``elasticsearch.target``, such as ``Elasticsearch/<target>/_bulk``.
+
 
 The `instrument` method accepts the following keyword args:
 
@@ -52,6 +65,30 @@ request_hook (Callable) - a function with extra user-defined logic to be perform
 response_hook (Callable) - a function with extra user-defined logic to be performed after performing the request
                           this function signature is:
                           def response_hook(span: Span, response: dict)
+statement_capture (str) - how request bodies are reported in ``db.statement``:
+                          ``"full"`` (default) the whole body,
+                          ``"off"`` no statement,
+                          ``"truncated"`` the body cut at ``statement_max_length`` characters,
+                          ``"query"`` only the ``query`` of search requests,
+                          ``"summary"`` the ``query`` of search requests, the number of operations
+                          by action and index of ``_bulk`` requests and the truncated body of other requests
+statement_max_length (int) - the maximum number of characters of ``db.statement`` and
+                          ``elasticsearch.params`` when ``statement_capture`` is not ``"full"``, defaults to 1000
+
+Statements are only formatted when the span is recording. Except in the ``"full"`` mode, bodies are
+formatted up to ``statement_max_length`` characters and the documents of bulk requests are not parsed,
+so large requests are reported at a bounded cost:
+
+.. code-block:: python
+
+    ElasticsearchInstrumentor().instrument(statement_capture="summary")
+
+    # db.statement has the lines "index my-index: 2" and "delete my-index: 1"
+    es.bulk(body=[
+        {"index": {"_index": "my-index", "_id": 1}}, {"my": "data"},
+        {"index": {"_index": "my-index", "_id": 2}}, {"my": "data"},
+        {"delete": {"_index": "my-index", "_id": 3}},
+    ])
 
 for example:
 
@@ -81,6 +118,7 @@ API
 ---
 """
 
+import functools
 import re
 from logging import getLogger
 from os import environ
@@ -91,6 +129,13 @@ import elasticsearch.exceptions
 from wrapt import wrap_function_wrapper as _wrap
 
 from opentelemetry.instrumentation.elasticsearch.package import _instruments
+from opentelemetry.instrumentation.elasticsearch.utils import (
+    _STATEMENT_MAX_LENGTH,
+    STATEMENT_CAPTURE_MODES,
+    STATEMENT_FULL,
+    _capture_statement,
+    _truncate,
+)
 from opentelemetry.instrumentation.elasticsearch.version import __version__
 from opentelemetry.instrumentation.instrumentor import BaseInstrumentor
 from opentelemetry.instrumentation.utils import unwrap
@@ -136,106 +181,178 @@ class ElasticsearchInstrumentor(BaseInstrumentor):
         tracer = get_tracer(__name__, __version__, tracer_provider)
         request_hook = kwargs.get("request_hook")
         response_hook = kwargs.get("response_hook")
+        statement_capture = kwargs.get("statement_capture", STATEMENT_FULL)
+        if statement_capture not in STATEMENT_CAPTURE_MODES:
+            raise ValueError(
+                f"Unknown statement_capture `{statement_capture}`, expected "
+                f"one of {', '.join(STATEMENT_CAPTURE_MODES)}"
+            )
+        statement_max_length = kwargs.get(
+            "statement_max_length", _STATEMENT_MAX_LENGTH
+        )
         _wrap(
             elasticsearch,
             "Transport.perform_request",
             _wrap_perform_request(
-                tracer, self._span_name_prefix, request_hook, response_hook
+                tracer,
+                self._span_name_prefix,
+                request_hook,
+                response_hook,
+                statement_capture,
+                statement_max_length,
             ),
         )
+        # elasticsearch >= 7.8 installed with the async extra
+        if hasattr(elasticsearch, "AsyncTransport"):
+            _wrap(
+                elasticsearch,
+                "AsyncTransport.perform_request",
+                _wrap_perform_request(
+                    tracer,
+                    self._span_name_prefix,
+                    request_hook,
+                    response_hook,
+                    statement_capture,
+                    statement_max_length,
+                    is_async=True,
+                ),
+            )
 
     def _uninstrument(self, **kwargs):
         unwrap(elasticsearch.Transport, "perform_request")
+        if hasattr(elasticsearch, "AsyncTransport"):
+            unwrap(elasticsearch.AsyncTransport, "perform_request")
+
+
+# document apis with the id of the document in the url
+_regex_doc_url = re.compile(r"/_(doc|update|create)/([^/]+)")
+
+# apis targeting one or more indices, such as the search api
+# https://www.elastic.co/guide/en/elasticsearch/reference/current/search-search.html
+_regex_target_url = re.compile(
+    r"/([^/]+)/_(search|msearch|count|mget|bulk)(?:/|$)"
+)
 
+# number of urls of which the span name and attributes are kept
+_URL_CACHE_SIZE = 1024
 
-_regex_doc_url = re.compile(r"/_doc/([^/]+)")
 
-# search api https://www.elastic.co/guide/en/elasticsearch/reference/current/search-search.html
-_regex_search_url = re.compile(r"/([^/]+)/_search[/]?")
+def _template_url(url):
+    """Returns the low cardinality template of a url, with the document id and
+    the target it was extracted from"""
+    # TODO: This regex-based solution avoids creating an unbounded number of span names, but should be replaced by instrumenting individual Elasticsearch methods instead of Transport.perform_request()
+    # A limitation of the regex is that only the '_doc' mapping type is supported. Mapping types are deprecated since Elasticsearch 7
+    # https://github.com/open-telemetry/opentelemetry-python-contrib/issues/708
+    match = _regex_target_url.search(url)
+    if match is not None:
+        return f"/<target>/_{match.group(2)}", None, match.group(1)
+    match = _regex_doc_url.search(url)
+    if match is not None:
+        # Remove the full document ID from the URL
+        start, end = match.span()
+        template = f"{url[:start]}/_{match.group(1)}/:id{url[end:]}"
+        return template, match.group(2), None
+    return url, None, None
 
 
 def _wrap_perform_request(
-    tracer, span_name_prefix, request_hook=None, response_hook=None
+    tracer,
+    span_name_prefix,
+    request_hook=None,
+    response_hook=None,
+    statement_capture=STATEMENT_FULL,
+    statement_max_length=_STATEMENT_MAX_LENGTH,
+    is_async=False,
 ):
-    # pylint: disable=R0912,R0914
-    def wrapper(wrapped, _, args, kwargs):
+    @functools.lru_cache(maxsize=_URL_CACHE_SIZE)
+    def _get_operation(url):
+        template, doc_id, search_target = _template_url(url)
+        return span_name_prefix + template, doc_id, search_target
+
+    def _get_request(args):
         method = url = None
         try:
             method, url, *_ = args
-        except IndexError:
+        except (IndexError, ValueError):
             logger.warning(
                 "expected perform_request to receive two positional arguments. "
                 "Got %d",
                 len(args),
             )
 
-        op_name = span_name_prefix + (url or method or _DEFAULT_OP_NAME)
-
-        doc_id = None
-        search_target = None
-
         if url:
-            # TODO: This regex-based solution avoids creating an unbounded number of span names, but should be replaced by instrumenting individual Elasticsearch methods instead of Transport.perform_request()
-            # A limitation of the regex is that only the '_doc' mapping type is supported. Mapping types are deprecated since Elasticsearch 7
-            # https://github.com/open-telemetry/opentelemetry-python-contrib/issues/708
-            match = _regex_doc_url.search(url)
-            if match is not None:
-                # Remove the full document ID from the URL
-                doc_span = match.span()
-                op_name = (
-                    span_name_prefix
-                    + url[: doc_span[0]]
-                    + "/_doc/:id"
-                    + url[doc_span[1] :]
+            op_name, doc_id, search_target = _get_operation(url)
+        else:
+            op_name = span_name_prefix + (method or _DEFAULT_OP_NAME)
+            doc_id = search_target = None
+        return method, url, op_name, doc_id, search_target
+
+    # pylint: disable=too-many-arguments
+    def _before_request(span, method, url, doc_id, search_target, kwargs):
+        if callable(request_hook):
+            request_hook(span, method, url, kwargs)
+
+        if span.is_recording():
+            params = kwargs.get("params", {})
+            body = kwargs.get("body", None)
+            attributes = {
+                SpanAttributes.DB_SYSTEM: "elasticsearch",
+            }
+            if url:
+                attributes["elasticsearch.url"] = url
+            if method:
+                attributes["elasticsearch.method"] = method
+            if body:
+                statement = _capture_statement(
+                    statement_capture, url, body, statement_max_length
                 )
-                # Put the document ID in attributes
-                doc_id = match.group(1)
-            match = _regex_search_url.search(url)
-            if match is not None:
-                op_name = span_name_prefix + "/<target>/_search"
-                search_target = match.group(1)
-
-        params = kwargs.get("params", {})
-        body = kwargs.get("body", None)
+                if statement:
+                    attributes[SpanAttributes.DB_STATEMENT] = statement
+            if params:
+                attributes["elasticsearch.params"] = (
+                    str(params)
+                    if statement_capture == STATEMENT_FULL
+                    else _truncate(params, statement_max_length)
+                )
+            if doc_id:
+                attributes["elasticsearch.id"] = doc_id
+            if search_target:
+                attributes["elasticsearch.target"] = search_target
+            for key, value in attributes.items():
+                span.set_attribute(key, value)
+
+    def _after_request(span, rv):
+        if isinstance(rv, dict) and span.is_recording():
+            for member in _ATTRIBUTES_FROM_RESULT:
+                if member in rv:
+                    span.set_attribute(
+                        f"elasticsearch.{member}",
+                        str(rv[member]),
+                    )
+
+        if callable(response_hook):
+            response_hook(span, rv)
 
+    def wrapper(wrapped, _, args, kwargs):
+        method, url, op_name, doc_id, search_target = _get_request(args)
         with tracer.start_as_current_span(
             op_name,
             kind=SpanKind.CLIENT,
         ) as span:
-
-            if callable(request_hook):
-                request_hook(span, method, url, kwargs)
-
-            if span.is_recording():
-                attributes = {
-                    SpanAttributes.DB_SYSTEM: "elasticsearch",
-                }
-                if url:
-                    attributes["elasticsearch.url"] = url
-                if method:
-                    attributes["elasticsearch.method"] = method
-                if body:
-                    attributes[SpanAttributes.DB_STATEMENT] = str(body)
-                if params:
-                    attributes["elasticsearch.params"] = str(params)
-                if doc_id:
-                    attributes["elasticsearch.id"] = doc_id
-                if search_target:
-                    attributes["elasticsearch.target"] = search_target
-                for key, value in attributes.items():
-                    span.set_attribute(key, value)
-
+            _before_request(span, method, url, doc_id, search_target, kwargs)
             rv = wrapped(*args, **kwargs)
-            if isinstance(rv, dict) and span.is_recording():
-                for member in _ATTRIBUTES_FROM_RESULT:
-                    if member in rv:
-                        span.set_attribute(
-                            f"elasticsearch.{member}",
-                            str(rv[member]),
-                        )
-
-            if callable(response_hook):
-                response_hook(span, rv)
+            _after_request(span, rv)
+            return rv
+
+    async def async_wrapper(wrapped, _, args, kwargs):
+        method, url, op_name, doc_id, search_target = _get_request(args)
+        with tracer.start_as_current_span(
+            op_name,
+            kind=SpanKind.CLIENT,
+        ) as span:
+            _before_request(span, method, url, doc_id, search_target, kwargs)
+            rv = await wrapped(*args, **kwargs)
+            _after_request(span, rv)
             return rv
 
-    return wrapper
+    return async_wrapper if is_async else wrapper
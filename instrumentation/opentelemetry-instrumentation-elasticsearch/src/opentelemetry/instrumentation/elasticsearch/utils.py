@@ -0,0 +1,173 @@
+# Copyright The OpenTelemetry Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Capture of the request bodies of the elasticsearch integration
+"""
+
+import re
+from collections import Counter
+
+STATEMENT_FULL = "full"
+STATEMENT_OFF = "off"
+STATEMENT_TRUNCATED = "truncated"
+STATEMENT_QUERY = "query"
+STATEMENT_SUMMARY = "summary"
+
+STATEMENT_CAPTURE_MODES = (
+    STATEMENT_FULL,
+    STATEMENT_OFF,
+    STATEMENT_TRUNCATED,
+    STATEMENT_QUERY,
+    STATEMENT_SUMMARY,
+)
+
+_STATEMENT_MAX_LENGTH = 1000
+_TOO_LONG_MARK = "..."
+
+_regex_search_endpoint = re.compile(r"/_(?:search|msearch|count)(?:/|$|\?)")
+# bulk api https://www.elastic.co/guide/en/elasticsearch/reference/current/docs-bulk.html
+_regex_bulk_url = re.compile(r"^/(?:([^/_][^/]*)/)?(?:[^/]+/)?_bulk")
+# only the action and metadata lines are matched, the documents that follow
+# them are skipped without being parsed
+_BULK_ACTION = (
+    r'\s*\{\s*"(\w+)"\s*:\s*\{(?:[^\n]*?"_index"\s*:\s*"([^"\n]*)")?'
+)
+_regex_bulk_action = re.compile(_BULK_ACTION)
+_regex_bulk_action_bytes = re.compile(_BULK_ACTION.encode())
+_BULK_ACTIONS_WITHOUT_SOURCE = ("delete",)
+
+
+def _iter_repr(value, max_length):
+    """Yields the parts of ``str(value)`` for the usual request bodies,
+    only converting to text the parts of large strings that can be kept"""
+    if isinstance(value, dict):
+        yield "{"
+        for index, (key, item) in enumerate(value.items()):
+            if index:
+                yield ", "
+            yield from _iter_repr(key, max_length)
+            yield ": "
+            yield from _iter_repr(item, max_length)
+        yield "}"
+    elif isinstance(value, (list, tuple)):
+        is_list = isinstance(value, list)
+        yield "[" if is_list else "("
+        for index, item in enumerate(value):
+            if index:
+                yield ", "
+            yield from _iter_repr(item, max_length)
+        if not is_list and len(value) == 1:
+            yield ","
+        yield "]" if is_list else ")"
+    elif isinstance(value, (str, bytes, bytearray)):
+        yield repr(value[: max_length + 1])
+    else:
+        yield repr(value)
+
+
+def _truncate(value, max_length=_STATEMENT_MAX_LENGTH):
+    """Formats a request body like ``str(value)``, stopping once
+    ``max_length`` characters are formatted"""
+    if isinstance(value, str):
+        text = value[: max_length + 1]
+    elif isinstance(value, (bytes, bytearray)):
+        text = bytes(value[: max_length + 1]).decode("utf-8", "replace")
+    else:
+        parts = []
+        length = 0
+        for part in _iter_repr(value, max_length):
+            parts.append(part)
+            length += len(part)
+            if length > max_length:
+                break
+        text = "".join(parts)
+    if len(text) > max_length:
+        return text[:max_length] + _TOO_LONG_MARK
+    return text
+
+
+def _summarize_bulk(body, default_index):
+    """Counts the operations of a bulk request body by action and index"""
+    counts = Counter()
+    if isinstance(body, (list, tuple)):
+        position = 0
+        while position < len(body):
+            action = body[position]
+            position += 1
+            if not isinstance(action, dict) or not action:
+                continue
+            name, metadata = next(iter(action.items()))
+            index = default_index
+            if isinstance(metadata, dict):
+                index = metadata.get("_index", default_index)
+            counts[(name, index)] += 1
+            if name not in _BULK_ACTIONS_WITHOUT_SOURCE:
+                position += 1
+        return counts
+
+    if isinstance(body, (bytes, bytearray)):
+        regex, newline = _regex_bulk_action_bytes, b"\n"
+    else:
+        regex, newline = _regex_bulk_action, "\n"
+    position = 0
+    length = len(body)
+    while position < length:
+        end = body.find(newline, position)
+        if end == -1:
+            end = length
+        match = regex.match(body, position, end)
+        position = end + 1
+        if match is None:
+            continue
+        name, index = match.groups()
+        if isinstance(name, bytes):
+            name = name.decode()
+            index = index.decode() if index is not None else None
+        counts[(name, index or default_index)] += 1
+        if name not in _BULK_ACTIONS_WITHOUT_SOURCE:
+            # skip the document of the action
+            end = body.find(newline, position)
+            position = length if end == -1 else end + 1
+    return counts
+
+
+def _format_bulk_summary(counts):
+    return "\n".join(
+        f"{name} {index}: {count}" if index else f"{name}: {count}"
+        for (name, index), count in counts.items()
+    )
+
+
+def _capture_statement(mode, url, body, max_length=_STATEMENT_MAX_LENGTH):
+    """Returns the ``db.statement`` of a request according to the statement
+    capture mode, or None when it is not captured"""
+    if mode == STATEMENT_FULL:
+        return str(body)
+    if mode == STATEMENT_TRUNCATED:
+        return _truncate(body, max_length)
+    if mode in (STATEMENT_QUERY, STATEMENT_SUMMARY) and url:
+        if _regex_search_endpoint.search(url):
+            if isinstance(body, dict) and "query" in body:
+                return _truncate(body["query"], max_length)
+            return _truncate(body, max_length)
+        match = _regex_bulk_url.search(url)
+        if match is not None and mode == STATEMENT_SUMMARY:
+            return _truncate(
+                _format_bulk_summary(_summarize_bulk(body, match.group(1))),
+                max_length,
+            )
+    if mode == STATEMENT_SUMMARY:
+        return _truncate(body, max_length)
+    return None
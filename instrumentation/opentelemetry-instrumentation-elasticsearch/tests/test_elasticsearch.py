@@ -11,11 +11,13 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import asyncio
 import json
 import os
+import sys
 import threading
 from ast import literal_eval
-from unittest import mock
+from unittest import mock, skipIf
 
 import elasticsearch
 import elasticsearch.exceptions
@@ -27,6 +29,7 @@ from opentelemetry import trace
 from opentelemetry.instrumentation.elasticsearch import (
     ElasticsearchInstrumentor,
 )
+from opentelemetry.instrumentation.elasticsearch.utils import _summarize_bulk
 from opentelemetry.semconv.trace import SpanAttributes
 from opentelemetry.test.test_base import TestBase
 from opentelemetry.trace import StatusCode
@@ -413,3 +416,360 @@ class TestElasticsearchIntegration(TestBase):
             json.dumps(response_payload),
             spans[0].attributes[response_attribute_name],
         )
+
+    def _instrument_statement(self, **kwargs):
+        ElasticsearchInstrumentor().uninstrument()
+        ElasticsearchInstrumentor().instrument(**kwargs)
+
+    def test_statement_capture_off(self, request_mock):
+        request_mock.return_value = (1, {}, {})
+        self._instrument_statement(statement_capture="off")
+
+        Elasticsearch().index(
+            index="sw", doc_type="_doc", id=1, body={"name": "adam"}
+        )
+
+        span = self.get_finished_spans()[0]
+        self.assertNotIn(SpanAttributes.DB_STATEMENT, span.attributes)
+
+    def test_statement_capture_truncated(self, request_mock):
+        request_mock.return_value = (1, {}, {})
+        self._instrument_statement(
+            statement_capture="truncated", statement_max_length=20
+        )
+
+        es = Elasticsearch()
+        es.index(index="sw", doc_type="_doc", id=1, body={"name": "adam"})
+        es.index(
+            index="sw",
+            doc_type="_doc",
+            id=2,
+            body={"name": "a" * 10 * 1024 * 1024},
+            params={"refresh": "true" * 10},
+        )
+
+        short, large = self.get_finished_spans()
+        self.assertEqual(
+            short.attributes[SpanAttributes.DB_STATEMENT],
+            str({"name": "adam"}),
+        )
+        self.assertEqual(
+            large.attributes[SpanAttributes.DB_STATEMENT],
+            "{'name': 'aaaaaaaaaa...",
+        )
+        self.assertEqual(
+            large.attributes["elasticsearch.params"],
+            "{'refresh': 'truetru...",
+        )
+
+    def test_statement_capture_query(self, request_mock):
+        request_mock.return_value = (1, {}, '{"hits": {"hits": []}}')
+        self._instrument_statement(statement_capture="query")
+
+        client = Elasticsearch()
+        Search(using=client, index="test-index").filter(
+            "term", author="testing"
+        ).extra(size=10).execute()
+        client.index(index="sw", doc_type="_doc", id=1, body={"name": "adam"})
+
+        search, index = self.get_finished_spans()
+        self.assertEqual(
+            search.attributes[SpanAttributes.DB_STATEMENT],
+            str({"bool": {"filter": [{"term": {"author": "testing"}}]}}),
+        )
+        self.assertNotIn(SpanAttributes.DB_STATEMENT, index.attributes)
+
+    def test_statement_capture_summary(self, request_mock):
+        request_mock.return_value = (1, {}, '{"items": []}')
+        self._instrument_statement(statement_capture="summary")
+
+        Elasticsearch().bulk(
+            body=[
+                {"index": {"_index": "books", "_id": 1}},
+                {"title": "a"},
+                {"delete": {"_index": "books", "_id": 2}},
+                {"update": {"_id": 3}},
+                {"doc": {"title": "c"}},
+                {"index": {"_index": "books", "_id": 4}},
+                {"title": "d"},
+            ],
+            index="default",
+            doc_type="_doc",
+        )
+
+        span = self.get_finished_spans()[0]
+        self.assertEqual(
+            span.attributes[SpanAttributes.DB_STATEMENT],
+            "index books: 2\ndelete books: 1\nupdate default: 1",
+        )
+
+    def test_summarize_bulk(self, _):
+        body = (
+            '{"index": {"_index": "books", "_id": "1"}}\n'
+            '{"index": {"_index": "fake"}}\n'
+            '{"delete": {"_id": "2"}}\n'
+            "\n"
+            '{ "create" : { "_id" : "3", "_index" : "authors" } }\n'
+            '{"name": "c"}'
+        )
+        expected = {
+            ("index", "books"): 1,
+            ("delete", None): 1,
+            ("create", "authors"): 1,
+        }
+        self.assertEqual(_summarize_bulk(body, None), expected)
+        self.assertEqual(_summarize_bulk(body.encode(), None), expected)
+
+    def test_invalid_statement_capture(self, _):
+        ElasticsearchInstrumentor().uninstrument()
+        with self.assertRaises(ValueError):
+            ElasticsearchInstrumentor().instrument(statement_capture="all")
+
+    def test_url_templates(self, _):
+        # pylint: disable=protected-access
+        template_url = (
+            opentelemetry.instrumentation.elasticsearch._template_url
+        )
+        for url, expected in (
+            ("/idx/_doc/1", ("/idx/_doc/:id", "1", None)),
+            ("/idx/_update/1", ("/idx/_update/:id", "1", None)),
+            ("/idx/_create/1", ("/idx/_create/:id", "1", None)),
+            ("/idx/_doc/1/_source", ("/idx/_doc/:id/_source", "1", None)),
+            ("/idx/_search", ("/<target>/_search", None, "idx")),
+            ("/idx/_msearch", ("/<target>/_msearch", None, "idx")),
+            ("/idx/_count", ("/<target>/_count", None, "idx")),
+            ("/idx/_mget", ("/<target>/_mget", None, "idx")),
+            ("/idx/_doc/_mget", ("/<target>/_mget", None, "_doc")),
+            ("/idx/_bulk", ("/<target>/_bulk", None, "idx")),
+            ("/_bulk", ("/_bulk", None, None)),
+            ("/idx", ("/idx", None, None)),
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(template_url(url), expected)
+
+    def test_url_template_cache(self, request_mock):
+        request_mock.return_value = (1, {}, {})
+        es = Elasticsearch()
+
+        with mock.patch(
+            "opentelemetry.instrumentation.elasticsearch._template_url",
+            wraps=opentelemetry.instrumentation.elasticsearch._template_url,
+        ) as template_url:
+            for _ in range(3):
+                es.update(index="sw", doc_type="_doc", id=1, body={"doc": {}})
+            es.update(index="sw", doc_type="_doc", id=2, body={"doc": {}})
+
+        self.assertEqual(template_url.call_count, 2)
+        spans = self.get_finished_spans()
+        self.assertEqual(len(spans), 4)
+        for span in spans:
+            self.assertIn(
+                span.name,
+                (
+                    "Elasticsearch/sw/_doc/:id/_update",
+                    "Elasticsearch/sw/_update/:id",
+                ),
+            )
+        self.assertEqual(spans[-1].attributes["elasticsearch.id"], "2")
+
+
+@skipIf(
+    sys.version_info < (3, 8) or not hasattr(elasticsearch, "AsyncTransport"),
+    "requires AsyncMock and elasticsearch[async]",
+)
+class TestAsyncElasticsearchIntegration(TestBase):
+    def setUp(self):
+        super().setUp()
+        ElasticsearchInstrumentor().instrument()
+        patcher = mock.patch(
+            "elasticsearch.AIOHttpConnection.perform_request",
+            new_callable=mock.AsyncMock,
+        )
+        self.request_mock = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        super().tearDown()
+        with self.disable_logging():
+            ElasticsearchInstrumentor().uninstrument()
+
+    def _run(self, coroutine_function):
+        async def run():
+            client = elasticsearch.AsyncElasticsearch()
+            # skip the product check request of elasticsearch >= 7.14
+            # pylint: disable=protected-access
+            client.transport._verified_elasticsearch = True
+            try:
+                return await coroutine_function(client)
+            finally:
+                await client.close()
+
+        return asyncio.run(run())
+
+    def test_get(self):
+        self.request_mock.return_value = (
+            200,
+            {},
+            '{"found": true, "took": 3}',
+        )
+
+        self._run(
+            lambda client: client.get(index="test-index", id=1, params={})
+        )
+
+        spans = self.get_finished_spans()
+        self.assertEqual(len(spans), 1)
+        span = spans[0]
+        self.assertEqual(span.name, "Elasticsearch/test-index/_doc/:id")
+        self.assertEqualSpanInstrumentationInfo(
+            span, opentelemetry.instrumentation.elasticsearch
+        )
+        self.assertEqual(
+            span.attributes,
+            {
+                SpanAttributes.DB_SYSTEM: "elasticsearch",
+                "elasticsearch.url": "/test-index/_doc/1",
+                "elasticsearch.method": "GET",
+                "elasticsearch.id": "1",
+                "elasticsearch.found": "True",
+                "elasticsearch.took": "3",
+            },
+        )
+
+    def test_search_hooks(self):
+        self.request_mock.return_value = (200, {}, '{"hits": {"hits": []}}')
+
+        def request_hook(span, method, url, kwargs):
+            span.set_attribute("request_hook.url", url)
+
+        def response_hook(span, response):
+            span.set_attribute("response_hook.hits", json.dumps(response))
+
+        ElasticsearchInstrumentor().uninstrument()
+        ElasticsearchInstrumentor().instrument(
+            request_hook=request_hook, response_hook=response_hook
+        )
+
+        self._run(
+            lambda client: client.search(
+                index="test-index", body={"query": {"match_all": {}}}
+            )
+        )
+
+        span = self.get_finished_spans()[0]
+        self.assertEqual(span.name, "Elasticsearch/<target>/_search")
+        self.assertEqual(span.attributes["elasticsearch.target"], "test-index")
+        self.assertEqual(
+            span.attributes[SpanAttributes.DB_STATEMENT],
+            str({"query": {"match_all": {}}}),
+        )
+        self.assertEqual(
+            span.attributes["request_hook.url"], "/test-index/_search"
+        )
+        self.assertEqual(
+            span.attributes["response_hook.hits"], '{"hits": {"hits": []}}'
+        )
+
+    def test_error(self):
+        self.request_mock.side_effect = elasticsearch.exceptions.NotFoundError(
+            404, "not found"
+        )
+
+        with self.assertRaises(elasticsearch.exceptions.NotFoundError):
+            self._run(lambda client: client.get(index="test-index", id=1))
+
+        span = self.get_finished_spans()[0]
+        self.assertEqual(span.status.status_code, StatusCode.ERROR)
+
+    def test_uninstrument(self):
+        self.request_mock.return_value = (200, {}, "{}")
+        ElasticsearchInstrumentor().uninstrument()
+
+        self._run(lambda client: client.get(index="test-index", id=1))
+
+        self.assertEqual(len(self.get_finished_spans()), 0)
+
+
+class _StubAsyncTransport:
+    """Stands in for ``elasticsearch.AsyncTransport``, only available with
+    ``elasticsearch[async]`` >= 7.8, to test the wrapper of its requests"""
+
+    def __init__(self, response=None, error=None):
+        self.response = response
+        self.error = error
+        self.current_span = None
+
+    # pylint: disable=unused-argument
+    async def perform_request(
+        self, method, url, headers=None, params=None, body=None
+    ):
+        self.current_span = trace.get_current_span()
+        if self.error is not None:
+            raise self.error
+        return self.response
+
+
+class TestStubAsyncTransport(TestBase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(
+            elasticsearch, "AsyncTransport", _StubAsyncTransport, create=True
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        ElasticsearchInstrumentor().instrument()
+
+    def tearDown(self):
+        super().tearDown()
+        with self.disable_logging():
+            ElasticsearchInstrumentor().uninstrument()
+
+    def test_perform_request(self):
+        transport = _StubAsyncTransport(response={"found": True, "took": 3})
+
+        response = asyncio.run(
+            transport.perform_request(
+                "GET", "/test-index/_doc/1", params={"refresh": "true"}
+            )
+        )
+
+        self.assertEqual(response, {"found": True, "took": 3})
+        spans = self.get_finished_spans()
+        self.assertEqual(len(spans), 1)
+        span = spans[0]
+        self.assertEqual(span.name, "Elasticsearch/test-index/_doc/:id")
+        self.assertEqual(span.kind, trace.SpanKind.CLIENT)
+        self.assertEqual(
+            transport.current_span.get_span_context(), span.context
+        )
+        self.assertEqual(
+            span.attributes,
+            {
+                SpanAttributes.DB_SYSTEM: "elasticsearch",
+                "elasticsearch.url": "/test-index/_doc/1",
+                "elasticsearch.method": "GET",
+                "elasticsearch.params": "{'refresh': 'true'}",
+                "elasticsearch.id": "1",
+                "elasticsearch.found": "True",
+                "elasticsearch.took": "3",
+            },
+        )
+
+    def test_error(self):
+        transport = _StubAsyncTransport(
+            error=elasticsearch.exceptions.NotFoundError(404, "not found")
+        )
+
+        with self.assertRaises(elasticsearch.exceptions.NotFoundError):
+            asyncio.run(transport.perform_request("GET", "/test-index/_doc/1"))
+
+        span = self.get_finished_spans()[0]
+        self.assertEqual(span.status.status_code, StatusCode.ERROR)
+
+    def test_uninstrument(self):
+        ElasticsearchInstrumentor().uninstrument()
+        transport = _StubAsyncTransport(response={})
+
+        asyncio.run(transport.perform_request("GET", "/test-index/_doc/1"))
+
+        self.assertEqual(len(self.get_finished_spans()), 0)
@@ -35,6 +35,16 @@ Usage
     cursor.close()
     cnx.close()
 
+The ``enable_commenter`` argument appends a sqlcommenter comment with the
+trace context to the queries, ``commenter_tags`` adds static tags such as the
+service name to it:
+
+.. code-block:: python
+
+    Psycopg2Instrumentor().instrument(
+        enable_commenter=True, commenter_tags={"service": "payments"}
+    )
+
 API
 ---
 """
@@ -87,6 +97,11 @@ class Psycopg2Instrumentor(BaseInstrumentor):
             tracer_provider=tracer_provider,
             db_api_integration_factory=DatabaseApiIntegration,
             enable_commenter=enable_sqlcommenter,
+            commenter_tags=kwargs.get("commenter_tags"),
+            capture_parameters=kwargs.get("capture_parameters", False),
+            executemany_parameters_max_length=kwargs.get(
+                "executemany_parameters_max_length"
+            ),
         )
 
     def _uninstrument(self, **kwargs):
@@ -151,10 +166,7 @@ class CursorTracer(dbapi.CursorTracer):
         if isinstance(statement, Composed):
             statement = statement.as_string(cursor)
 
-        if isinstance(statement, str):
-            return statement.split()[0]
-
-        return ""
+        return super().get_operation_name(cursor, (statement,))
 
     def get_statement(self, cursor, args):
         if not args:
@@ -163,7 +175,7 @@ class CursorTracer(dbapi.CursorTracer):
         statement = args[0]
         if isinstance(statement, Composed):
             statement = statement.as_string(cursor)
-        return statement
+        return super().get_statement(cursor, (statement,))
 
 
 def _new_cursor_factory(db_api=None, base_factory=None, tracer_provider=None):
@@ -187,7 +199,7 @@ def _new_cursor_factory(db_api=None, base_factory=None, tracer_provider=None):
 
         def executemany(self, *args, **kwargs):
             return _cursor_tracer.traced_execution(
-                self, super().executemany, *args, **kwargs
+                self, super().executemany, *args, executemany=True, **kwargs
             )
 
         def callproc(self, *args, **kwargs):
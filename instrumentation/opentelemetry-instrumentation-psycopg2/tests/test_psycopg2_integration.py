@@ -234,6 +234,15 @@ class TestPostgresqlIntegration(TestBase):
         cursor.execute(query)
         kwargs = event_mocked.call_args[1]
         self.assertEqual(kwargs["enable_commenter"], True)
+        self.assertIsNone(kwargs["commenter_tags"])
+
+    @mock.patch("opentelemetry.instrumentation.dbapi.wrap_connect")
+    def test_sqlcommenter_tags(self, event_mocked):
+        Psycopg2Instrumentor().instrument(
+            enable_commenter=True, commenter_tags={"service": "test"}
+        )
+        kwargs = event_mocked.call_args[1]
+        self.assertEqual(kwargs["commenter_tags"], {"service": "test"})
 
     @mock.patch("opentelemetry.instrumentation.dbapi.wrap_connect")
     def test_sqlcommenter_disabled(self, event_mocked):
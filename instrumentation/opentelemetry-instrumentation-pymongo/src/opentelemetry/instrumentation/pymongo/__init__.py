@@ -46,6 +46,40 @@ this function signature is:  def response_hook(span: Span, event: CommandSucceed
 failed_hook (Callable) -
 a function with extra user-defined logic to be performed after the query returns with a failed response
 this function signature is:  def failed_hook(span: Span, event: CommandFailedEvent) -> None
+max_pending_spans (int) -
+the number of commands in progress above which the spans of the oldest ones are
+ended with an error status, as their result was lost, at least 1, defaults to 10000
+pending_span_timeout (float) -
+the number of seconds after which the span of a command without result is ended
+with an error status, defaults to 3600, None disables the timeout
+statement_capture (str) -
+what the ``db.statement`` attribute reports of the commands, one of:
+
+* ``command``: the name of the command
+* ``collection``: the name of the command and its collection, the default
+* ``shape``: the name of the command, its collection and its filter or
+  pipeline with the values replaced by ``?``
+* ``full``: the command document
+
+statement_max_length (int) -
+the number of characters of ``db.statement`` above which it is truncated,
+defaults to 1000
+meter_provider (MeterProvider) - an optional meter provider
+enable_pool_metrics (bool) -
+whether to report the metrics of the connection pools, defaults to False
+enable_heartbeat_metrics (bool) -
+whether to report the round trip time of the heartbeats sent to the servers,
+defaults to False
+
+The pool metrics are ``db.client.connections.wait_time``, the time spent
+checking out a connection, ``db.client.connections.timeouts``,
+``db.client.connections.usage``, the used and idle connections as the
+``state`` attribute, ``db.client.connections.max``, the maximum size of the
+pools, and ``db.client.connections.pending_requests``, the requests waiting for
+a connection. The heartbeat metrics are ``db.mongodb.heartbeat.duration`` and
+``db.mongodb.heartbeat.failures``. All of them have a ``pool.name`` attribute
+which is the address of the server. Like the tracing, the metrics are only
+reported for the clients created after ``instrument`` is called.
 
 for example:
 
@@ -73,14 +107,29 @@ for example:
     collection.find_one()
 
 """
+from collections import OrderedDict
 from logging import getLogger
-from typing import Callable, Collection
+from threading import Lock
+from time import monotonic
+from typing import Callable, Collection, Optional
 
 from pymongo import monitoring
 
 from opentelemetry import context
+from opentelemetry._metrics import get_meter
 from opentelemetry.instrumentation.instrumentor import BaseInstrumentor
+from opentelemetry.instrumentation.pymongo.metrics import (
+    PoolMetricsListener,
+    ServerHeartbeatMetricsListener,
+)
 from opentelemetry.instrumentation.pymongo.package import _instruments
+from opentelemetry.instrumentation.pymongo.utils import (
+    _STATEMENT_MAX_LENGTH,
+    STATEMENT_CAPTURE_MODES,
+    STATEMENT_COLLECTION,
+    _capture_statement,
+    _get_target,
+)
 from opentelemetry.instrumentation.pymongo.version import __version__
 from opentelemetry.instrumentation.utils import _SUPPRESS_INSTRUMENTATION_KEY
 from opentelemetry.semconv.trace import DbSystemValues, SpanAttributes
@@ -95,10 +144,78 @@ ResponseHookT = Callable[[Span, monitoring.CommandSucceededEvent], None]
 FailedHookT = Callable[[Span, monitoring.CommandFailedEvent], None]
 
 
+# The spans of the commands whose result is not received are ended once
+# there are more than _MAX_PENDING_SPANS commands in progress or after
+# _PENDING_SPAN_TIMEOUT seconds
+_MAX_PENDING_SPANS = 10000
+_PENDING_SPAN_TIMEOUT = 3600
+
+
 def dummy_callback(span, event):
     ...
 
 
+class _SpanRegistry:
+    """The spans of the commands in progress, keyed by request and
+    connection.
+
+    A span is removed when the result of its command is received. If that
+    event is lost, the span is ended with an error status when the registry
+    is full or the span has been in progress for longer than the timeout,
+    the oldest spans being checked when new ones are added.
+    """
+
+    def __init__(
+        self,
+        max_size: int = _MAX_PENDING_SPANS,
+        timeout: Optional[float] = _PENDING_SPAN_TIMEOUT,
+    ):
+        if max_size < 1:
+            raise ValueError(
+                f"Invalid maximum number of pending spans {max_size!r}, "
+                "expected at least 1"
+            )
+        self._spans = OrderedDict()
+        self._lock = Lock()
+        self.max_size = max_size
+        self.timeout = timeout
+        self.orphaned_count = 0
+
+    def __len__(self):
+        return len(self._spans)
+
+    def add(self, key, span: Span):
+        now = monotonic()
+        with self._lock:
+            orphans = []
+            entry = self._spans.pop(key, None)
+            if entry is not None:
+                orphans.append(entry[0])
+            self._spans[key] = (span, now)
+            while len(self._spans) > self.max_size or (
+                self.timeout is not None
+                and now - next(iter(self._spans.values()))[1] > self.timeout
+            ):
+                orphans.append(self._spans.popitem(last=False)[1][0])
+            self.orphaned_count += len(orphans)
+        for orphan in orphans:
+            _end_orphaned_span(orphan)
+
+    def pop(self, key) -> Optional[Span]:
+        with self._lock:
+            entry = self._spans.pop(key, None)
+        return entry[0] if entry is not None else None
+
+
+def _end_orphaned_span(span: Span):
+    _LOG.debug("No result received for the command of span %s", span)
+    if span.is_recording():
+        span.set_status(
+            Status(StatusCode.ERROR, "No result received for the command")
+        )
+    span.end()
+
+
 class CommandTracer(monitoring.CommandListener):
     def __init__(
         self,
@@ -106,13 +223,26 @@ class CommandTracer(monitoring.CommandListener):
         request_hook: RequestHookT = dummy_callback,
         response_hook: ResponseHookT = dummy_callback,
         failed_hook: FailedHookT = dummy_callback,
+        max_pending_spans: int = _MAX_PENDING_SPANS,
+        pending_span_timeout: Optional[float] = _PENDING_SPAN_TIMEOUT,
+        statement_capture: str = STATEMENT_COLLECTION,
+        statement_max_length: int = _STATEMENT_MAX_LENGTH,
     ):
+        if statement_capture not in STATEMENT_CAPTURE_MODES:
+            raise ValueError(
+                f"Invalid statement capture mode {statement_capture!r}, "
+                f"expected one of {', '.join(STATEMENT_CAPTURE_MODES)}"
+            )
         self._tracer = tracer
-        self._span_dict = {}
+        self._span_registry = _SpanRegistry(
+            max_pending_spans, pending_span_timeout
+        )
         self.is_enabled = True
         self.start_hook = request_hook
         self.success_hook = response_hook
         self.failed_hook = failed_hook
+        self.statement_capture = statement_capture
+        self.statement_max_length = statement_max_length
 
     def started(self, event: monitoring.CommandStartedEvent):
         """Method to handle a pymongo CommandStartedEvent"""
@@ -120,12 +250,10 @@ class CommandTracer(monitoring.CommandListener):
             _SUPPRESS_INSTRUMENTATION_KEY
         ):
             return
-        command = event.command.get(event.command_name, "")
         name = event.command_name
-        statement = event.command_name
-        if command:
-            name += "." + str(command)
-            statement += " " + str(command)
+        target = _get_target(event.command_name, event.command)
+        if target:
+            name += "." + target
 
         try:
             span = self._tracer.start_span(name, kind=SpanKind.CLIENT)
@@ -134,7 +262,15 @@ class CommandTracer(monitoring.CommandListener):
                     SpanAttributes.DB_SYSTEM, DbSystemValues.MONGODB.value
                 )
                 span.set_attribute(SpanAttributes.DB_NAME, event.database_name)
-                span.set_attribute(SpanAttributes.DB_STATEMENT, statement)
+                span.set_attribute(
+                    SpanAttributes.DB_STATEMENT,
+                    _capture_statement(
+                        self.statement_capture,
+                        event.command_name,
+                        event.command,
+                        self.statement_max_length,
+                    ),
+                )
                 if event.connection_id is not None:
                     span.set_attribute(
                         SpanAttributes.NET_PEER_NAME, event.connection_id[0]
@@ -147,8 +283,7 @@ class CommandTracer(monitoring.CommandListener):
             except Exception as hook_exception:  # noqa pylint: disable=broad-except
                 _LOG.exception(hook_exception)
 
-            # Add Span to dictionary
-            self._span_dict[_get_span_dict_key(event)] = span
+            self._span_registry.add(_get_span_dict_key(event), span)
         except Exception as ex:  # noqa pylint: disable=broad-except
             if span is not None and span.is_recording():
                 span.set_status(Status(StatusCode.ERROR, str(ex)))
@@ -189,7 +324,7 @@ class CommandTracer(monitoring.CommandListener):
         span.end()
 
     def _pop_span(self, event):
-        return self._span_dict.pop(_get_span_dict_key(event), None)
+        return self._span_registry.pop(_get_span_dict_key(event))
 
 
 def _get_span_dict_key(event):
@@ -200,6 +335,8 @@ def _get_span_dict_key(event):
 
 class PymongoInstrumentor(BaseInstrumentor):
     _commandtracer_instance = None  # type CommandTracer
+    _pool_metrics_instance = None  # type PoolMetricsListener
+    _heartbeat_metrics_instance = None  # type ServerHeartbeatMetricsListener
     # The instrumentation for PyMongo is based on the event listener interface
     # https://api.mongodb.com/python/current/api/pymongo/monitoring.html.
     # This interface only allows to register listeners and does not provide
@@ -217,12 +354,35 @@ class PymongoInstrumentor(BaseInstrumentor):
         Args:
             tracer_provider: The `TracerProvider` to use. If none is passed the
                 current configured one is used.
+            max_pending_spans: The number of commands in progress above which
+                the spans of the oldest ones are ended.
+            pending_span_timeout: The number of seconds after which the span
+                of a command without result is ended.
+            meter_provider: The `MeterProvider` to use. If none is passed the
+                current configured one is used.
+            enable_pool_metrics: Whether to report the metrics of the
+                connection pools.
+            enable_heartbeat_metrics: Whether to report the round trip time
+                of the heartbeats sent to the servers.
+            statement_capture: What ``db.statement`` reports of the commands.
+            statement_max_length: The length above which ``db.statement``
+                is truncated.
         """
 
         tracer_provider = kwargs.get("tracer_provider")
         request_hook = kwargs.get("request_hook", dummy_callback)
         response_hook = kwargs.get("response_hook", dummy_callback)
         failed_hook = kwargs.get("failed_hook", dummy_callback)
+        max_pending_spans = kwargs.get("max_pending_spans", _MAX_PENDING_SPANS)
+        pending_span_timeout = kwargs.get(
+            "pending_span_timeout", _PENDING_SPAN_TIMEOUT
+        )
+        statement_capture = kwargs.get(
+            "statement_capture", STATEMENT_COLLECTION
+        )
+        statement_max_length = kwargs.get(
+            "statement_max_length", _STATEMENT_MAX_LENGTH
+        )
 
         # Create and register a CommandTracer only the first time
         if self._commandtracer_instance is None:
@@ -233,12 +393,40 @@ class PymongoInstrumentor(BaseInstrumentor):
                 request_hook=request_hook,
                 response_hook=response_hook,
                 failed_hook=failed_hook,
+                max_pending_spans=max_pending_spans,
+                pending_span_timeout=pending_span_timeout,
+                statement_capture=statement_capture,
+                statement_max_length=statement_max_length,
             )
             monitoring.register(self._commandtracer_instance)
 
         # If already created, just enable it
         self._commandtracer_instance.is_enabled = True
 
+        if kwargs.get("enable_pool_metrics", False) or kwargs.get(
+            "enable_heartbeat_metrics", False
+        ):
+            meter = get_meter(
+                __name__, __version__, kwargs.get("meter_provider")
+            )
+        if kwargs.get("enable_pool_metrics", False):
+            if self._pool_metrics_instance is None:
+                self._pool_metrics_instance = PoolMetricsListener(meter)
+                monitoring.register(self._pool_metrics_instance)
+            self._pool_metrics_instance.is_enabled = True
+        if kwargs.get("enable_heartbeat_metrics", False):
+            if self._heartbeat_metrics_instance is None:
+                self._heartbeat_metrics_instance = (
+                    ServerHeartbeatMetricsListener(meter)
+                )
+                monitoring.register(self._heartbeat_metrics_instance)
+            self._heartbeat_metrics_instance.is_enabled = True
+
     def _uninstrument(self, **kwargs):
-        if self._commandtracer_instance is not None:
-            self._commandtracer_instance.is_enabled = False
+        for listener in (
+            self._commandtracer_instance,
+            self._pool_metrics_instance,
+            self._heartbeat_metrics_instance,
+        ):
+            if listener is not None:
+                listener.is_enabled = False
@@ -0,0 +1,214 @@
+# Copyright The OpenTelemetry Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Metrics of the connection pools and server monitoring of the pymongo
+integration
+"""
+
+import collections
+import functools
+import threading
+from time import monotonic
+from types import MappingProxyType
+from typing import Iterable
+
+from pymongo import common, monitoring
+
+from opentelemetry._metrics import Observation
+
+_POOL_NAME = "pool.name"
+_STATE = "state"
+
+
+@functools.lru_cache(maxsize=256)
+def _get_attributes(address):
+    host, port = address
+    # the port of unix domain sockets is None
+    name = host if port is None else f"{host}:{port}"
+    return MappingProxyType({_POOL_NAME: name})
+
+
+@functools.lru_cache(maxsize=256)
+def _get_state_attributes(address, state):
+    return MappingProxyType({**_get_attributes(address), _STATE: state})
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Reports the metrics of the connection pools from their events.
+
+    The connections are counted as used from their checkout to their
+    checkin, and as idle otherwise, the requests waiting for a connection
+    are counted from the start of their checkout.
+
+    The connections are counted even while the listener is disabled, as
+    pymongo listeners cannot be unregistered, so that their number is still
+    right once it is enabled again.
+    """
+
+    def __init__(self, meter):
+        self.is_enabled = True
+        # start times of the checkouts of the current thread by address
+        self._local = threading.local()
+        # number of connections by address and state
+        self._connections = collections.Counter()
+        self._connections_lock = threading.Lock()
+        # maximum sizes of the pools of each address, as several clients
+        # can connect to the same servers
+        self._max_pool_sizes = {}
+        self._wait_time = meter.create_histogram(
+            name="db.client.connections.wait_time",
+            unit="ms",
+            description="The time it took to obtain an open connection from the pool",
+        )
+        self._timeouts = meter.create_counter(
+            name="db.client.connections.timeouts",
+            unit="timeouts",
+            description="The number of connection timeouts that have occurred trying to obtain a connection from the pool",
+        )
+        meter.create_observable_gauge(
+            name="db.client.connections.usage",
+            callbacks=[self._get_usage],
+            unit="connections",
+            description="The number of connections that are currently in the state described by the state attribute",
+        )
+        self._max = meter.create_up_down_counter(
+            name="db.client.connections.max",
+            unit="connections",
+            description="The maximum number of open connections allowed",
+        )
+        self._pending_requests = meter.create_up_down_counter(
+            name="db.client.connections.pending_requests",
+            unit="requests",
+            description="The number of pending requests for an open connection",
+        )
+
+    def _get_checkout_starts(self):
+        starts = getattr(self._local, "checkout_starts", None)
+        if starts is None:
+            starts = self._local.checkout_starts = {}
+        return starts
+
+    def _end_checkout(self, address):
+        start = self._get_checkout_starts().pop(address, None)
+        if start is None:
+            return
+        attributes = _get_attributes(address)
+        self._pending_requests.add(-1, attributes)
+        self._wait_time.record((monotonic() - start) * 1000, attributes)
+
+    def _move_connection(self, address, from_state, to_state):
+        with self._connections_lock:
+            if from_state is not None:
+                self._connections[address, from_state] -= 1
+            if to_state is not None:
+                self._connections[address, to_state] += 1
+
+    def _get_usage(self) -> Iterable[Observation]:
+        """Observer callback for the used and idle connections"""
+        if not self.is_enabled:
+            return
+        with self._connections_lock:
+            connections = list(self._connections.items())
+        for (address, state), count in connections:
+            yield Observation(count, _get_state_attributes(address, state))
+
+    @staticmethod
+    def _get_max_pool_size(event):
+        # the options of the event only include non default values
+        return event.options.get("maxPoolSize", common.MAX_POOL_SIZE)
+
+    def pool_created(self, event):
+        max_pool_size = self._get_max_pool_size(event)
+        if self.is_enabled and max_pool_size:
+            self._max_pool_sizes.setdefault(event.address, []).append(
+                max_pool_size
+            )
+            self._max.add(max_pool_size, _get_attributes(event.address))
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        max_pool_sizes = self._max_pool_sizes.get(event.address)
+        if max_pool_sizes:
+            self._max.add(
+                -max_pool_sizes.pop(), _get_attributes(event.address)
+            )
+
+    def connection_created(self, event):
+        self._move_connection(event.address, None, "idle")
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._move_connection(event.address, "idle", None)
+
+    def connection_check_out_started(self, event):
+        if not self.is_enabled:
+            return
+        self._get_checkout_starts()[event.address] = monotonic()
+        self._pending_requests.add(1, _get_attributes(event.address))
+
+    def connection_check_out_failed(self, event):
+        self._end_checkout(event.address)
+        if (
+            self.is_enabled
+            and event.reason
+            == monitoring.ConnectionCheckOutFailedReason.TIMEOUT
+        ):
+            self._timeouts.add(1, _get_attributes(event.address))
+
+    def connection_checked_out(self, event):
+        self._end_checkout(event.address)
+        self._move_connection(event.address, "idle", "used")
+
+    def connection_checked_in(self, event):
+        self._move_connection(event.address, "used", "idle")
+
+
+class ServerHeartbeatMetricsListener(monitoring.ServerHeartbeatListener):
+    """Reports the round trip time of the heartbeats sent to the servers"""
+
+    def __init__(self, meter):
+        self.is_enabled = True
+        self._duration = meter.create_histogram(
+            name="db.mongodb.heartbeat.duration",
+            unit="ms",
+            description="The round trip time of the heartbeats sent to the servers",
+        )
+        self._failures = meter.create_counter(
+            name="db.mongodb.heartbeat.failures",
+            unit="heartbeats",
+            description="The number of heartbeats that failed",
+        )
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        # the duration of the awaited heartbeats of the streaming protocol
+        # includes the time waiting for a change of the server
+        if self.is_enabled and not getattr(event, "awaited", False):
+            self._duration.record(
+                event.duration * 1000, _get_attributes(event.connection_id)
+            )
+
+    def failed(self, event):
+        if self.is_enabled:
+            self._failures.add(1, _get_attributes(event.connection_id))
@@ -0,0 +1,146 @@
+# Copyright The OpenTelemetry Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Capture of the commands of the pymongo integration
+"""
+
+import json
+from collections.abc import Mapping
+
+STATEMENT_COMMAND = "command"
+STATEMENT_COLLECTION = "collection"
+STATEMENT_SHAPE = "shape"
+STATEMENT_FULL = "full"
+
+STATEMENT_CAPTURE_MODES = (
+    STATEMENT_COMMAND,
+    STATEMENT_COLLECTION,
+    STATEMENT_SHAPE,
+    STATEMENT_FULL,
+)
+
+_STATEMENT_MAX_LENGTH = 1000
+_TOO_LONG_MARK = "..."
+_PLACEHOLDER = "?"
+
+# fields of the commands holding the filter of the documents, the filters of
+# the update and delete commands are in each of their statements
+_FILTER_FIELDS = {
+    "find": "filter",
+    "count": "query",
+    "distinct": "query",
+    "findAndModify": "query",
+    "findandmodify": "query",
+    "aggregate": "pipeline",
+}
+_STATEMENTS_FIELDS = {"update": "updates", "delete": "deletes"}
+
+
+def _get_target(command_name, command):
+    """Returns the collection, or the value, of the command when it is short
+    enough to be formatted in span names"""
+    value = command.get(command_name, "")
+    if isinstance(value, (str, int)):
+        return str(value)
+    return ""
+
+
+def _sanitize(value):
+    """Replaces the values of a filter or pipeline by placeholders, keeping
+    the field names and operators"""
+    if isinstance(value, Mapping):
+        return {key: _sanitize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)) and any(
+        isinstance(item, Mapping) for item in value
+    ):
+        return [_sanitize(item) for item in value]
+    return _PLACEHOLDER
+
+
+def _get_filter(command_name, command):
+    field = _FILTER_FIELDS.get(command_name)
+    if field is not None:
+        return command.get(field)
+    field = _STATEMENTS_FIELDS.get(command_name)
+    if field is not None:
+        statements = command.get(field)
+        # the statements of a batch are summarized by the first one
+        if statements and isinstance(statements[0], Mapping):
+            return statements[0].get("q")
+    return None
+
+
+def _iter_document(value, max_length):
+    """Yields the parts of ``str(value)`` for a command document, only
+    converting to text the parts of large strings that can be kept"""
+    if isinstance(value, Mapping):
+        yield "{"
+        for index, (key, item) in enumerate(value.items()):
+            if index:
+                yield ", "
+            yield repr(key)
+            yield ": "
+            yield from _iter_document(item, max_length)
+        yield "}"
+    elif isinstance(value, (list, tuple)):
+        yield "["
+        for index, item in enumerate(value):
+            if index:
+                yield ", "
+            yield from _iter_document(item, max_length)
+        yield "]"
+    elif isinstance(value, (str, bytes)):
+        yield repr(value[: max_length + 1])
+    else:
+        yield repr(value)
+
+
+def _truncate(text, max_length):
+    if len(text) > max_length:
+        return text[:max_length] + _TOO_LONG_MARK
+    return text
+
+
+def _format_document(document, max_length):
+    """Formats a command document like ``str(document)``, stopping once
+    ``max_length`` characters are formatted"""
+    parts = []
+    length = 0
+    for part in _iter_document(document, max_length):
+        parts.append(part)
+        length += len(part)
+        if length > max_length:
+            break
+    return _truncate("".join(parts), max_length)
+
+
+def _capture_statement(
+    mode, command_name, command, max_length=_STATEMENT_MAX_LENGTH
+):
+    """Returns the ``db.statement`` of a command according to the statement
+    capture mode"""
+    if mode == STATEMENT_FULL:
+        return _format_document(command, max_length)
+    statement = command_name
+    if mode == STATEMENT_COMMAND:
+        return statement
+    target = _get_target(command_name, command)
+    if target:
+        statement += " " + target
+    if mode == STATEMENT_SHAPE:
+        document_filter = _get_filter(command_name, command)
+        if document_filter:
+            statement += " " + json.dumps(_sanitize(document_filter))
+    return _truncate(statement, max_length)
@@ -14,13 +14,22 @@
 
 from unittest import mock
 
+from pymongo import monitoring
+
 from opentelemetry import context
 from opentelemetry import trace as trace_api
 from opentelemetry.instrumentation.pymongo import (
     CommandTracer,
     PymongoInstrumentor,
 )
+from opentelemetry.instrumentation.pymongo.metrics import (
+    PoolMetricsListener,
+    ServerHeartbeatMetricsListener,
+)
+from opentelemetry.instrumentation.pymongo.utils import _capture_statement
 from opentelemetry.instrumentation.utils import _SUPPRESS_INSTRUMENTATION_KEY
+from opentelemetry.sdk._metrics import MeterProvider
+from opentelemetry.sdk._metrics.export import InMemoryMetricReader
 from opentelemetry.semconv.trace import SpanAttributes
 from opentelemetry.test.test_base import TestBase
 
@@ -192,6 +201,296 @@ class TestPymongo(TestBase):
 
         self.assertEqual(span.name, "command_name.123")
 
+    def test_pending_spans_max_size(self):
+        command_tracer = CommandTracer(self.tracer, max_pending_spans=2)
+        events = [MockEvent({}, ("test.com", "1234"), i) for i in range(3)]
+        for event in events:
+            command_tracer.started(event=event)
+
+        spans_list = self.memory_exporter.get_finished_spans()
+        self.assertEqual(len(spans_list), 1)
+        self.assertIs(
+            spans_list[0].status.status_code, trace_api.StatusCode.ERROR
+        )
+        # pylint: disable=protected-access
+        self.assertEqual(len(command_tracer._span_registry), 2)
+        self.assertEqual(command_tracer._span_registry.orphaned_count, 1)
+
+        # the result of the orphaned command is ignored
+        command_tracer.succeeded(event=events[0])
+        command_tracer.succeeded(event=events[2])
+        self.assertEqual(len(self.memory_exporter.get_finished_spans()), 2)
+
+    def test_pending_span_timeout(self):
+        command_tracer = CommandTracer(self.tracer, pending_span_timeout=60)
+        first_mock_event = MockEvent({}, ("test.com", "1234"), "first")
+        second_mock_event = MockEvent({}, ("test.com", "1234"), "second")
+        with mock.patch(
+            "opentelemetry.instrumentation.pymongo.monotonic",
+            side_effect=[0, 30, 90],
+        ):
+            command_tracer.started(event=first_mock_event)
+            command_tracer.started(event=second_mock_event)
+            self.assertEqual(len(self.memory_exporter.get_finished_spans()), 0)
+            command_tracer.started(
+                event=MockEvent({}, ("test.com", "1234"), "third")
+            )
+
+        spans_list = self.memory_exporter.get_finished_spans()
+        self.assertEqual(len(spans_list), 1)
+        self.assertEqual(
+            spans_list[0].status.description,
+            "No result received for the command",
+        )
+        # pylint: disable=protected-access
+        self.assertEqual(len(command_tracer._span_registry), 2)
+
+    def test_pending_span_replaced(self):
+        command_tracer = CommandTracer(self.tracer)
+        mock_event = MockEvent({}, ("test.com", "1234"), "request_id")
+        command_tracer.started(event=mock_event)
+        command_tracer.started(event=mock_event)
+        command_tracer.succeeded(event=mock_event)
+
+        spans_list = self.memory_exporter.get_finished_spans()
+        self.assertEqual(len(spans_list), 2)
+        self.assertIs(
+            spans_list[0].status.status_code, trace_api.StatusCode.ERROR
+        )
+        self.assertIs(
+            spans_list[1].status.status_code, trace_api.StatusCode.UNSET
+        )
+
+    def test_statement_capture(self):
+        mock_event = MockEvent({})
+        mock_event.command_name = "find"
+        mock_event.command = {
+            "find": "users",
+            "filter": {"name": "secret", "age": {"$gt": 30}},
+        }
+        expected = {
+            "command": "find",
+            "collection": "find users",
+            "shape": 'find users {"name": "?", "age": {"$gt": "?"}}',
+            "full": str(mock_event.command),
+        }
+        for mode, statement in expected.items():
+            with self.subTest(mode=mode):
+                self.memory_exporter.clear()
+                command_tracer = CommandTracer(
+                    self.tracer, statement_capture=mode
+                )
+                command_tracer.started(event=mock_event)
+                command_tracer.succeeded(event=mock_event)
+                span = self.memory_exporter.get_finished_spans()[0]
+                self.assertEqual(span.name, "find.users")
+                self.assertEqual(
+                    span.attributes[SpanAttributes.DB_STATEMENT], statement
+                )
+
+    def test_statement_capture_shape(self):
+        self.assertEqual(
+            _capture_statement(
+                "shape",
+                "aggregate",
+                {
+                    "aggregate": "orders",
+                    "pipeline": [
+                        {"$match": {"status": {"$in": ["A", "B"]}}},
+                        {"$limit": 10},
+                    ],
+                },
+            ),
+            'aggregate orders [{"$match": {"status": {"$in": "?"}}}, '
+            '{"$limit": "?"}]',
+        )
+        self.assertEqual(
+            _capture_statement(
+                "shape",
+                "update",
+                {
+                    "update": "users",
+                    "updates": [
+                        {"q": {"_id": 1}, "u": {"$set": {"a": 1}}},
+                        {"q": {"_id": 2}, "u": {"$set": {"a": 2}}},
+                    ],
+                },
+            ),
+            'update users {"_id": "?"}',
+        )
+        self.assertEqual(
+            _capture_statement("shape", "insert", {"insert": "users"}),
+            "insert users",
+        )
+
+    def test_statement_capture_max_length(self):
+        command = {
+            "insert": "users",
+            "documents": [{"data": "x" * 10000} for _ in range(1000)],
+        }
+        statement = _capture_statement("full", "insert", command, 50)
+        self.assertEqual(statement, str(command)[:50] + "...")
+
+    def test_statement_capture_not_recording(self):
+        mock_tracer = mock.Mock()
+        mock_span = mock.Mock()
+        mock_span.is_recording.return_value = False
+        mock_tracer.start_span.return_value = mock_span
+        mock_event = MockEvent({})
+        command_tracer = CommandTracer(mock_tracer, statement_capture="full")
+        with mock.patch(
+            "opentelemetry.instrumentation.pymongo._capture_statement"
+        ) as capture_statement:
+            command_tracer.started(event=mock_event)
+        self.assertFalse(capture_statement.called)
+
+    def test_invalid_statement_capture(self):
+        with self.assertRaises(ValueError):
+            CommandTracer(self.tracer, statement_capture="everything")
+
+    def test_invalid_max_pending_spans(self):
+        with self.assertRaises(ValueError):
+            CommandTracer(self.tracer, max_pending_spans=0)
+
+    def test_pymongo_instrumentor_metrics(self):
+        mock_register = mock.Mock()
+        patch = mock.patch(
+            "pymongo.monitoring.register", side_effect=mock_register
+        )
+        instrumentor = PymongoInstrumentor()
+        instrumentor.uninstrument()
+        with patch:
+            instrumentor.instrument(
+                enable_pool_metrics=True, enable_heartbeat_metrics=True
+            )
+        listeners = [call.args[0] for call in mock_register.call_args_list]
+        self.assertTrue(
+            any(isinstance(lis, PoolMetricsListener) for lis in listeners)
+        )
+        self.assertTrue(
+            any(
+                isinstance(lis, ServerHeartbeatMetricsListener)
+                for lis in listeners
+            )
+        )
+        instrumentor.uninstrument()
+        # pylint: disable=protected-access
+        self.assertFalse(instrumentor._pool_metrics_instance.is_enabled)
+
+    def test_pool_metrics(self):
+        reader = InMemoryMetricReader()
+        listener = PoolMetricsListener(
+            MeterProvider(metric_readers=[reader]).get_meter(__name__)
+        )
+        address = ("test.com", 27017)
+        listener.pool_created(
+            monitoring.PoolCreatedEvent(address, {"maxPoolSize": 10})
+        )
+        listener.connection_check_out_started(
+            monitoring.ConnectionCheckOutStartedEvent(address)
+        )
+        listener.connection_created(
+            monitoring.ConnectionCreatedEvent(address, 1)
+        )
+        listener.connection_checked_out(
+            monitoring.ConnectionCheckedOutEvent(address, 1)
+        )
+        listener.connection_check_out_started(
+            monitoring.ConnectionCheckOutStartedEvent(address)
+        )
+        listener.connection_check_out_failed(
+            monitoring.ConnectionCheckOutFailedEvent(
+                address, monitoring.ConnectionCheckOutFailedReason.TIMEOUT
+            )
+        )
+        listener.connection_check_out_started(
+            monitoring.ConnectionCheckOutStartedEvent(address)
+        )
+
+        metrics = {}
+        for metric in reader.get_metrics():
+            metrics.setdefault(metric.name, []).append(metric)
+        attributes = {"pool.name": "test.com:27017"}
+        wait_time = metrics["db.client.connections.wait_time"][0]
+        self.assertEqual(dict(wait_time.attributes), attributes)
+        self.assertEqual(sum(wait_time.point.bucket_counts), 2)
+        self.assertEqual(
+            metrics["db.client.connections.timeouts"][0].point.value, 1
+        )
+        self.assertEqual(
+            metrics["db.client.connections.max"][0].point.value, 10
+        )
+        self.assertEqual(
+            metrics["db.client.connections.pending_requests"][0].point.value,
+            1,
+        )
+        usage = {
+            metric.attributes["state"]: metric.point.value
+            for metric in metrics["db.client.connections.usage"]
+        }
+        self.assertEqual(usage, {"idle": 0, "used": 1})
+
+    def test_pool_metrics_usage_disabled(self):
+        reader = InMemoryMetricReader()
+        listener = PoolMetricsListener(
+            MeterProvider(metric_readers=[reader]).get_meter(__name__)
+        )
+        address = ("test.com", 27017)
+        listener.connection_created(
+            monitoring.ConnectionCreatedEvent(address, 1)
+        )
+        listener.connection_checked_out(
+            monitoring.ConnectionCheckedOutEvent(address, 1)
+        )
+        listener.is_enabled = False
+        self.assertEqual(list(reader.get_metrics()), [])
+        listener.connection_checked_in(
+            monitoring.ConnectionCheckedInEvent(address, 1)
+        )
+        listener.connection_closed(
+            monitoring.ConnectionClosedEvent(address, 1, "stale")
+        )
+        listener.connection_created(
+            monitoring.ConnectionCreatedEvent(address, 2)
+        )
+        listener.is_enabled = True
+        listener.connection_checked_out(
+            monitoring.ConnectionCheckedOutEvent(address, 2)
+        )
+
+        usage = {
+            metric.attributes["state"]: metric.point.value
+            for metric in reader.get_metrics()
+            if metric.name == "db.client.connections.usage"
+        }
+        self.assertEqual(usage, {"idle": 0, "used": 1})
+
+    def test_heartbeat_metrics(self):
+        reader = InMemoryMetricReader()
+        listener = ServerHeartbeatMetricsListener(
+            MeterProvider(metric_readers=[reader]).get_meter(__name__)
+        )
+        address = ("test.com", 27017)
+        listener.succeeded(
+            monitoring.ServerHeartbeatSucceededEvent(0.002, {}, address)
+        )
+        listener.succeeded(
+            monitoring.ServerHeartbeatSucceededEvent(
+                10, {}, address, awaited=True
+            )
+        )
+        listener.failed(
+            monitoring.ServerHeartbeatFailedEvent(0.1, Exception(), address)
+        )
+
+        metrics = {metric.name: metric for metric in reader.get_metrics()}
+        duration = metrics["db.mongodb.heartbeat.duration"].point
+        self.assertEqual(sum(duration.bucket_counts), 1)
+        self.assertEqual(duration.sum, 2)
+        self.assertEqual(
+            metrics["db.mongodb.heartbeat.failures"].point.value, 1
+        )
+
 
 class MockCommand:
     def __init__(self, command_attrs):
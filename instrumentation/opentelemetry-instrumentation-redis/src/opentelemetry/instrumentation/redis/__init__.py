@@ -38,6 +38,15 @@ Usage
     client = redis.StrictRedis(host="localhost", port=6379)
     client.get("my-key")
 
+    # redis >= 4.2 asyncio clients are instrumented as well
+    async_client = redis.asyncio.Redis(host="localhost", port=6379)
+    await async_client.get("my-key")
+
+The ``RedisCluster`` clients of redis >= 4.1 (and of ``redis.asyncio`` since
+redis 4.3) report an internal span for each command, with a child client span
+for each of the nodes the command is sent to, such as ``KEYS`` sent to all the
+primaries, with the address of the node.
+
 The `instrument` method accepts the following keyword args:
 
 tracer_provider (TracerProvider) - an optional tracer provider
@@ -48,6 +57,13 @@ this function signature is:  def request_hook(span: Span, instance: redis.connec
 response_hook (Callable) - a function with extra user-defined logic to be performed after performing the request
 this function signature is: def response_hook(span: Span, instance: redis.connection.Connection, response) -> None
 
+value_max_length (int) - the maximum number of characters of each command argument kept in ``db.statement``, defaults to 100
+
+statement_max_length (int) - the maximum number of characters of each command kept in ``db.statement``, defaults to 1000
+
+Arguments are trimmed before they are converted to text, so large values do not have to be formatted as a whole,
+and ``db.statement`` is only built when the span is recording.
+
 for example:
 
 .. code: python
@@ -73,6 +89,7 @@ for example:
 API
 ---
 """
+import functools
 import typing
 from typing import Any, Collection
 
@@ -83,8 +100,12 @@ from opentelemetry import trace
 from opentelemetry.instrumentation.instrumentor import BaseInstrumentor
 from opentelemetry.instrumentation.redis.package import _instruments
 from opentelemetry.instrumentation.redis.util import (
-    _extract_conn_attributes,
+    _CLUSTER_ATTRIBUTES,
+    _STATEMENT_MAX_LENGTH,
+    _VALUE_MAX_LENGTH,
     _format_command_args,
+    _get_node_attributes,
+    _get_pool_attributes,
 )
 from opentelemetry.instrumentation.redis.version import __version__
 from opentelemetry.instrumentation.utils import unwrap
@@ -93,6 +114,19 @@ from opentelemetry.trace import Span
 
 _DEFAULT_SERVICE = "redis"
 
+_REDIS_CLUSTER_VERSION = (4, 1, 0)
+_REDIS_ASYNCIO_VERSION = (4, 2, 0)
+_REDIS_ASYNCIO_CLUSTER_VERSION = (4, 3, 0)
+
+if redis.VERSION >= _REDIS_CLUSTER_VERSION:
+    import redis.cluster
+
+if redis.VERSION >= _REDIS_ASYNCIO_VERSION:
+    import redis.asyncio
+
+if redis.VERSION >= _REDIS_ASYNCIO_CLUSTER_VERSION:
+    import redis.asyncio.cluster
+
 _RequestHookT = typing.Optional[
     typing.Callable[
         [Span, redis.connection.Connection, typing.List, typing.Dict], None
@@ -103,61 +137,141 @@ _ResponseHookT = typing.Optional[
 ]
 
 
-def _set_connection_attributes(span, conn):
-    if not span.is_recording():
-        return
-    for key, value in _extract_conn_attributes(
-        conn.connection_pool.connection_kwargs
-    ).items():
-        span.set_attribute(key, value)
+def _get_connection_attributes(instance):
+    return _get_pool_attributes(getattr(instance, "connection_pool", None))
+
+
+def _get_cluster_node_attributes(node):
+    if node is None:
+        return _CLUSTER_ATTRIBUTES
+    return _get_node_attributes(node.host, node.port)
+
+
+def _get_span_name(instance, args):
+    if len(args) > 0 and args[0]:
+        return args[0]
+    connection_pool = getattr(instance, "connection_pool", None)
+    if connection_pool is None:
+        return 0
+    return connection_pool.connection_kwargs.get("db", 0)
+
+
+def _get_pipeline_commands(instance):
+    """Returns the arguments of the commands queued in a pipeline"""
+    command_stack = getattr(instance, "command_stack", None)
+    if command_stack is None:
+        # redis.asyncio.cluster.ClusterPipeline
+        command_stack = instance._command_stack  # pylint: disable=W0212
+    return [
+        # cluster pipelines queue PipelineCommand objects instead of tuples
+        command[0] if isinstance(command, tuple) else command.args
+        for command in command_stack
+    ]
 
 
 def _instrument(
     tracer,
     request_hook: _RequestHookT = None,
     response_hook: _ResponseHookT = None,
+    value_max_length: int = _VALUE_MAX_LENGTH,
+    statement_max_length: int = _STATEMENT_MAX_LENGTH,
 ):
-    def _traced_execute_command(func, instance, args, kwargs):
-        query = _format_command_args(args)
-        name = ""
-        if len(args) > 0 and args[0]:
-            name = args[0]
-        else:
-            name = instance.connection_pool.connection_kwargs.get("db", 0)
+    def _format(args):
+        return _format_command_args(
+            args, value_max_length, statement_max_length
+        )
+
+    def _before_command(span, instance, args, kwargs):
+        if span.is_recording():
+            span.set_attribute(SpanAttributes.DB_STATEMENT, _format(args))
+            span.set_attribute("db.redis.args_length", len(args))
+        if callable(request_hook):
+            request_hook(span, instance, args, kwargs)
+
+    def _before_pipeline(span, instance, commands):
+        if span.is_recording():
+            resource = "\n".join(_format(c) for c in commands)
+            span.set_attribute(SpanAttributes.DB_STATEMENT, resource)
+            span.set_attribute("db.redis.pipeline_length", len(commands))
+
+    def _pipeline_span_name(commands):
+        return " ".join([args[0] for args in commands])
+
+    def _traced_execute_command(
+        func, instance, args, kwargs, kind=trace.SpanKind.CLIENT
+    ):
         with tracer.start_as_current_span(
-            name, kind=trace.SpanKind.CLIENT
+            _get_span_name(instance, args),
+            kind=kind,
+            attributes=_get_connection_attributes(instance),
         ) as span:
-            if span.is_recording():
-                span.set_attribute(SpanAttributes.DB_STATEMENT, query)
-                _set_connection_attributes(span, instance)
-                span.set_attribute("db.redis.args_length", len(args))
-            if callable(request_hook):
-                request_hook(span, instance, args, kwargs)
+            _before_command(span, instance, args, kwargs)
             response = func(*args, **kwargs)
             if callable(response_hook):
                 response_hook(span, instance, response)
             return response
 
     def _traced_execute_pipeline(func, instance, args, kwargs):
-        cmds = [_format_command_args(c) for c, _ in instance.command_stack]
-        resource = "\n".join(cmds)
+        commands = _get_pipeline_commands(instance)
+        with tracer.start_as_current_span(
+            _pipeline_span_name(commands),
+            kind=trace.SpanKind.CLIENT,
+            attributes=_get_connection_attributes(instance),
+        ) as span:
+            _before_pipeline(span, instance, commands)
+            response = func(*args, **kwargs)
+            if callable(response_hook):
+                response_hook(span, instance, response)
+            return response
 
-        span_name = " ".join([args[0] for args, _ in instance.command_stack])
+    def _traced_execute_node_command(func, instance, args, kwargs):
+        # RedisCluster._execute_command(target_node, *args), called for each
+        # of the nodes a cluster command is sent to, holds the client spans
+        # while the span of RedisCluster.execute_command is internal
+        node, command_args = args[0], args[1:]
+        with tracer.start_as_current_span(
+            _get_span_name(instance, command_args),
+            kind=trace.SpanKind.CLIENT,
+            attributes=_get_cluster_node_attributes(node),
+        ):
+            return func(*args, **kwargs)
+
+    async def _async_traced_execute_command(
+        func, instance, args, kwargs, kind=trace.SpanKind.CLIENT
+    ):
+        with tracer.start_as_current_span(
+            _get_span_name(instance, args),
+            kind=kind,
+            attributes=_get_connection_attributes(instance),
+        ) as span:
+            _before_command(span, instance, args, kwargs)
+            response = await func(*args, **kwargs)
+            if callable(response_hook):
+                response_hook(span, instance, response)
+            return response
 
+    async def _async_traced_execute_pipeline(func, instance, args, kwargs):
+        commands = _get_pipeline_commands(instance)
         with tracer.start_as_current_span(
-            span_name, kind=trace.SpanKind.CLIENT
+            _pipeline_span_name(commands),
+            kind=trace.SpanKind.CLIENT,
+            attributes=_get_connection_attributes(instance),
         ) as span:
-            if span.is_recording():
-                span.set_attribute(SpanAttributes.DB_STATEMENT, resource)
-                _set_connection_attributes(span, instance)
-                span.set_attribute(
-                    "db.redis.pipeline_length", len(instance.command_stack)
-                )
-            response = func(*args, **kwargs)
+            _before_pipeline(span, instance, commands)
+            response = await func(*args, **kwargs)
             if callable(response_hook):
                 response_hook(span, instance, response)
             return response
 
+    async def _async_traced_execute_node_command(func, instance, args, kwargs):
+        node, command_args = args[0], args[1:]
+        with tracer.start_as_current_span(
+            _get_span_name(instance, command_args),
+            kind=trace.SpanKind.CLIENT,
+            attributes=_get_cluster_node_attributes(node),
+        ):
+            return await func(*args, **kwargs)
+
     pipeline_class = (
         "BasePipeline" if redis.VERSION < (3, 0, 0) else "Pipeline"
     )
@@ -176,6 +290,58 @@ def _instrument(
         f"{pipeline_class}.immediate_execute_command",
         _traced_execute_command,
     )
+    if redis.VERSION >= _REDIS_CLUSTER_VERSION:
+        wrap_function_wrapper(
+            "redis.cluster",
+            "RedisCluster.execute_command",
+            functools.partial(
+                _traced_execute_command, kind=trace.SpanKind.INTERNAL
+            ),
+        )
+        wrap_function_wrapper(
+            "redis.cluster",
+            "RedisCluster._execute_command",
+            _traced_execute_node_command,
+        )
+        wrap_function_wrapper(
+            "redis.cluster",
+            "ClusterPipeline.execute",
+            _traced_execute_pipeline,
+        )
+    if redis.VERSION >= _REDIS_ASYNCIO_VERSION:
+        wrap_function_wrapper(
+            "redis.asyncio",
+            "Redis.execute_command",
+            _async_traced_execute_command,
+        )
+        wrap_function_wrapper(
+            "redis.asyncio.client",
+            "Pipeline.execute",
+            _async_traced_execute_pipeline,
+        )
+        wrap_function_wrapper(
+            "redis.asyncio.client",
+            "Pipeline.immediate_execute_command",
+            _async_traced_execute_command,
+        )
+    if redis.VERSION >= _REDIS_ASYNCIO_CLUSTER_VERSION:
+        wrap_function_wrapper(
+            "redis.asyncio.cluster",
+            "RedisCluster.execute_command",
+            functools.partial(
+                _async_traced_execute_command, kind=trace.SpanKind.INTERNAL
+            ),
+        )
+        wrap_function_wrapper(
+            "redis.asyncio.cluster",
+            "RedisCluster._execute_command",
+            _async_traced_execute_node_command,
+        )
+        wrap_function_wrapper(
+            "redis.asyncio.cluster",
+            "ClusterPipeline.execute",
+            _async_traced_execute_pipeline,
+        )
 
 
 class RedisInstrumentor(BaseInstrumentor):
@@ -193,6 +359,8 @@ class RedisInstrumentor(BaseInstrumentor):
             **kwargs: Optional arguments
                 ``tracer_provider``: a TracerProvider, defaults to global.
                 ``response_hook``: An optional callback which is invoked right before the span is finished processing a response.
+                ``value_max_length``: Maximum length of each command argument in ``db.statement``, defaults to 100.
+                ``statement_max_length``: Maximum length of each command in ``db.statement``, defaults to 1000.
         """
         tracer_provider = kwargs.get("tracer_provider")
         tracer = trace.get_tracer(
@@ -202,6 +370,10 @@ class RedisInstrumentor(BaseInstrumentor):
             tracer,
             request_hook=kwargs.get("request_hook"),
             response_hook=kwargs.get("response_hook"),
+            value_max_length=kwargs.get("value_max_length", _VALUE_MAX_LENGTH),
+            statement_max_length=kwargs.get(
+                "statement_max_length", _STATEMENT_MAX_LENGTH
+            ),
         )
 
     def _uninstrument(self, **kwargs):
@@ -222,3 +394,15 @@ class RedisInstrumentor(BaseInstrumentor):
             unwrap(redis.Redis, "pipeline")
             unwrap(redis.client.Pipeline, "execute")
             unwrap(redis.client.Pipeline, "immediate_execute_command")
+        if redis.VERSION >= _REDIS_CLUSTER_VERSION:
+            unwrap(redis.cluster.RedisCluster, "execute_command")
+            unwrap(redis.cluster.RedisCluster, "_execute_command")
+            unwrap(redis.cluster.ClusterPipeline, "execute")
+        if redis.VERSION >= _REDIS_ASYNCIO_VERSION:
+            unwrap(redis.asyncio.Redis, "execute_command")
+            unwrap(redis.asyncio.client.Pipeline, "execute")
+            unwrap(redis.asyncio.client.Pipeline, "immediate_execute_command")
+        if redis.VERSION >= _REDIS_ASYNCIO_CLUSTER_VERSION:
+            unwrap(redis.asyncio.cluster.RedisCluster, "execute_command")
+            unwrap(redis.asyncio.cluster.RedisCluster, "_execute_command")
+            unwrap(redis.asyncio.cluster.ClusterPipeline, "execute")
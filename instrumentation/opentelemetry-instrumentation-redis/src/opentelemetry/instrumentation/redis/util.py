@@ -15,6 +15,10 @@
 """
 Some utils used by the redis integration
 """
+from functools import lru_cache
+from types import MappingProxyType
+from weakref import WeakKeyDictionary
+
 from opentelemetry.semconv.trace import (
     DbSystemValues,
     NetTransportValues,
@@ -49,22 +53,74 @@ def _extract_conn_attributes(conn_kwargs):
     return attributes
 
 
-def _format_command_args(args):
+# attributes of the connections of each pool, the pool's connection_kwargs
+# do not change once it is created
+_pool_attributes = WeakKeyDictionary()
+
+_CLUSTER_ATTRIBUTES = MappingProxyType(
+    {SpanAttributes.DB_SYSTEM: DbSystemValues.REDIS.value}
+)
+
+
+def _get_pool_attributes(connection_pool):
+    """Returns the connection attributes of a ConnectionPool, computed once
+    per pool"""
+    if connection_pool is None:
+        # cluster clients connect to several nodes, see _get_node_attributes
+        return _CLUSTER_ATTRIBUTES
+    attributes = _pool_attributes.get(connection_pool)
+    if attributes is None:
+        attributes = MappingProxyType(
+            _extract_conn_attributes(connection_pool.connection_kwargs)
+        )
+        _pool_attributes[connection_pool] = attributes
+    return attributes
+
+
+@lru_cache(maxsize=256)
+def _get_node_attributes(host, port):
+    """Returns the connection attributes of a cluster node"""
+    return MappingProxyType(
+        _extract_conn_attributes({"host": host, "port": port})
+    )
+
+
+_VALUE_MAX_LENGTH = 100
+_STATEMENT_MAX_LENGTH = 1000
+_VALUE_TOO_LONG_MARK = "..."
+
+
+def _format_command_arg(arg, max_len):
+    """Format a command argument, only converting to text the characters
+    that can be kept"""
+    if isinstance(arg, str):
+        return arg[:max_len]
+    if isinstance(arg, (bytes, bytearray)):
+        # the repr of every byte takes at least one character
+        return str(bytes(arg[:max_len]))[:max_len]
+    if isinstance(arg, memoryview):
+        return str(arg[:max_len].tobytes())[:max_len]
+    return str(arg)
+
+
+def _format_command_args(
+    args,
+    value_max_len=_VALUE_MAX_LENGTH,
+    cmd_max_len=_STATEMENT_MAX_LENGTH,
+):
     """Format command arguments and trim them as needed"""
-    value_max_len = 100
-    value_too_long_mark = "..."
-    cmd_max_len = 1000
     length = 0
     out = []
     for arg in args:
-        cmd = str(arg)
+        # one more character than kept tells whether the value was trimmed
+        cmd = _format_command_arg(arg, value_max_len + 1)
 
         if len(cmd) > value_max_len:
-            cmd = cmd[:value_max_len] + value_too_long_mark
+            cmd = cmd[:value_max_len] + _VALUE_TOO_LONG_MARK
 
         if length + len(cmd) > cmd_max_len:
             prefix = cmd[: cmd_max_len - length]
-            out.append(f"{prefix}{value_too_long_mark}")
+            out.append(f"{prefix}{_VALUE_TOO_LONG_MARK}")
             break
 
         out.append(cmd)
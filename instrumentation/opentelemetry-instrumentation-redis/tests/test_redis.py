@@ -11,14 +11,27 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from unittest import mock
+import asyncio
+import gc
+import sys
+from unittest import mock, skipIf
 
 import redis
 
-from opentelemetry.instrumentation.redis import RedisInstrumentor
+from opentelemetry.instrumentation.redis import RedisInstrumentor, util
+from opentelemetry.instrumentation.redis.util import (
+    _format_command_args,
+    _get_pool_attributes,
+    _pool_attributes,
+)
 from opentelemetry.test.test_base import TestBase
 from opentelemetry.trace import SpanKind
 
+if redis.VERSION >= (4, 3, 0):
+    import redis.asyncio
+    import redis.asyncio.cluster
+    import redis.cluster
+
 
 class TestRedis(TestBase):
     def test_span_properties(self):
@@ -141,3 +154,252 @@ class TestRedis(TestBase):
 
         span = spans[0]
         self.assertEqual(span.attributes.get(custom_attribute_name), "GET")
+
+    def test_statement_max_length(self):
+        redis_client = redis.Redis()
+        RedisInstrumentor().uninstrument()
+        RedisInstrumentor().instrument(
+            tracer_provider=self.tracer_provider,
+            value_max_length=4,
+            statement_max_length=10,
+        )
+
+        with mock.patch.object(redis_client.connection_pool, "get_connection"):
+            redis_client.set("key", b"x" * 10 * 1024 * 1024)
+            pipeline = redis_client.pipeline(transaction=False)
+            pipeline.set("key", "value")
+            pipeline.get("long-key")
+            pipeline.execute()
+
+        set_span, pipeline_span = self.memory_exporter.get_finished_spans()
+        self.assertEqual(
+            set_span.attributes["db.statement"], "SET key b'xx..."
+        )
+        self.assertEqual(
+            pipeline_span.attributes["db.statement"],
+            "SET key valu...\nGET long...",
+        )
+
+    def test_connection_attributes_cached_per_pool(self):
+        redis_client = redis.Redis(host="redis.local", port=6380, db=2)
+        RedisInstrumentor().uninstrument()
+        RedisInstrumentor().instrument(tracer_provider=self.tracer_provider)
+
+        with mock.patch(
+            "opentelemetry.instrumentation.redis.util._extract_conn_attributes",
+            wraps=util._extract_conn_attributes,
+        ) as extract_conn_attributes:
+            with mock.patch.object(redis_client, "connection"):
+                redis_client.get("key")
+                redis_client.get("key")
+            self.assertEqual(extract_conn_attributes.call_count, 1)
+
+        for span in self.memory_exporter.get_finished_spans():
+            self.assertEqual(span.attributes["net.peer.name"], "redis.local")
+            self.assertEqual(span.attributes["net.peer.port"], 6380)
+            self.assertEqual(span.attributes["db.redis.database_index"], 2)
+
+        pool = redis_client.connection_pool
+        self.assertIs(_get_pool_attributes(pool), _get_pool_attributes(pool))
+        self.assertIn(pool, _pool_attributes)
+        cached_pools = len(_pool_attributes)
+        del redis_client, pool
+        gc.collect()
+        self.assertEqual(len(_pool_attributes), cached_pools - 1)
+
+    def test_format_command_args(self):
+        self.assertEqual(_format_command_args(["GET", "key"]), "GET key")
+        self.assertEqual(
+            _format_command_args(["SET", "key", "v" * 200]),
+            f"SET key {'v' * 100}...",
+        )
+        for value in (
+            b"v" * 200,
+            bytearray(b"v" * 200),
+            memoryview(b"v" * 200),
+        ):
+            self.assertEqual(
+                _format_command_args(["SET", "key", value]),
+                f"SET key b'{'v' * 98}...",
+            )
+        self.assertEqual(
+            _format_command_args(["SET", "key", b"value", 1]),
+            "SET key b'value' 1",
+        )
+        self.assertEqual(
+            _format_command_args(["MSET"] + ["k" * 100] * 20),
+            f"MSET {' '.join(['k' * 100] * 9)} {'k' * 96}...",
+        )
+
+
+@skipIf(
+    sys.version_info < (3, 8) or redis.VERSION < (4, 3, 0),
+    "requires AsyncMock and redis.asyncio",
+)
+class TestRedisAsyncio(TestBase):
+    def setUp(self):
+        super().setUp()
+        RedisInstrumentor().uninstrument()
+        RedisInstrumentor().instrument(tracer_provider=self.tracer_provider)
+
+    def tearDown(self):
+        super().tearDown()
+        RedisInstrumentor().uninstrument()
+
+    def test_execute_command(self):
+        redis_client = redis.asyncio.Redis()
+
+        with mock.patch.object(
+            redis_client, "connection", new=mock.AsyncMock()
+        ):
+            asyncio.run(redis_client.get("key"))
+
+        spans = self.memory_exporter.get_finished_spans()
+        self.assertEqual(len(spans), 1)
+        span = spans[0]
+        self.assertEqual(span.name, "GET")
+        self.assertEqual(span.kind, SpanKind.CLIENT)
+        self.assertEqual(span.attributes["db.statement"], "GET key")
+        self.assertEqual(span.attributes["db.system"], "redis")
+        self.assertEqual(span.attributes["net.peer.name"], "localhost")
+
+    def test_execute_pipeline(self):
+        redis_client = redis.asyncio.Redis()
+
+        async def pipeline():
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.set("key", "value")
+                pipe.get("key")
+                await pipe.execute()
+
+        with mock.patch.object(
+            redis_client.connection_pool,
+            "get_connection",
+            new=mock.AsyncMock(),
+        ), mock.patch.object(
+            redis_client.connection_pool, "release", new=mock.AsyncMock()
+        ):
+            asyncio.run(pipeline())
+
+        spans = self.memory_exporter.get_finished_spans()
+        self.assertEqual(len(spans), 1)
+        span = spans[0]
+        self.assertEqual(span.name, "SET GET")
+        self.assertEqual(
+            span.attributes["db.statement"], "SET key value\nGET key"
+        )
+        self.assertEqual(span.attributes["db.redis.pipeline_length"], 2)
+
+
+@skipIf(
+    sys.version_info < (3, 8) or redis.VERSION < (4, 3, 0),
+    "requires AsyncMock and redis.asyncio.cluster",
+)
+class TestRedisCluster(TestBase):
+    def setUp(self):
+        super().setUp()
+        RedisInstrumentor().uninstrument()
+        RedisInstrumentor().instrument(tracer_provider=self.tracer_provider)
+
+    def tearDown(self):
+        super().tearDown()
+        RedisInstrumentor().uninstrument()
+
+    def test_execute_command_fan_out(self):
+        with mock.patch.object(
+            redis.cluster.NodesManager, "initialize"
+        ), mock.patch.object(redis.cluster.CommandsParser, "initialize"):
+            redis_client = redis.cluster.RedisCluster(
+                host="localhost", port=7000
+            )
+        nodes = [
+            redis.cluster.ClusterNode("10.0.0.1", 7000),
+            redis.cluster.ClusterNode("10.0.0.2", 7001),
+        ]
+
+        with mock.patch.object(
+            redis_client, "_determine_nodes", return_value=nodes
+        ), mock.patch.object(redis_client, "get_redis_connection"):
+            redis_client.execute_command("KEYS", "*")
+
+        *node_spans, span = self.memory_exporter.get_finished_spans()
+        self.assertEqual(span.name, "KEYS")
+        self.assertEqual(span.kind, SpanKind.INTERNAL)
+        self.assertEqual(span.attributes["db.statement"], "KEYS *")
+        self.assertEqual(span.attributes["db.system"], "redis")
+        self.assertNotIn("net.peer.name", span.attributes)
+        self.assertEqual(
+            [
+                (
+                    node_span.attributes["net.peer.name"],
+                    node_span.attributes["net.peer.port"],
+                )
+                for node_span in node_spans
+            ],
+            [("10.0.0.1", 7000), ("10.0.0.2", 7001)],
+        )
+        for node_span in node_spans:
+            self.assertEqual(node_span.name, "KEYS")
+            self.assertEqual(node_span.kind, SpanKind.CLIENT)
+            self.assertEqual(node_span.parent.span_id, span.context.span_id)
+
+    def test_async_execute_command_fan_out(self):
+        redis_client = redis.asyncio.cluster.RedisCluster(
+            host="localhost", port=7000
+        )
+        # pylint: disable=protected-access
+        redis_client._initialize = False
+        nodes = [
+            redis.asyncio.cluster.ClusterNode("10.0.0.1", 7000),
+            redis.asyncio.cluster.ClusterNode("10.0.0.2", 7001),
+        ]
+
+        with mock.patch.object(
+            redis_client, "_determine_nodes", return_value=nodes
+        ), mock.patch.object(
+            redis.asyncio.cluster.ClusterNode,
+            "execute_command",
+            new=mock.AsyncMock(),
+        ):
+            asyncio.run(redis_client.execute_command("KEYS", "*"))
+
+        spans = self.memory_exporter.get_finished_spans()
+        self.assertEqual(len(spans), 3)
+        span = spans[-1]
+        self.assertEqual(span.name, "KEYS")
+        self.assertEqual(span.kind, SpanKind.INTERNAL)
+        self.assertEqual(
+            sorted(
+                node_span.attributes["net.peer.name"]
+                for node_span in spans[:-1]
+            ),
+            ["10.0.0.1", "10.0.0.2"],
+        )
+        for node_span in spans[:-1]:
+            self.assertEqual(node_span.kind, SpanKind.CLIENT)
+            self.assertEqual(node_span.parent.span_id, span.context.span_id)
+
+    def test_execute_pipeline(self):
+        with mock.patch.object(
+            redis.cluster.NodesManager, "initialize"
+        ), mock.patch.object(redis.cluster.CommandsParser, "initialize"):
+            redis_client = redis.cluster.RedisCluster(
+                host="localhost", port=7000
+            )
+        pipeline = redis_client.pipeline()
+        pipeline.set("key", "value")
+        pipeline.get("key")
+
+        with mock.patch.object(
+            redis.cluster.ClusterPipeline, "send_cluster_commands"
+        ):
+            pipeline.execute()
+
+        spans = self.memory_exporter.get_finished_spans()
+        self.assertEqual(len(spans), 1)
+        span = spans[0]
+        self.assertEqual(span.name, "SET GET")
+        self.assertEqual(
+            span.attributes["db.statement"], "SET key value\nGET key"
+        )
+        self.assertEqual(span.attributes["db.redis.pipeline_length"], 2)
@@ -48,6 +48,29 @@ Usage
         engine=engine.sync_engine
     )
 
+Pool metrics
+------------
+The connection pools of the instrumented engines report metrics through the
+``meter_provider`` passed to ``instrument``, or the global one:
+
+* ``db.client.connections.wait_time``: time spent obtaining a connection
+  from the pool
+* ``db.client.connections.use_time``: time between the checkout of a
+  connection and its return to the pool
+* ``db.client.connections.timeouts``: connections that could not be obtained
+  before the pool timeout
+* ``db.client.connections.created`` and
+  ``db.client.connections.invalidated``: connections opened and invalidated
+  by the pool
+* ``db.client.connections.usage``: used and idle connections, as the
+  ``state`` attribute
+* ``db.client.connections.overflow``: connections opened beyond the size of
+  the pool
+
+The metrics have a ``pool.name`` attribute which is the ``pool_logging_name``
+of the engine if set, or its URL otherwise. They can be disabled with
+``enable_pool_metrics=False``.
+
 API
 ---
 """
@@ -57,6 +80,7 @@ import sqlalchemy
 from packaging.version import parse as parse_version
 from wrapt import wrap_function_wrapper as _w
 
+from opentelemetry._metrics import get_meter
 from opentelemetry.instrumentation.instrumentor import BaseInstrumentor
 from opentelemetry.instrumentation.sqlalchemy.engine import (
     EngineTracer,
@@ -65,6 +89,8 @@ from opentelemetry.instrumentation.sqlalchemy.engine import (
     _wrap_create_engine,
 )
 from opentelemetry.instrumentation.sqlalchemy.package import _instruments
+from opentelemetry.instrumentation.sqlalchemy.pool import PoolMetrics
+from opentelemetry.instrumentation.sqlalchemy.version import __version__
 from opentelemetry.instrumentation.utils import unwrap
 
 
@@ -73,9 +99,27 @@ class SQLAlchemyInstrumentor(BaseInstrumentor):
     See `BaseInstrumentor`
     """
 
+    # meter provider and pool metrics of the last instrument call
+    _pool_metrics = None
+
     def instrumentation_dependencies(self) -> Collection[str]:
         return _instruments
 
+    def _get_pool_metrics(self, meter_provider):
+        """Returns the pool metrics of a meter provider, they are kept across
+        instrument calls as creating them again would register their gauges
+        and the listeners of the engines twice"""
+        if (
+            self._pool_metrics is not None
+            and self._pool_metrics[0] is meter_provider
+        ):
+            return self._pool_metrics[1]
+        pool_metrics = PoolMetrics(
+            get_meter(__name__, __version__, meter_provider=meter_provider)
+        )
+        self._pool_metrics = meter_provider, pool_metrics
+        return pool_metrics
+
     def _instrument(self, **kwargs):
         """Instruments SQLAlchemy engine creation methods and the engine
         if passed as an argument.
@@ -84,25 +128,37 @@ class SQLAlchemyInstrumentor(BaseInstrumentor):
             **kwargs: Optional arguments
                 ``engine``: a SQLAlchemy engine instance
                 ``tracer_provider``: a TracerProvider, defaults to global
+                ``meter_provider``: a MeterProvider, defaults to global
+                ``enable_pool_metrics``: whether to report the metrics of
+                    the connection pools, defaults to True
 
         Returns:
             An instrumented engine if passed in as an argument, None otherwise.
         """
         tracer_provider = kwargs.get("tracer_provider")
-        _w("sqlalchemy", "create_engine", _wrap_create_engine(tracer_provider))
+        pool_metrics = None
+        if kwargs.get("enable_pool_metrics", True):
+            pool_metrics = self._get_pool_metrics(kwargs.get("meter_provider"))
+        _w(
+            "sqlalchemy",
+            "create_engine",
+            _wrap_create_engine(tracer_provider, pool_metrics),
+        )
         _w(
             "sqlalchemy.engine",
             "create_engine",
-            _wrap_create_engine(tracer_provider),
+            _wrap_create_engine(tracer_provider, pool_metrics),
         )
         if parse_version(sqlalchemy.__version__).release >= (1, 4):
             _w(
                 "sqlalchemy.ext.asyncio",
                 "create_async_engine",
-                _wrap_create_async_engine(tracer_provider),
+                _wrap_create_async_engine(tracer_provider, pool_metrics),
             )
 
         if kwargs.get("engine") is not None:
+            if pool_metrics is not None:
+                pool_metrics.add_engine(kwargs.get("engine"))
             return EngineTracer(
                 _get_tracer(kwargs.get("engine"), tracer_provider),
                 kwargs.get("engine"),
@@ -11,20 +11,27 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import functools
 import os
+from types import MappingProxyType
 
 from sqlalchemy.event import listen  # pylint: disable=no-name-in-module
 
 from opentelemetry import trace
 from opentelemetry.instrumentation.sqlalchemy.version import __version__
-from opentelemetry.instrumentation.utils import (
-    _generate_opentelemetry_traceparent,
-    _generate_sql_comment,
-)
+from opentelemetry.instrumentation.utils import _SQLCommenter
 from opentelemetry.semconv.trace import NetTransportValues, SpanAttributes
-from opentelemetry.trace import Span
 from opentelemetry.trace.status import Status, StatusCode
 
+# Statements longer than this are not memoized so that the cache stays small
+# even when queries have their values inlined.
+_STATEMENT_CACHE_MAX_LENGTH = 4096
+_STATEMENT_CACHE_SIZE = 512
+
+# Key of the attributes introspected from the cursor in the info dictionary
+# of the pooled DBAPI connections, which lives as long as the DBAPI connection
+_CONNECTION_INFO_KEY = "opentelemetry.instrumentation.sqlalchemy.attributes"
+
 
 def _normalize_vendor(vendor):
     """Return a canonical name for a type of database."""
@@ -48,7 +55,7 @@ def _get_tracer(engine, tracer_provider=None):
     )
 
 
-def _wrap_create_async_engine(tracer_provider=None):
+def _wrap_create_async_engine(tracer_provider=None, pool_metrics=None):
     # pylint: disable=unused-argument
     def _wrap_create_async_engine_internal(func, module, args, kwargs):
         """Trace the SQLAlchemy engine, creating an `EngineTracer`
@@ -56,12 +63,14 @@ def _wrap_create_async_engine(tracer_provider=None):
         """
         engine = func(*args, **kwargs)
         EngineTracer(_get_tracer(engine, tracer_provider), engine.sync_engine)
+        if pool_metrics is not None:
+            pool_metrics.add_engine(engine.sync_engine)
         return engine
 
     return _wrap_create_async_engine_internal
 
 
-def _wrap_create_engine(tracer_provider=None):
+def _wrap_create_engine(tracer_provider=None, pool_metrics=None):
     # pylint: disable=unused-argument
     def _wrap_create_engine_internal(func, module, args, kwargs):
         """Trace the SQLAlchemy engine, creating an `EngineTracer`
@@ -69,17 +78,52 @@ def _wrap_create_engine(tracer_provider=None):
         """
         engine = func(*args, **kwargs)
         EngineTracer(_get_tracer(engine, tracer_provider), engine)
+        if pool_metrics is not None:
+            pool_metrics.add_engine(engine)
         return engine
 
     return _wrap_create_engine_internal
 
 
+@functools.lru_cache(maxsize=_STATEMENT_CACHE_SIZE)
+def _operation_name(vendor, db_name, statement):
+    parts = []
+    if isinstance(statement, str):
+        # otel spec recommends against parsing SQL queries. We are not trying to parse SQL
+        # but simply truncating the statement to the first word. This covers probably >95%
+        # use cases and uses the SQL statement in span name correctly as per the spec.
+        # For some very special cases it might not record the correct statement if the SQL
+        # dialect is too weird but in any case it shouldn't break anything.
+        operation = statement.split(maxsplit=1)
+        if operation:
+            parts.append(operation[0])
+    if db_name:
+        parts.append(db_name)
+    if not parts:
+        return vendor
+    return " ".join(parts)
+
+
+def _get_operation_name(vendor, db_name, statement):
+    if (
+        isinstance(statement, str)
+        and len(statement) > _STATEMENT_CACHE_MAX_LENGTH
+    ):
+        return _operation_name.__wrapped__(vendor, db_name, statement)
+    return _operation_name(vendor, db_name, statement)
+
+
 class EngineTracer:
     def __init__(self, tracer, engine, enable_commenter=False):
         self.tracer = tracer
         self.engine = engine
         self.vendor = _normalize_vendor(engine.name)
         self.enable_commenter = enable_commenter
+        self._sql_commenter = _SQLCommenter() if enable_commenter else None
+        # the engines derived with execution_options share the url of the
+        # engine, so the attributes of the last url are kept, along with the
+        # url in a single tuple so that concurrent executions see both at once
+        self._url_attributes = (None, None, False)
 
         listen(
             engine, "before_cursor_execute", self._before_cur_exec, retval=True
@@ -88,54 +132,58 @@ class EngineTracer:
         listen(engine, "handle_error", _handle_error)
 
     def _operation_name(self, db_name, statement):
-        parts = []
-        if isinstance(statement, str):
-            # otel spec recommends against parsing SQL queries. We are not trying to parse SQL
-            # but simply truncating the statement to the first word. This covers probably >95%
-            # use cases and uses the SQL statement in span name correctly as per the spec.
-            # For some very special cases it might not record the correct statement if the SQL
-            # dialect is too weird but in any case it shouldn't break anything.
-            parts.append(statement.split()[0])
-        if db_name:
-            parts.append(db_name)
-        if not parts:
-            return self.vendor
-        return " ".join(parts)
+        return _get_operation_name(self.vendor, db_name, statement)
+
+    def _get_url_attributes(self, url):
+        """Returns the attributes of an engine url and whether they are
+        complete, computed once per url"""
+        url_attributes = self._url_attributes
+        if url is not url_attributes[0]:
+            attrs, found = _get_attributes_from_url(url)
+            attrs[SpanAttributes.DB_SYSTEM] = self.vendor
+            url_attributes = url, MappingProxyType(attrs), found
+            self._url_attributes = url_attributes
+        return url_attributes[1:]
+
+    def _get_connection_attributes(self, conn, cursor):
+        attrs, found = self._get_url_attributes(conn.engine.url)
+        if found:
+            return attrs
+        # introspect the DBAPI connection once for as long as it is pooled
+        try:
+            info = conn.info
+        except Exception:  # pylint: disable=broad-except
+            info = {}
+        cursor_attrs = info.get(_CONNECTION_INFO_KEY)
+        if cursor_attrs is None:
+            cursor_attrs = MappingProxyType(
+                _get_attributes_from_cursor(self.vendor, cursor, dict(attrs))
+            )
+            info[_CONNECTION_INFO_KEY] = cursor_attrs
+        return cursor_attrs
 
     # pylint: disable=unused-argument
     def _before_cur_exec(
         self, conn, cursor, statement, params, context, executemany
     ):
-        attrs, found = _get_attributes_from_url(conn.engine.url)
-        if not found:
-            attrs = _get_attributes_from_cursor(self.vendor, cursor, attrs)
+        attrs = self._get_connection_attributes(conn, cursor)
 
         db_name = attrs.get(SpanAttributes.DB_NAME, "")
         span = self.tracer.start_span(
             self._operation_name(db_name, statement),
             kind=trace.SpanKind.CLIENT,
+            attributes=attrs,
         )
         with trace.use_span(span, end_on_exit=False):
             if span.is_recording():
                 span.set_attribute(SpanAttributes.DB_STATEMENT, statement)
-                span.set_attribute(SpanAttributes.DB_SYSTEM, self.vendor)
-                for key, value in attrs.items():
-                    span.set_attribute(key, value)
 
         context._otel_span = span
         if self.enable_commenter:
-            statement = statement + EngineTracer._generate_comment(span=span)
+            statement = statement + self._sql_commenter.comment(span)
 
         return statement, params
 
-    @staticmethod
-    def _generate_comment(span: Span) -> str:
-        span_context = span.get_span_context()
-        meta = {}
-        if span_context.is_valid:
-            meta.update(_generate_opentelemetry_traceparent(span))
-        return _generate_sql_comment(**meta)
-
 
 # pylint: disable=unused-argument
 def _after_cur_exec(conn, cursor, statement, params, context, executemany):
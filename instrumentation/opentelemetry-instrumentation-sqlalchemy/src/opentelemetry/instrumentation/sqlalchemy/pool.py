@@ -0,0 +1,155 @@
+# Copyright The OpenTelemetry Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from timeit import default_timer
+from typing import Iterable
+from weakref import WeakKeyDictionary
+
+import sqlalchemy.exc
+from sqlalchemy.event import listen  # pylint: disable=no-name-in-module
+from wrapt import wrap_function_wrapper as _w
+
+from opentelemetry._metrics import Observation
+
+# Key of the checkout time in the info dictionary of the pooled connections
+_CHECKOUT_TIME_KEY = "opentelemetry.instrumentation.sqlalchemy.checkout_time"
+
+_POOL_NAME = "pool.name"
+_STATE = "state"
+
+
+def _get_pool_name(engine):
+    return engine.pool.logging_name or repr(engine.url)
+
+
+def _elapsed_ms(start):
+    return (default_timer() - start) * 1000
+
+
+class PoolMetrics:
+    """Reports the metrics of the connection pools of SQLAlchemy engines.
+
+    The time spent waiting for a connection and the time connections are used
+    are recorded from the pool events, the number of used, idle and overflow
+    connections are read from the pools when the metrics are collected.
+    """
+
+    def __init__(self, meter):
+        # attributes of the instrumented engines
+        self._engines = WeakKeyDictionary()
+        self._wait_time = meter.create_histogram(
+            name="db.client.connections.wait_time",
+            unit="ms",
+            description="The time it took to obtain an open connection from the pool",
+        )
+        self._use_time = meter.create_histogram(
+            name="db.client.connections.use_time",
+            unit="ms",
+            description="The time between borrowing a connection and returning it to the pool",
+        )
+        self._timeouts = meter.create_counter(
+            name="db.client.connections.timeouts",
+            unit="timeouts",
+            description="The number of connection timeouts that have occurred trying to obtain a connection from the pool",
+        )
+        self._created = meter.create_counter(
+            name="db.client.connections.created",
+            unit="connections",
+            description="The number of connections opened by the pool",
+        )
+        self._invalidated = meter.create_counter(
+            name="db.client.connections.invalidated",
+            unit="connections",
+            description="The number of pooled connections invalidated",
+        )
+        meter.create_observable_gauge(
+            name="db.client.connections.usage",
+            callbacks=[self._get_usage],
+            unit="connections",
+            description="The number of connections that are currently in the state described by the state attribute",
+        )
+        meter.create_observable_gauge(
+            name="db.client.connections.overflow",
+            callbacks=[self._get_overflow],
+            unit="connections",
+            description="The number of connections opened beyond the size of the pool",
+        )
+
+    def add_engine(self, engine):
+        """Listens to the pool events of an engine"""
+        if engine in self._engines:
+            return
+        attributes = {_POOL_NAME: _get_pool_name(engine)}
+        self._engines[engine] = attributes
+
+        def _on_connect(dbapi_connection, connection_record):
+            self._created.add(1, attributes)
+
+        def _on_checkout(
+            dbapi_connection, connection_record, connection_proxy
+        ):
+            connection_record.info[_CHECKOUT_TIME_KEY] = default_timer()
+
+        def _on_checkin(dbapi_connection, connection_record):
+            start = connection_record.info.pop(_CHECKOUT_TIME_KEY, None)
+            if start is not None:
+                self._use_time.record(_elapsed_ms(start), attributes)
+
+        def _on_invalidate(dbapi_connection, connection_record, exception):
+            self._invalidated.add(1, attributes)
+
+        def _on_engine_disposed(engine):
+            # disposing of an engine replaces its pool
+            self._wrap_connect(engine.pool, attributes)
+
+        listen(engine, "connect", _on_connect)
+        listen(engine, "checkout", _on_checkout)
+        listen(engine, "checkin", _on_checkin)
+        listen(engine, "invalidate", _on_invalidate)
+        listen(engine, "engine_disposed", _on_engine_disposed)
+        self._wrap_connect(engine.pool, attributes)
+
+    def _wrap_connect(self, pool, attributes):
+        # pools do not have an event sent before waiting for a connection
+        def _traced_connect(func, instance, args, kwargs):
+            start = default_timer()
+            try:
+                return func(*args, **kwargs)
+            except sqlalchemy.exc.TimeoutError:
+                self._timeouts.add(1, attributes)
+                raise
+            finally:
+                self._wait_time.record(_elapsed_ms(start), attributes)
+
+        _w(pool, "connect", _traced_connect)
+
+    def _get_usage(self) -> Iterable[Observation]:
+        """Observer callback for the used and idle connections"""
+        for engine, attributes in list(self._engines.items()):
+            pool = engine.pool
+            # only the pools keeping a queue of connections count them
+            if not hasattr(pool, "checkedout"):
+                continue
+            yield Observation(
+                pool.checkedout(), {**attributes, _STATE: "used"}
+            )
+            yield Observation(pool.checkedin(), {**attributes, _STATE: "idle"})
+
+    def _get_overflow(self) -> Iterable[Observation]:
+        """Observer callback for the overflow connections"""
+        for engine, attributes in list(self._engines.items()):
+            pool = engine.pool
+            if not hasattr(pool, "overflow"):
+                continue
+            # the overflow is negative while the pool is not full
+            yield Observation(max(pool.overflow(), 0), attributes)
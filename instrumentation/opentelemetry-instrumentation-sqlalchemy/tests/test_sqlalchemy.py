@@ -18,10 +18,14 @@ from unittest import mock
 import pytest
 import sqlalchemy
 from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
 
 from opentelemetry import trace
 from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
-from opentelemetry.instrumentation.sqlalchemy.engine import EngineTracer
+from opentelemetry.instrumentation.sqlalchemy import engine as engine_module
+from opentelemetry.instrumentation.utils import _SQLCommenter
+from opentelemetry.sdk._metrics import MeterProvider
+from opentelemetry.sdk._metrics.export import InMemoryMetricReader
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.trace import TracerProvider, export
 from opentelemetry.test.test_base import TestBase
@@ -157,6 +161,50 @@ class TestSqlalchemyInstrumentation(TestBase):
 
         asyncio.get_event_loop().run_until_complete(run())
 
+    def test_connection_attributes_cached(self):
+        engine = create_engine("sqlite:///:memory:")
+        SQLAlchemyInstrumentor().instrument(
+            engine=engine,
+            tracer_provider=self.tracer_provider,
+        )
+
+        with mock.patch(
+            "opentelemetry.instrumentation.sqlalchemy.engine._get_attributes_from_url",
+            wraps=engine_module._get_attributes_from_url,
+        ) as from_url, mock.patch(
+            "opentelemetry.instrumentation.sqlalchemy.engine._get_attributes_from_cursor",
+            wraps=engine_module._get_attributes_from_cursor,
+        ) as from_cursor:
+            for _ in range(2):
+                cnx = engine.connect()
+                cnx.execute("SELECT 1;").fetchall()
+                cnx.execution_options(foo="bar").execute("SELECT 2;")
+                cnx.close()
+
+        self.assertEqual(from_url.call_count, 1)
+        # the in memory sqlite pool keeps a single DBAPI connection
+        self.assertEqual(from_cursor.call_count, 1)
+        spans = self.memory_exporter.get_finished_spans()
+        self.assertEqual(len(spans), 4)
+        for span in spans:
+            self.assertEqual(span.attributes["db.system"], "sqlite")
+            self.assertEqual(span.attributes["db.name"], ":memory:")
+
+    def test_operation_name(self):
+        # pylint: disable=protected-access
+        self.assertEqual(
+            engine_module._get_operation_name("sqlite", "db", "SELECT 1"),
+            "SELECT db",
+        )
+        self.assertEqual(
+            engine_module._get_operation_name("sqlite", "", "  "), "sqlite"
+        )
+        long_statement = "SELECT " + "1, " * 5000 + "1"
+        self.assertEqual(
+            engine_module._get_operation_name("sqlite", "", long_statement),
+            "SELECT",
+        )
+
     def test_generate_commenter(self):
         logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO)
         engine = create_engine("sqlite:///:memory:")
@@ -171,7 +219,138 @@ class TestSqlalchemyInstrumentation(TestBase):
         spans = self.memory_exporter.get_finished_spans()
         self.assertEqual(len(spans), 1)
         span = spans[0]
+        comment = _SQLCommenter().comment(span)
         self.assertIn(
-            EngineTracer._generate_comment(span),
-            self.caplog.records[-2].getMessage(),
+            f"traceparent='00-{trace.format_trace_id(span.context.trace_id)}"
+            f"-{trace.format_span_id(span.context.span_id)}-",
+            comment,
+        )
+        self.assertIn(comment, self.caplog.records[-2].getMessage())
+
+    def test_pool_metrics(self):
+        reader = InMemoryMetricReader()
+        engine = create_engine(
+            "sqlite:///:memory:",
+            poolclass=QueuePool,
+            pool_size=1,
+            max_overflow=1,
+            pool_logging_name="test_pool",
+        )
+        SQLAlchemyInstrumentor().instrument(
+            engine=engine,
+            tracer_provider=self.tracer_provider,
+            meter_provider=MeterProvider(metric_readers=[reader]),
+        )
+        cnx1 = engine.connect()
+        cnx2 = engine.connect()
+        cnx1.close()
+
+        metrics = {}
+        for metric in reader.get_metrics():
+            metrics.setdefault(metric.name, []).append(metric)
+        attributes = {"pool.name": "test_pool"}
+        wait_time = metrics["db.client.connections.wait_time"][0].point
+        self.assertEqual(sum(wait_time.bucket_counts), 2)
+        use_time = metrics["db.client.connections.use_time"][0].point
+        self.assertEqual(sum(use_time.bucket_counts), 1)
+        self.assertEqual(
+            metrics["db.client.connections.created"][0].point.value, 2
+        )
+        usage = {
+            metric.attributes["state"]: metric.point.value
+            for metric in metrics["db.client.connections.usage"]
+        }
+        self.assertEqual(usage, {"used": 1, "idle": 1})
+        overflow = metrics["db.client.connections.overflow"][0]
+        self.assertEqual(overflow.attributes, attributes)
+        self.assertEqual(overflow.point.value, 1)
+        for name in (
+            "db.client.connections.wait_time",
+            "db.client.connections.use_time",
+            "db.client.connections.created",
+        ):
+            self.assertEqual(metrics[name][0].attributes, attributes)
+        cnx2.close()
+
+    def test_pool_metrics_timeout(self):
+        reader = InMemoryMetricReader()
+        engine = create_engine(
+            "sqlite:///:memory:",
+            poolclass=QueuePool,
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=0.01,
+        )
+        SQLAlchemyInstrumentor().instrument(
+            engine=engine,
+            tracer_provider=self.tracer_provider,
+            meter_provider=MeterProvider(metric_readers=[reader]),
+        )
+        cnx = engine.connect()
+        with self.assertRaises(sqlalchemy.exc.TimeoutError):
+            engine.connect()
+        cnx.invalidate()
+        cnx.close()
+        # the pool is replaced when the engine is disposed
+        engine.dispose()
+        engine.connect().close()
+
+        metrics = {metric.name: metric for metric in reader.get_metrics()}
+        self.assertEqual(
+            metrics["db.client.connections.timeouts"].point.value, 1
+        )
+        self.assertEqual(
+            metrics["db.client.connections.invalidated"].point.value, 1
+        )
+        self.assertEqual(
+            sum(
+                metrics["db.client.connections.wait_time"].point.bucket_counts
+            ),
+            3,
+        )
+
+    def test_pool_metrics_reinstrument(self):
+        reader = InMemoryMetricReader()
+        meter_provider = MeterProvider(metric_readers=[reader])
+        engine = create_engine("sqlite:///:memory:", poolclass=QueuePool)
+        SQLAlchemyInstrumentor().instrument(
+            engine=engine,
+            tracer_provider=self.tracer_provider,
+            meter_provider=meter_provider,
+        )
+        SQLAlchemyInstrumentor().uninstrument()
+        SQLAlchemyInstrumentor().instrument(
+            engine=engine,
+            tracer_provider=self.tracer_provider,
+            meter_provider=meter_provider,
+        )
+        cnx = engine.connect()
+
+        metrics = {}
+        for metric in reader.get_metrics():
+            metrics.setdefault(metric.name, []).append(metric)
+        wait_time = metrics["db.client.connections.wait_time"][0].point
+        self.assertEqual(sum(wait_time.bucket_counts), 1)
+        self.assertEqual(
+            metrics["db.client.connections.created"][0].point.value, 1
+        )
+        self.assertEqual(
+            sorted(
+                (metric.attributes["state"], metric.point.value)
+                for metric in metrics["db.client.connections.usage"]
+            ),
+            [("idle", 0), ("used", 1)],
+        )
+        cnx.close()
+
+    def test_pool_metrics_disabled(self):
+        reader = InMemoryMetricReader()
+        engine = create_engine("sqlite:///:memory:", poolclass=QueuePool)
+        SQLAlchemyInstrumentor().instrument(
+            engine=engine,
+            tracer_provider=self.tracer_provider,
+            meter_provider=MeterProvider(metric_readers=[reader]),
+            enable_pool_metrics=False,
         )
+        engine.connect().close()
+        self.assertEqual(list(reader.get_metrics()), [])
@@ -65,14 +65,69 @@ Usage
     }
     SystemMetricsInstrumentor(config=configuration).instrument()
 
+Each ``psutil`` source (for example ``psutil.disk_io_counters`` or
+``psutil.net_io_counters``) is sampled once per collection and the sample
+is shared between all the instruments that read it.
+
+Runtime metrics
+---------------
+
+The following runtime metrics are not collected by default and are enabled
+by adding their key to the configuration:
+
+.. code:: python
+
+    configuration = {
+        # runtime.<implementation>.thread_count
+        "runtime.thread_count": [],
+        # runtime.<implementation>.file_descriptors, not available on Windows
+        "runtime.file_descriptors": [],
+        # runtime.<implementation>.context_switches
+        "runtime.context_switches": ["voluntary", "involuntary"],
+        # runtime.<implementation>.gc_time, in seconds per generation
+        "runtime.gc.time": ["0", "1", "2"],
+        # runtime.<implementation>.gc_collected, per generation
+        "runtime.gc.collected": ["0", "1", "2"],
+    }
+    SystemMetricsInstrumentor(config=configuration).instrument()
+
+The garbage collection metrics are measured with a ``gc.callbacks`` hook that
+is installed on ``instrument`` and removed on ``uninstrument``.
+
+Prefork servers such as gunicorn run the application in child processes of
+the instrumented process. Passing ``include_child_processes=True`` makes the
+memory, CPU time, thread count, file descriptors and context switches metrics
+also observe the children of the current process. Every observation then has
+a ``pid`` label. Only the first ``max_child_processes`` children (ordered by
+pid) get their own ``pid`` label, the remaining ones are added together under
+``pid="other"`` to keep the number of time series bounded.
+
+.. code:: python
+
+    SystemMetricsInstrumentor(
+        include_child_processes=True, max_child_processes=8
+    ).instrument()
+
 API
 ---
 """
 
 import gc
 import os
+import threading
+from collections import defaultdict
 from platform import python_implementation
-from typing import Collection, Dict, Iterable, List, Optional
+from time import monotonic, perf_counter
+from typing import (
+    Any,
+    Callable,
+    Collection,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
 
 import psutil
 
@@ -104,12 +159,57 @@ _DEFAULT_CONFIG = {
     "runtime.cpu.time": ["user", "system"],
 }
 
+_OTHER_CHILD_PROCESSES = "other"
+
+# Seconds during which a psutil sample is shared between callbacks
+_SNAPSHOT_TTL = 0.5
+
+
+def _sum_samples(samples: List[Any]) -> Any:
+    """Adds up numbers or psutil named tuples field by field"""
+    if len(samples) == 1:
+        return samples[0]
+    first = samples[0]
+    if isinstance(first, tuple):
+        return type(first)(*(sum(values) for values in zip(*samples)))
+    return sum(samples)
+
+
+class _CollectionSnapshot:
+    """Shares psutil samples between the callbacks of a single collection.
+
+    A source is sampled the first time a callback reads it and the sample is
+    handed to the other callbacks reading it within ``ttl`` seconds. The ttl
+    is much shorter than any export interval so that every collection gets
+    fresh samples, even when some of its callbacks fail or are skipped.
+    """
+
+    def __init__(self, ttl: float = _SNAPSHOT_TTL):
+        self._lock = threading.Lock()
+        self._ttl = ttl
+        self._samples = {}
+
+    def get(self, source: str, sample: Callable[[], Any]):
+        with self._lock:
+            now = monotonic()
+            entry = self._samples.get(source)
+            if entry is None or now - entry[0] > self._ttl:
+                entry = (now, sample())
+                self._samples[source] = entry
+            return entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+
 
 class SystemMetricsInstrumentor(BaseInstrumentor):
     def __init__(
         self,
         labels: Optional[Dict[str, str]] = None,
         config: Optional[Dict[str, List[str]]] = None,
+        include_child_processes: bool = False,
+        max_child_processes: int = 16,
     ):
         super().__init__()
         if config is None:
@@ -121,6 +221,13 @@ class SystemMetricsInstrumentor(BaseInstrumentor):
         self._python_implementation = python_implementation().lower()
 
         self._proc = psutil.Process(os.getpid())
+        self._snapshot = _CollectionSnapshot()
+        self._include_child_processes = include_child_processes
+        self._max_child_processes = max_child_processes
+
+        self._gc_start = None
+        self._gc_time = defaultdict(float)
+        self._gc_collected = defaultdict(int)
 
         self._system_cpu_time_labels = self._labels.copy()
         self._system_cpu_utilization_labels = self._labels.copy()
@@ -145,6 +252,11 @@ class SystemMetricsInstrumentor(BaseInstrumentor):
         self._runtime_memory_labels = self._labels.copy()
         self._runtime_cpu_time_labels = self._labels.copy()
         self._runtime_gc_count_labels = self._labels.copy()
+        self._runtime_thread_count_labels = self._labels.copy()
+        self._runtime_file_descriptors_labels = self._labels.copy()
+        self._runtime_context_switches_labels = self._labels.copy()
+        self._runtime_gc_time_labels = self._labels.copy()
+        self._runtime_gc_collected_labels = self._labels.copy()
 
     def instrumentation_dependencies(self) -> Collection[str]:
         return _instruments
@@ -317,8 +429,136 @@ class SystemMetricsInstrumentor(BaseInstrumentor):
             unit="bytes",
         )
 
+        implementation = self._python_implementation
+
+        if "runtime.thread_count" in self._config:
+            self._meter.create_observable_gauge(
+                name=f"runtime.{implementation}.thread_count",
+                callbacks=[self._get_runtime_thread_count],
+                description=f"Runtime {implementation} thread count",
+                unit="threads",
+            )
+
+        if "runtime.file_descriptors" in self._config and hasattr(
+            psutil.Process, "num_fds"
+        ):
+            self._meter.create_observable_gauge(
+                name=f"runtime.{implementation}.file_descriptors",
+                callbacks=[self._get_runtime_file_descriptors],
+                description=f"Runtime {implementation} open file descriptors",
+                unit="file_descriptors",
+            )
+
+        if "runtime.context_switches" in self._config:
+            self._meter.create_observable_counter(
+                name=f"runtime.{implementation}.context_switches",
+                callbacks=[self._get_runtime_context_switches],
+                description=f"Runtime {implementation} context switches",
+                unit="switches",
+            )
+
+        if "runtime.gc.time" in self._config:
+            self._meter.create_observable_counter(
+                name=f"runtime.{implementation}.gc_time",
+                callbacks=[self._get_runtime_gc_time],
+                description=f"Runtime {implementation} GC time",
+                unit="seconds",
+            )
+
+        if "runtime.gc.collected" in self._config:
+            self._meter.create_observable_counter(
+                name=f"runtime.{implementation}.gc_collected",
+                callbacks=[self._get_runtime_gc_collected],
+                description=f"Runtime {implementation} GC collected objects",
+                unit="objects",
+            )
+
+        if (
+            "runtime.gc.time" in self._config
+            or "runtime.gc.collected" in self._config
+        ) and self._on_gc not in gc.callbacks:
+            gc.callbacks.append(self._on_gc)
+
     def _uninstrument(self, **__):
-        pass
+        self._snapshot.clear()
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+        self._gc_start = None
+
+    def _on_gc(self, phase: str, info: Dict[str, int]):
+        if phase == "start":
+            self._gc_start = perf_counter()
+        elif self._gc_start is not None:
+            generation = str(info["generation"])
+            self._gc_time[generation] += perf_counter() - self._gc_start
+            self._gc_collected[generation] += info["collected"]
+            self._gc_start = None
+
+    def _get_child_processes(self) -> List[Tuple[str, List[psutil.Process]]]:
+        try:
+            children = sorted(
+                self._proc.children(recursive=True),
+                key=lambda child: child.pid,
+            )
+        except psutil.Error:
+            return []
+
+        groups = [
+            (str(child.pid), [child])
+            for child in children[: self._max_child_processes]
+        ]
+        if len(children) > self._max_child_processes:
+            groups.append(
+                (
+                    _OTHER_CHILD_PROCESSES,
+                    children[self._max_child_processes :],
+                )
+            )
+        return groups
+
+    def _read_processes(
+        self, read: Callable[[psutil.Process], Any]
+    ) -> Iterable[Tuple[Optional[str], Any]]:
+        """Reads the current process and, if enabled, its children
+
+        Yields ``(pid, sample)`` pairs, ``pid`` is ``None`` when children are
+        not observed. Processes that exit while being read are skipped.
+        """
+        if not self._include_child_processes:
+            yield None, read(self._proc)
+            return
+
+        groups = [(str(self._proc.pid), [self._proc])]
+        groups.extend(
+            self._snapshot.get("children", self._get_child_processes)
+        )
+        for pid, processes in groups:
+            samples = []
+            for process in processes:
+                try:
+                    samples.append(read(process))
+                except psutil.Error:
+                    continue
+            if samples:
+                yield pid, _sum_samples(samples)
+
+    def _virtual_memory(self):
+        return self._snapshot.get("virtual_memory", psutil.virtual_memory)
+
+    def _swap_memory(self):
+        return self._snapshot.get("swap_memory", psutil.swap_memory)
+
+    def _disk_io_counters(self):
+        return self._snapshot.get(
+            "disk_io_counters",
+            lambda: psutil.disk_io_counters(perdisk=True),
+        )
+
+    def _net_io_counters(self):
+        return self._snapshot.get(
+            "net_io_counters",
+            lambda: psutil.net_io_counters(pernic=True),
+        )
 
     def _get_system_cpu_time(self) -> Iterable[Observation]:
         """Observer callback for system CPU time"""
@@ -348,7 +588,7 @@ class SystemMetricsInstrumentor(BaseInstrumentor):
 
     def _get_system_memory_usage(self) -> Iterable[Observation]:
         """Observer callback for memory usage"""
-        virtual_memory = psutil.virtual_memory()
+        virtual_memory = self._virtual_memory()
         for metric in self._config["system.memory.usage"]:
             self._system_memory_usage_labels["state"] = metric
             if hasattr(virtual_memory, metric):
@@ -359,7 +599,7 @@ class SystemMetricsInstrumentor(BaseInstrumentor):
 
     def _get_system_memory_utilization(self) -> Iterable[Observation]:
         """Observer callback for memory utilization"""
-        system_memory = psutil.virtual_memory()
+        system_memory = self._virtual_memory()
 
         for metric in self._config["system.memory.utilization"]:
             self._system_memory_utilization_labels["state"] = metric
@@ -371,7 +611,7 @@ class SystemMetricsInstrumentor(BaseInstrumentor):
 
     def _get_system_swap_usage(self) -> Iterable[Observation]:
         """Observer callback for swap usage"""
-        system_swap = psutil.swap_memory()
+        system_swap = self._swap_memory()
 
         for metric in self._config["system.swap.usage"]:
             self._system_swap_usage_labels["state"] = metric
@@ -383,7 +623,7 @@ class SystemMetricsInstrumentor(BaseInstrumentor):
 
     def _get_system_swap_utilization(self) -> Iterable[Observation]:
         """Observer callback for swap utilization"""
-        system_swap = psutil.swap_memory()
+        system_swap = self._swap_memory()
 
         for metric in self._config["system.swap.utilization"]:
             if hasattr(system_swap, metric):
@@ -395,7 +635,7 @@ class SystemMetricsInstrumentor(BaseInstrumentor):
 
     def _get_system_disk_io(self) -> Iterable[Observation]:
         """Observer callback for disk IO"""
-        for device, counters in psutil.disk_io_counters(perdisk=True).items():
+        for device, counters in self._disk_io_counters().items():
             for metric in self._config["system.disk.io"]:
                 if hasattr(counters, f"{metric}_bytes"):
                     self._system_disk_io_labels["device"] = device
@@ -407,7 +647,7 @@ class SystemMetricsInstrumentor(BaseInstrumentor):
 
     def _get_system_disk_operations(self) -> Iterable[Observation]:
         """Observer callback for disk operations"""
-        for device, counters in psutil.disk_io_counters(perdisk=True).items():
+        for device, counters in self._disk_io_counters().items():
             for metric in self._config["system.disk.operations"]:
                 if hasattr(counters, f"{metric}_count"):
                     self._system_disk_operations_labels["device"] = device
@@ -419,7 +659,7 @@ class SystemMetricsInstrumentor(BaseInstrumentor):
 
     def _get_system_disk_time(self) -> Iterable[Observation]:
         """Observer callback for disk time"""
-        for device, counters in psutil.disk_io_counters(perdisk=True).items():
+        for device, counters in self._disk_io_counters().items():
             for metric in self._config["system.disk.time"]:
                 if hasattr(counters, f"{metric}_time"):
                     self._system_disk_time_labels["device"] = device
@@ -435,7 +675,7 @@ class SystemMetricsInstrumentor(BaseInstrumentor):
         # FIXME The units in the spec is 1, it seems like it should be
         # operations or the value type should be Double
 
-        for device, counters in psutil.disk_io_counters(perdisk=True).items():
+        for device, counters in self._disk_io_counters().items():
             for metric in self._config["system.disk.time"]:
                 if hasattr(counters, f"{metric}_merged_count"):
                     self._system_disk_merged_labels["device"] = device
@@ -448,7 +688,7 @@ class SystemMetricsInstrumentor(BaseInstrumentor):
     def _get_system_network_dropped_packets(self) -> Iterable[Observation]:
         """Observer callback for network dropped packets"""
 
-        for device, counters in psutil.net_io_counters(pernic=True).items():
+        for device, counters in self._net_io_counters().items():
             for metric in self._config["system.network.dropped.packets"]:
                 in_out = {"receive": "in", "transmit": "out"}[metric]
                 if hasattr(counters, f"drop{in_out}"):
@@ -466,7 +706,7 @@ class SystemMetricsInstrumentor(BaseInstrumentor):
     def _get_system_network_packets(self) -> Iterable[Observation]:
         """Observer callback for network packets"""
 
-        for device, counters in psutil.net_io_counters(pernic=True).items():
+        for device, counters in self._net_io_counters().items():
             for metric in self._config["system.network.dropped.packets"]:
                 recv_sent = {"receive": "recv", "transmit": "sent"}[metric]
                 if hasattr(counters, f"packets_{recv_sent}"):
@@ -479,7 +719,7 @@ class SystemMetricsInstrumentor(BaseInstrumentor):
 
     def _get_system_network_errors(self) -> Iterable[Observation]:
         """Observer callback for network errors"""
-        for device, counters in psutil.net_io_counters(pernic=True).items():
+        for device, counters in self._net_io_counters().items():
             for metric in self._config["system.network.errors"]:
                 in_out = {"receive": "in", "transmit": "out"}[metric]
                 if hasattr(counters, f"err{in_out}"):
@@ -493,7 +733,7 @@ class SystemMetricsInstrumentor(BaseInstrumentor):
     def _get_system_network_io(self) -> Iterable[Observation]:
         """Observer callback for network IO"""
 
-        for device, counters in psutil.net_io_counters(pernic=True).items():
+        for device, counters in self._net_io_counters().items():
             for metric in self._config["system.network.dropped.packets"]:
                 recv_sent = {"receive": "recv", "transmit": "sent"}[metric]
                 if hasattr(counters, f"bytes_{recv_sent}"):
@@ -544,28 +784,84 @@ class SystemMetricsInstrumentor(BaseInstrumentor):
 
     def _get_runtime_memory(self) -> Iterable[Observation]:
         """Observer callback for runtime memory"""
-        proc_memory = self._proc.memory_info()
-        for metric in self._config["runtime.memory"]:
-            if hasattr(proc_memory, metric):
-                self._runtime_memory_labels["type"] = metric
-                yield Observation(
-                    getattr(proc_memory, metric),
-                    self._runtime_memory_labels,
-                )
+        for pid, proc_memory in self._read_processes(
+            lambda proc: proc.memory_info()
+        ):
+            if pid is not None:
+                self._runtime_memory_labels["pid"] = pid
+            for metric in self._config["runtime.memory"]:
+                if hasattr(proc_memory, metric):
+                    self._runtime_memory_labels["type"] = metric
+                    yield Observation(
+                        getattr(proc_memory, metric),
+                        self._runtime_memory_labels,
+                    )
 
     def _get_runtime_cpu_time(self) -> Iterable[Observation]:
         """Observer callback for runtime CPU time"""
-        proc_cpu = self._proc.cpu_times()
-        for metric in self._config["runtime.cpu.time"]:
-            if hasattr(proc_cpu, metric):
-                self._runtime_cpu_time_labels["type"] = metric
-                yield Observation(
-                    getattr(proc_cpu, metric),
-                    self._runtime_cpu_time_labels,
-                )
+        for pid, proc_cpu in self._read_processes(
+            lambda proc: proc.cpu_times()
+        ):
+            if pid is not None:
+                self._runtime_cpu_time_labels["pid"] = pid
+            for metric in self._config["runtime.cpu.time"]:
+                if hasattr(proc_cpu, metric):
+                    self._runtime_cpu_time_labels["type"] = metric
+                    yield Observation(
+                        getattr(proc_cpu, metric),
+                        self._runtime_cpu_time_labels,
+                    )
 
     def _get_runtime_gc_count(self) -> Iterable[Observation]:
         """Observer callback for garbage collection"""
         for index, count in enumerate(gc.get_count()):
             self._runtime_gc_count_labels["count"] = str(index)
             yield Observation(count, self._runtime_gc_count_labels)
+
+    def _get_runtime_thread_count(self) -> Iterable[Observation]:
+        """Observer callback for runtime thread count"""
+        for pid, num_threads in self._read_processes(
+            lambda proc: proc.num_threads()
+        ):
+            if pid is not None:
+                self._runtime_thread_count_labels["pid"] = pid
+            yield Observation(num_threads, self._runtime_thread_count_labels)
+
+    def _get_runtime_file_descriptors(self) -> Iterable[Observation]:
+        """Observer callback for runtime open file descriptors"""
+        for pid, num_fds in self._read_processes(lambda proc: proc.num_fds()):
+            if pid is not None:
+                self._runtime_file_descriptors_labels["pid"] = pid
+            yield Observation(num_fds, self._runtime_file_descriptors_labels)
+
+    def _get_runtime_context_switches(self) -> Iterable[Observation]:
+        """Observer callback for runtime context switches"""
+        for pid, ctx_switches in self._read_processes(
+            lambda proc: proc.num_ctx_switches()
+        ):
+            if pid is not None:
+                self._runtime_context_switches_labels["pid"] = pid
+            for metric in self._config["runtime.context_switches"]:
+                if hasattr(ctx_switches, metric):
+                    self._runtime_context_switches_labels["type"] = metric
+                    yield Observation(
+                        getattr(ctx_switches, metric),
+                        self._runtime_context_switches_labels,
+                    )
+
+    def _get_runtime_gc_time(self) -> Iterable[Observation]:
+        """Observer callback for garbage collection time"""
+        for generation in self._config["runtime.gc.time"]:
+            self._runtime_gc_time_labels["generation"] = generation
+            yield Observation(
+                self._gc_time[generation], self._runtime_gc_time_labels
+            )
+
+    def _get_runtime_gc_collected(self) -> Iterable[Observation]:
+        """Observer callback for garbage collected objects"""
+        for generation in self._config["runtime.gc.collected"]:
+            self._runtime_gc_collected_labels["generation"] = generation
+            yield Observation(
+                self._gc_collected[generation],
+                self._runtime_gc_collected_labels,
+            )
@@ -14,12 +14,16 @@
 
 # pylint: disable=protected-access
 
+import os
 from collections import namedtuple
 from platform import python_implementation
-from unittest import mock
+from unittest import TestCase, mock
+
+import psutil
 
 from opentelemetry.instrumentation.system_metrics import (
     SystemMetricsInstrumentor,
+    _CollectionSnapshot,
 )
 from opentelemetry.sdk._metrics import MeterProvider
 from opentelemetry.sdk._metrics.export import InMemoryMetricReader
@@ -713,3 +717,203 @@ class TestSystemMetrics(TestBase):
             _SystemMetricsResult({"count": "2"}, 3),
         ]
         self._test_metrics(f"runtime.{self.implementation}.gc_count", expected)
+
+    @mock.patch("psutil.net_io_counters")
+    @mock.patch("psutil.disk_io_counters")
+    @mock.patch("psutil.virtual_memory")
+    def test_sources_sampled_once_per_collection(
+        self, mock_virtual_memory, mock_disk_io_counters, mock_net_io_counters
+    ):
+        VirtualMemory = namedtuple(
+            "VirtualMemory", ["used", "free", "cached", "total"]
+        )
+        mock_virtual_memory.return_value = VirtualMemory(
+            used=1, free=2, cached=3, total=4
+        )
+        mock_disk_io_counters.return_value = {}
+        mock_net_io_counters.return_value = {}
+
+        reader = InMemoryMetricReader()
+        meter_provider = MeterProvider(metric_readers=[reader])
+        SystemMetricsInstrumentor().instrument(meter_provider=meter_provider)
+
+        with mock.patch(
+            "opentelemetry.instrumentation.system_metrics.monotonic",
+            return_value=100,
+        ):
+            reader.get_metrics()
+        self.assertEqual(mock_virtual_memory.call_count, 1)
+        self.assertEqual(mock_disk_io_counters.call_count, 1)
+        self.assertEqual(mock_net_io_counters.call_count, 1)
+
+        # the next collection happens after an export interval
+        with mock.patch(
+            "opentelemetry.instrumentation.system_metrics.monotonic",
+            return_value=160,
+        ):
+            reader.get_metrics()
+        self.assertEqual(mock_virtual_memory.call_count, 2)
+        self.assertEqual(mock_disk_io_counters.call_count, 2)
+        self.assertEqual(mock_net_io_counters.call_count, 2)
+
+    def _test_runtime_metrics(self, observer_name, expected, **kwargs):
+        reader = InMemoryMetricReader()
+        meter_provider = MeterProvider(metric_readers=[reader])
+
+        system_metrics = SystemMetricsInstrumentor(**kwargs)
+        system_metrics.instrument(meter_provider=meter_provider)
+        self._assert_metrics(observer_name, reader, expected)
+
+    @mock.patch("psutil.Process.num_threads")
+    def test_runtime_thread_count(self, mock_process_num_threads):
+        mock_process_num_threads.configure_mock(**{"return_value": 4})
+
+        self._test_runtime_metrics(
+            f"runtime.{self.implementation}.thread_count",
+            [_SystemMetricsResult({}, 4)],
+            config={"runtime.thread_count": []},
+        )
+
+    @mock.patch("psutil.Process.num_ctx_switches")
+    def test_runtime_context_switches(self, mock_process_num_ctx_switches):
+        PCtxSw = namedtuple("PCtxSw", ["voluntary", "involuntary"])
+        mock_process_num_ctx_switches.configure_mock(
+            **{"return_value": PCtxSw(voluntary=5, involuntary=6)}
+        )
+
+        self._test_runtime_metrics(
+            f"runtime.{self.implementation}.context_switches",
+            [
+                _SystemMetricsResult({"type": "voluntary"}, 5),
+                _SystemMetricsResult({"type": "involuntary"}, 6),
+            ],
+            config={"runtime.context_switches": ["voluntary", "involuntary"]},
+        )
+
+    def test_runtime_opt_in_metrics_disabled_by_default(self):
+        reader = InMemoryMetricReader()
+        meter_provider = MeterProvider(metric_readers=[reader])
+        with mock.patch("gc.callbacks", []) as callbacks:
+            SystemMetricsInstrumentor().instrument(
+                meter_provider=meter_provider
+            )
+            self.assertEqual(callbacks, [])
+
+        metric_names = {metric.name for metric in reader.get_metrics()}
+        self.assertNotIn(
+            f"runtime.{self.implementation}.thread_count", metric_names
+        )
+        self.assertNotIn(
+            f"runtime.{self.implementation}.gc_time", metric_names
+        )
+
+    @mock.patch("opentelemetry.instrumentation.system_metrics.perf_counter")
+    def test_runtime_gc_time_and_collected(self, mock_perf_counter):
+        mock_perf_counter.side_effect = [1.0, 1.5, 2.0, 2.25]
+        reader = InMemoryMetricReader()
+        meter_provider = MeterProvider(metric_readers=[reader])
+
+        with mock.patch("gc.callbacks", []) as callbacks:
+            system_metrics = SystemMetricsInstrumentor(
+                config={
+                    "runtime.gc.time": ["0", "2"],
+                    "runtime.gc.collected": ["0", "2"],
+                }
+            )
+            system_metrics.instrument(meter_provider=meter_provider)
+            self.assertEqual(len(callbacks), 1)
+
+            callbacks[0]("start", {"generation": 2, "collected": 0})
+            callbacks[0]("stop", {"generation": 2, "collected": 7})
+            callbacks[0]("start", {"generation": 2, "collected": 0})
+            callbacks[0]("stop", {"generation": 2, "collected": 3})
+
+            metrics = reader.get_metrics()
+            system_metrics.uninstrument()
+            self.assertEqual(callbacks, [])
+
+        def _values(name):
+            return {
+                metric.attributes["generation"]: metric.point.value
+                for metric in metrics
+                if metric.name == name
+            }
+
+        self.assertEqual(
+            _values(f"runtime.{self.implementation}.gc_time"),
+            {"0": 0, "2": 0.75},
+        )
+        self.assertEqual(
+            _values(f"runtime.{self.implementation}.gc_collected"),
+            {"0": 0, "2": 10},
+        )
+
+    @mock.patch("psutil.Process.children")
+    @mock.patch("psutil.Process.memory_info")
+    def test_runtime_memory_child_processes(
+        self, mock_process_memory_info, mock_process_children
+    ):
+        PMem = namedtuple("PMem", ["rss", "vms"])
+        PCPUTimes = namedtuple("PCPUTimes", ["user", "system"])
+        mock_process_memory_info.configure_mock(
+            **{"return_value": PMem(rss=1, vms=2)}
+        )
+
+        def _child(pid, rss, vms):
+            child = mock.Mock(pid=pid)
+            child.memory_info.return_value = PMem(rss=rss, vms=vms)
+            child.cpu_times.return_value = PCPUTimes(user=0.0, system=0.0)
+            return child
+
+        exited = mock.Mock(pid=200)
+        exited.memory_info.side_effect = psutil.NoSuchProcess(200)
+        mock_process_children.configure_mock(
+            **{
+                "return_value": [
+                    _child(103, 30, 40),
+                    _child(101, 10, 20),
+                    _child(102, 100, 200),
+                    exited,
+                    _child(104, 1000, 2000),
+                ]
+            }
+        )
+
+        pid = str(os.getpid())
+        self._test_runtime_metrics(
+            f"runtime.{self.implementation}.memory",
+            [
+                _SystemMetricsResult({"pid": pid, "type": "rss"}, 1),
+                _SystemMetricsResult({"pid": pid, "type": "vms"}, 2),
+                _SystemMetricsResult({"pid": "101", "type": "rss"}, 10),
+                _SystemMetricsResult({"pid": "101", "type": "vms"}, 20),
+                _SystemMetricsResult({"pid": "102", "type": "rss"}, 100),
+                _SystemMetricsResult({"pid": "102", "type": "vms"}, 200),
+                _SystemMetricsResult({"pid": "other", "type": "rss"}, 1030),
+                _SystemMetricsResult({"pid": "other", "type": "vms"}, 2040),
+            ],
+            include_child_processes=True,
+            max_child_processes=2,
+        )
+
+
+class TestCollectionSnapshot(TestCase):
+    @mock.patch("opentelemetry.instrumentation.system_metrics.monotonic")
+    def test_get(self, mock_monotonic):
+        snapshot = _CollectionSnapshot(ttl=0.5)
+        sample = mock.Mock(side_effect=[1, 2, 3])
+
+        mock_monotonic.return_value = 10
+        self.assertEqual(snapshot.get("source", sample), 1)
+        mock_monotonic.return_value = 10.1
+        self.assertEqual(snapshot.get("source", sample), 1)
+        self.assertEqual(sample.call_count, 1)
+
+        # the sample expires even if a consumer did not read it
+        mock_monotonic.return_value = 70
+        self.assertEqual(snapshot.get("source", sample), 2)
+        self.assertEqual(snapshot.get("source", sample), 2)
+        self.assertEqual(sample.call_count, 2)
+
+        snapshot.clear()
+        self.assertEqual(snapshot.get("source", sample), 3)
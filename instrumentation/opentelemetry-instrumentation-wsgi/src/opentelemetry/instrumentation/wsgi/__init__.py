@@ -148,6 +148,9 @@ The value of the attribute will be single item list containing all the header va
 Example of the added span attribute,
 ``http.response.header.custom_response_header = ["<value1>,<value2>"]``
 
+The headers to capture are read from the environment when the middleware is created. Call
+``OpenTelemetryMiddleware.reload_custom_headers`` to apply changes made to these environment variables afterwards.
+
 Note:
     Environment variable names to caputre http headers are still experimental, and thus are subject to change.
 
@@ -266,41 +269,80 @@ def collect_request_attributes(environ):
     return result
 
 
-def collect_custom_request_headers_attributes(environ):
+def get_custom_request_headers_attribute_names() -> typing.Dict[str, str]:
+    """Returns the request headers configured to be captured, mapped from
+    their WSGI environ keys to the span attribute names."""
+    return {
+        _CARRIER_KEY_PREFIX
+        + header.upper().replace("-", "_"): (
+            normalise_request_header_name(header)
+        )
+        for header in get_custom_headers(
+            OTEL_INSTRUMENTATION_HTTP_CAPTURE_HEADERS_SERVER_REQUEST
+        )
+    }
+
+
+def get_custom_response_headers_attribute_names() -> typing.Dict[str, str]:
+    """Returns the response headers configured to be captured, mapped from
+    their lowercase names to the span attribute names."""
+    return {
+        header.lower(): normalise_response_header_name(header)
+        for header in get_custom_headers(
+            OTEL_INSTRUMENTATION_HTTP_CAPTURE_HEADERS_SERVER_RESPONSE
+        )
+    }
+
+
+def collect_custom_request_headers_attributes(
+    environ, headers_attribute_names=None
+):
     """Returns custom HTTP request headers which are configured by the user
     from the PEP3333-conforming WSGI environ to be used as span creation attributes as described
-    in the specification https://github.com/open-telemetry/opentelemetry-specification/blob/main/specification/trace/semantic_conventions/http.md#http-request-and-response-headers"""
+    in the specification https://github.com/open-telemetry/opentelemetry-specification/blob/main/specification/trace/semantic_conventions/http.md#http-request-and-response-headers
+
+    Args:
+        environ: WSGI environ object
+        headers_attribute_names: Headers to capture as returned by
+            `get_custom_request_headers_attribute_names`. If omitted, the
+            configuration is read from the environment.
+    """
+    if headers_attribute_names is None:
+        headers_attribute_names = get_custom_request_headers_attribute_names()
     attributes = {}
-    custom_request_headers_name = get_custom_headers(
-        OTEL_INSTRUMENTATION_HTTP_CAPTURE_HEADERS_SERVER_REQUEST
-    )
-    for header_name in custom_request_headers_name:
-        wsgi_env_var = header_name.upper().replace("-", "_")
-        header_values = environ.get(f"HTTP_{wsgi_env_var}")
+    for environ_key, attribute_name in headers_attribute_names.items():
+        header_values = environ.get(environ_key)
         if header_values:
-            key = normalise_request_header_name(header_name)
-            attributes[key] = [header_values]
+            attributes[attribute_name] = [header_values]
     return attributes
 
 
-def collect_custom_response_headers_attributes(response_headers):
+def collect_custom_response_headers_attributes(
+    response_headers, headers_attribute_names=None
+):
     """Returns custom HTTP response headers which are configured by the user from the
     PEP3333-conforming WSGI environ as described in the specification
-    https://github.com/open-telemetry/opentelemetry-specification/blob/main/specification/trace/semantic_conventions/http.md#http-request-and-response-headers"""
-    attributes = {}
-    custom_response_headers_name = get_custom_headers(
-        OTEL_INSTRUMENTATION_HTTP_CAPTURE_HEADERS_SERVER_RESPONSE
-    )
-    response_headers_dict = {}
-    if response_headers:
-        for header_name, header_value in response_headers:
-            response_headers_dict[header_name.lower()] = header_value
+    https://github.com/open-telemetry/opentelemetry-specification/blob/main/specification/trace/semantic_conventions/http.md#http-request-and-response-headers
 
-    for header_name in custom_response_headers_name:
-        header_values = response_headers_dict.get(header_name.lower())
-        if header_values:
-            key = normalise_response_header_name(header_name)
-            attributes[key] = [header_values]
+    Args:
+        response_headers: Response headers passed to ``start_response``
+        headers_attribute_names: Headers to capture as returned by
+            `get_custom_response_headers_attribute_names`. If omitted, the
+            configuration is read from the environment.
+    """
+    if headers_attribute_names is None:
+        headers_attribute_names = get_custom_response_headers_attribute_names()
+    attributes = {}
+    if not headers_attribute_names or not response_headers:
+        return attributes
+
+    for header_name, header_value in response_headers:
+        attribute_name = headers_attribute_names.get(header_name.lower())
+        if attribute_name is not None:
+            if header_value:
+                attributes[attribute_name] = [header_value]
+            else:
+                attributes.pop(attribute_name, None)
     return attributes
 
 
@@ -358,15 +400,31 @@ class OpenTelemetryMiddleware:
         self.tracer = trace.get_tracer(__name__, __version__, tracer_provider)
         self.request_hook = request_hook
         self.response_hook = response_hook
+        self.reload_custom_headers()
+
+    def reload_custom_headers(self):
+        """Reads again the request and response headers to capture from the
+        environment.
+
+        The configuration is read once when the middleware is created, call
+        this method to apply later changes.
+        """
+        self._custom_request_headers = (
+            get_custom_request_headers_attribute_names()
+        )
+        self._custom_response_headers = (
+            get_custom_response_headers_attribute_names()
+        )
+
+    def _create_start_response(self, span, start_response, response_hook):
+        custom_response_headers = self._custom_response_headers
 
-    @staticmethod
-    def _create_start_response(span, start_response, response_hook):
         @functools.wraps(start_response)
         def _start_response(status, response_headers, *args, **kwargs):
             add_response_attributes(span, status, response_headers)
             if span.is_recording() and span.kind == trace.SpanKind.SERVER:
                 custom_attributes = collect_custom_response_headers_attributes(
-                    response_headers
+                    response_headers, custom_response_headers
                 )
                 if len(custom_attributes) > 0:
                     span.set_attributes(custom_attributes)
@@ -393,7 +451,7 @@ class OpenTelemetryMiddleware:
         )
         if span.is_recording() and span.kind == trace.SpanKind.SERVER:
             custom_attributes = collect_custom_request_headers_attributes(
-                environ
+                environ, self._custom_request_headers
             )
             if len(custom_attributes) > 0:
                 span.set_attributes(custom_attributes)
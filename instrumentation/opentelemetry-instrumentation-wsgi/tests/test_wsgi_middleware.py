@@ -523,6 +523,46 @@ class TestAdditionOfCustomRequestResponseHeaders(WsgiTestBase, TestBase):
         }
         self.assertSpanHasAttributes(span, expected)
 
+    @mock.patch.dict(
+        "os.environ",
+        {
+            OTEL_INSTRUMENTATION_HTTP_CAPTURE_HEADERS_SERVER_REQUEST: "Custom-Test-Header-1"
+        },
+    )
+    def test_custom_request_headers_reload(self):
+        self.environ.update(
+            {
+                "HTTP_CUSTOM_TEST_HEADER_1": "Test Value 1",
+                "HTTP_CUSTOM_TEST_HEADER_2": "Test Value 2",
+            }
+        )
+        app = otel_wsgi.OpenTelemetryMiddleware(simple_wsgi)
+        with mock.patch.dict(
+            "os.environ",
+            {
+                OTEL_INSTRUMENTATION_HTTP_CAPTURE_HEADERS_SERVER_REQUEST: "Custom-Test-Header-2"
+            },
+        ):
+            self.iterate_response(app(self.environ, self.start_response))
+            app.reload_custom_headers()
+            self.iterate_response(app(self.environ, self.start_response))
+        spans = self.memory_exporter.get_finished_spans()
+        self.assertEqual(len(spans), 2)
+        self.assertSpanHasAttributes(
+            spans[0],
+            {"http.request.header.custom_test_header_1": ("Test Value 1",)},
+        )
+        self.assertNotIn(
+            "http.request.header.custom_test_header_2", spans[0].attributes
+        )
+        self.assertSpanHasAttributes(
+            spans[1],
+            {"http.request.header.custom_test_header_2": ("Test Value 2",)},
+        )
+        self.assertNotIn(
+            "http.request.header.custom_test_header_1", spans[1].attributes
+        )
+
     @mock.patch.dict(
         "os.environ",
         {
@@ -48,7 +48,7 @@ class BaseInstrumentor(ABC):
     def __new__(cls, *args, **kwargs):
 
         if cls._instance is None:
-            cls._instance = object.__new__(cls, *args, **kwargs)
+            cls._instance = object.__new__(cls)
 
         return cls._instance
 
@@ -131,11 +131,10 @@ def _generate_sql_comment(**meta):
 
     # Sort the keywords to ensure that caching works and that testing is
     # deterministic. It eases visual inspection as well.
-    # pylint: disable=consider-using-f-string
     return (
         " /*"
         + _KEY_VALUE_DELIMITER.join(
-            "{}={!r}".format(_url_quote(key), _url_quote(value))
+            _format_sql_comment_tag(key, value)
             for key, value in sorted(meta.items())
             if value is not None
         )
@@ -143,6 +142,11 @@ def _generate_sql_comment(**meta):
     )
 
 
+def _format_sql_comment_tag(key, value) -> str:
+    # pylint: disable=consider-using-f-string
+    return "{}={!r}".format(_url_quote(key), _url_quote(value))
+
+
 def _url_quote(s):  # pylint: disable=invalid-name
     if not isinstance(s, (str, bytes)):
         return s
@@ -163,3 +167,55 @@ def _generate_opentelemetry_traceparent(span: Span) -> str:
     _traceparent = _version + "-" + _trace_id + "-" + _span_id + "-" + _flags
     meta.update({"traceparent": _traceparent})
     return meta
+
+
+_TRACEPARENT_KEY = "traceparent"
+
+
+class _SQLCommenter:
+    """Renders the SQL comment of a span from a precompiled template.
+
+    The comments are the same as the ones built with
+    ``_generate_opentelemetry_traceparent`` and ``_generate_sql_comment``, but
+    the static tags are quoted and sorted once so that rendering a comment
+    only formats the trace and span ids.
+    """
+
+    def __init__(self, **static_meta):
+        static_meta.pop(_TRACEPARENT_KEY, None)
+        self._static_comment = _generate_sql_comment(**static_meta)
+        tags = sorted(
+            (key, value)
+            for key, value in static_meta.items()
+            if value is not None
+        )
+        self._prefix = (
+            " /*"
+            + "".join(
+                _format_sql_comment_tag(key, value) + _KEY_VALUE_DELIMITER
+                for key, value in tags
+                if key < _TRACEPARENT_KEY
+            )
+            + _TRACEPARENT_KEY
+            + "='00-"
+        )
+        self._suffix = (
+            "-"
+            + str(trace.TraceFlags.SAMPLED)
+            + "'"
+            + "".join(
+                _KEY_VALUE_DELIMITER + _format_sql_comment_tag(key, value)
+                for key, value in tags
+                if key > _TRACEPARENT_KEY
+            )
+            + "*/"
+        )
+
+    def comment(self, span: Span) -> str:
+        span_context = span.get_span_context()
+        if not span_context.is_valid:
+            return self._static_comment
+        return (
+            f"{self._prefix}{span_context.trace_id:032x}-"
+            f"{span_context.span_id:016x}{self._suffix}"
+        )
@@ -48,3 +48,22 @@ class TestInstrumentor(TestCase):
 
     def test_singleton(self):
         self.assertIs(self.Instrumentor(), self.Instrumentor())
+
+    def test_singleton_with_arguments(self):
+        class Instrumentor(BaseInstrumentor):
+            def __init__(self, option=None):
+                super().__init__()
+                self.option = option
+
+            def _instrument(self, **kwargs):
+                pass
+
+            def _uninstrument(self, **kwargs):
+                pass
+
+            def instrumentation_dependencies(self):
+                return []
+
+        instrumentor = Instrumentor(option="value")
+        self.assertEqual(instrumentor.option, "value")
+        self.assertIs(instrumentor, Instrumentor())
@@ -14,7 +14,13 @@
 
 from http import HTTPStatus
 
-from opentelemetry.instrumentation.utils import http_status_to_status_code
+from opentelemetry import trace
+from opentelemetry.instrumentation.utils import (
+    _generate_opentelemetry_traceparent,
+    _generate_sql_comment,
+    _SQLCommenter,
+    http_status_to_status_code,
+)
 from opentelemetry.test.test_base import TestBase
 from opentelemetry.trace import StatusCode
 
@@ -111,3 +117,24 @@ class TestUtils(TestBase):
                     int(status_code), server_span=True
                 )
                 self.assertEqual(actual, expected, status_code)
+
+    def test_sql_commenter(self):
+        span = self.tracer_provider.get_tracer(__name__).start_span("test")
+        traceparent = _generate_opentelemetry_traceparent(span)
+        for meta in ({}, {"service": "test service", "zone": "a,b"}):
+            self.assertEqual(
+                _SQLCommenter(**meta).comment(span),
+                _generate_sql_comment(**meta, **traceparent),
+            )
+
+        self.assertEqual(
+            _SQLCommenter(traceparent="static", app="test").comment(span),
+            _generate_sql_comment(app="test", **traceparent),
+        )
+
+    def test_sql_commenter_invalid_span(self):
+        self.assertEqual(_SQLCommenter().comment(trace.INVALID_SPAN), "")
+        self.assertEqual(
+            _SQLCommenter(service="test").comment(trace.INVALID_SPAN),
+            " /*service='test'*/",
+        )